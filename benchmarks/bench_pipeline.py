@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+"""
+Times every stage of the reduce pipeline on synthetic maven-graph-plugin output and reports wall time and peak
+traced memory per stage as JSON.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_graph import generate_graph, write_dot
+
+import mavendeps
+from mavendeps import FilterAction, FilterDependency, filter_depends_on, parse_dot_graph, dot_to_maven_graph, \
+    read_maven_graph, read_artifact_graph, filter_artifacts, maven_to_dot_graph, write_dot_graph, in_reactor_filter, \
+    reject_any, collapse_groups, condense_cycles, transitive_reduction, read_npz_graph, write_npz_graph
+
+__author__ = 'Tony Ganchev'
+
+
+@filter_depends_on(FilterDependency.neighbours)
+def exclude_non_reactor_dependencies(artifact):
+    for a in artifact.dependents:
+        if a.artifact.in_reactor:
+            return FilterAction.accept
+    return FilterAction.no_action
+
+
+def in_reactor_style(artifact, node):
+    if artifact.in_reactor:
+        node.set_penwidth(2)
+        node.set_fillcolor('"lightgreen"')
+
+
+FILTER_CHAIN = in_reactor_filter(), exclude_non_reactor_dependencies, reject_any
+STYLE_FUNCTIONS = in_reactor_style,
+
+
+def _write_to_devnull(artifacts):
+    with open(os.devnull, 'w') as f:
+        write_dot_graph(artifacts, f, STYLE_FUNCTIONS)
+
+
+def stages(source_file, with_pydot):
+    """
+    Returns (stage, input stage, function) triples. Every function takes the output of its input stage.
+    """
+    result = [('read_maven_graph', None, lambda _: read_maven_graph(source_file)),
+              ('read_artifact_graph', None, lambda _: read_artifact_graph(source_file))]
+    if with_pydot:
+        result.extend((('parse_dot_graph', None, lambda _: parse_dot_graph(source_file)),
+                       ('dot_to_maven_graph', 'parse_dot_graph', dot_to_maven_graph)))
+    result.append(('filter_artifacts', 'read_maven_graph', lambda artifacts: filter_artifacts(artifacts, FILTER_CHAIN)))
+    if with_pydot:
+        result.append(('maven_to_dot_graph', 'filter_artifacts',
+                       lambda artifacts: maven_to_dot_graph(artifacts, STYLE_FUNCTIONS)))
+    result.append(('write_dot_graph', 'filter_artifacts', _write_to_devnull))
+    result.extend((('condense_cycles', 'read_maven_graph', condense_cycles),
+                   ('collapse_groups', 'read_maven_graph', collapse_groups),
+                   ('transitive_reduction', 'read_maven_graph', transitive_reduction)))
+    if _has_numpy():
+        npz_file = source_file + '.npz'
+        result.extend((('write_npz_graph', 'read_artifact_graph', lambda graph: write_npz_graph(graph, npz_file)),
+                       ('read_npz_graph', 'write_npz_graph', lambda _: read_npz_graph(npz_file))))
+    return result
+
+
+def _has_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
+def _measure(func, value, trace_memory):
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func(value)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run(sizes, seed, pydot_max_nodes, trace_memory, **generator_args):
+    """
+    Generates a graph for every size and measures all stages on it. Peak memory is measured in a separate traced run
+    so tracing does not distort the timings.
+    """
+    results = []
+    work_dir = tempfile.mkdtemp()
+    try:
+        for nodes in sizes:
+            artifacts, edges = generate_graph(nodes, seed, **generator_args)
+            source_file = os.path.join(work_dir, 'graph-{}.dot'.format(nodes))
+            with open(source_file, 'w') as f:
+                write_dot(f, artifacts, edges)
+            edge_count = len(edges)
+            del artifacts, edges
+
+            outputs = {None: None}
+            for stage, input_stage, func in stages(source_file, nodes <= pydot_max_nodes):
+                outputs[stage], seconds, _ = _measure(func, outputs[input_stage], False)
+                peak = _measure(func, outputs[input_stage], True)[2] if trace_memory else None
+                results.append({'nodes': nodes, 'edges': edge_count, 'stage': stage, 'seconds': seconds,
+                                'peak_bytes': peak})
+                sys.stderr.write('{:>8} {:<22} {:10.3f}s {:>16}\n'.format(
+                    nodes, stage, seconds, '-' if peak is None else '{:,}B'.format(peak)))
+            os.remove(source_file)
+    finally:
+        shutil.rmtree(work_dir)
+    return results
+
+
+def compare(baseline, results, threshold):
+    """
+    Prints the time ratio of every stage against the baseline and returns the regressions over threshold.
+    """
+    old = {(r['nodes'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        previous = old.get((r['nodes'], r['stage']))
+        if previous is None or not previous['seconds']:
+            continue
+        ratio = r['seconds'] / previous['seconds']
+        sys.stderr.write('{:>8} {:<22} x{:.2f}\n'.format(r['nodes'], r['stage'], ratio))
+        if ratio > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='comma separated node counts, e.g. 1000,10000,100000,1000000')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--fan-out', type=float, default=4.0)
+    parser.add_argument('--diamond-density', type=float, default=0.3)
+    parser.add_argument('--reactor-ratio', type=float, default=0.1)
+    parser.add_argument('--pydot-max-nodes', type=int, default=2000,
+                        help='skip the pydot based stages for larger graphs')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory runs')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio reported as a regression by --compare')
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes.split(',')], args.seed, args.pydot_max_nodes, not args.no_memory,
+                  depth=args.depth, fan_out=args.fan_out, diamond_density=args.diamond_density,
+                  reactor_ratio=args.reactor_ratio)
+    report = {
+        'meta': {
+            'mavendeps': mavendeps.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'threshold')}
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+"""
+Seeded generator of maven-graph-plugin style DOT files for benchmarking.
+"""
+
+import argparse
+import random
+
+__author__ = 'Tony Ganchev'
+
+DEFAULT_SCOPE_MIX = (('compile', 70), ('test', 15), ('runtime', 10), ('provided', 5))
+PACKAGINGS = (('jar', 80), ('bundle', 10), ('pom', 5), ('war', 3), ('kar', 2))
+
+
+def _weighted_choice(rng, choices):
+    total = sum(w for _, w in choices)
+    r = rng.uniform(0, total)
+    for value, weight in choices:
+        r -= weight
+        if r <= 0:
+            return value
+    return choices[-1][0]
+
+
+def generate_graph(nodes, seed=0, depth=8, fan_out=4.0, diamond_density=0.3, reactor_ratio=0.1,
+                   scope_mix=DEFAULT_SCOPE_MIX):
+    """
+    Generates a layered dependency DAG. Reactor modules fill the top layers, every artifact depends on about fan_out
+    artifacts from deeper layers, and diamond_density is the chance a dependency is taken from the dependencies of
+    an already chosen dependency instead of at random, which closes a diamond. Returns (artifacts, edges) where
+    artifacts are (group_id, artifact_id, packaging, version, in_reactor) tuples and edges (source, target, scope)
+    index triples.
+    """
+    rng = random.Random(seed)
+    depth = max(2, min(depth, nodes))
+    reactor_count = max(1, int(nodes * reactor_ratio))
+    groups = ['org.example.g{}'.format(i) for i in range(0, max(1, nodes // 50))]
+
+    artifacts = []
+    layer_of = []
+    for i in range(0, nodes):
+        in_reactor = i < reactor_count
+        if in_reactor:
+            layer = i * (depth // 2) // reactor_count
+            group_id = 'com.example.reactor'
+        else:
+            layer = depth // 2 + (i - reactor_count) * (depth - depth // 2) // max(1, nodes - reactor_count)
+            group_id = rng.choice(groups)
+        layer_of.append(min(layer, depth - 1))
+        artifacts.append((group_id, 'artifact-{}'.format(i), _weighted_choice(rng, PACKAGINGS),
+                          '{}.{}.{}'.format(rng.randint(0, 5), rng.randint(0, 20), rng.randint(0, 10)), in_reactor))
+
+    # layers grow with the artifact index, so the artifacts deeper than a layer form a suffix of the index range.
+    deeper_start = [nodes] * (depth + 1)
+    for i in range(nodes - 1, -1, -1):
+        deeper_start[layer_of[i]] = i
+    for l in range(depth - 1, -1, -1):
+        deeper_start[l] = min(deeper_start[l], deeper_start[l + 1])
+
+    edges = []
+    dependencies = [()] * nodes
+    for i in range(0, nodes):
+        start = deeper_start[layer_of[i] + 1]
+        if start >= nodes:
+            continue
+        count = min(nodes - start, max(0, int(rng.expovariate(1.0 / fan_out) + 0.5)))
+        chosen = []
+        for _ in range(0, count):
+            target = None
+            if chosen and rng.random() < diamond_density:
+                via = dependencies[rng.choice(chosen)]
+                if via:
+                    target = rng.choice(via)
+            if target is None:
+                target = rng.randrange(start, nodes)
+            if target not in chosen:
+                chosen.append(target)
+                edges.append((i, target, _weighted_choice(rng, scope_mix)))
+        dependencies[i] = chosen
+    return artifacts, edges
+
+
+def write_dot(f, artifacts, edges):
+    """
+    Writes a generated graph in the line-oriented DOT dialect of maven graph plugin.
+    """
+    names = ['"{}:{}:{}"'.format(g, a, v) for g, a, _, v, _ in artifacts]
+    f.write('digraph dependencies {\n')
+    f.write('  graph [\n    label="Synthetic dependency graph"\n    rankdir="TB"\n  ];\n')
+    f.write('  node [\n    fontsize=8\n    shape="rectangle"\n  ];\n')
+    f.write('  edge [\n    fontsize=8\n  ];\n')
+    for name, (group_id, artifact_id, packaging, version, in_reactor) in zip(names, artifacts):
+        label = '\\n'.join((group_id, artifact_id) + ((packaging,) if packaging != 'jar' else ()) + (version,))
+        f.write('  {} [\n    label="{}"\n    fillcolor="{}"\n    style="solid,filled"\n  ];\n'.format(
+            name, label, '#dddddd' if in_reactor else 'white'))
+    for source, target, scope in edges:
+        f.write('  {} -> {} [\n    label="{}"\n    style="solid"\n  ];\n'.format(
+            names[source], names[target], '' if scope == 'compile' else scope))
+    f.write('}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('target_file')
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--fan-out', type=float, default=4.0)
+    parser.add_argument('--diamond-density', type=float, default=0.3)
+    parser.add_argument('--reactor-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    artifacts, edges = generate_graph(args.nodes, args.seed, args.depth, args.fan_out, args.diamond_density,
+                                      args.reactor_ratio)
+    with open(args.target_file, 'w') as f:
+        write_dot(f, artifacts, edges)
+
+
+if __name__ == '__main__':
+    main()
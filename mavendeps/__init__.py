@@ -1,9 +1,34 @@
 #!/usr/bin/env python
 
-from .maven_dot import parse_dot_graph, dot_to_maven_graph, maven_to_dot_graph
+from .maven_dot import parse_dot_graph, dot_to_maven_graph, maven_to_dot_graph, read_maven_graph, \
+    read_artifact_graph, read_merged_maven_graph, read_merged_artifact_graph, write_dot_graph, render_dot_file, \
+    version_conflict_style
 
-from .maven_graph import accept_any, ignore_any, reject_any, filter_artifacts, Artifact, ArtifactDescriptor, \
-    ArtifactDependency, FilterAction
+from .maven_graph import accept_any, ignore_any, reject_any, in_reactor_filter, packaging_filter, batch_filter, \
+    filter_artifacts, snapshot_artifacts, Artifact, ArtifactDescriptor, ArtifactDependency, ArtifactColumns, \
+    FilterAction, FilterCache, FilterDependency, filter_depends_on, configured_as, index_versions, \
+    version_conflict_filter, superseded_version_filter
+
+from .artifact_graph import ArtifactGraph, ArtifactView
+
+from .graph_algorithms import TransitiveClosure
+
+from .query import DependencyQuery
+
+from .versions import VersionIndex
+
+from .transforms import collapse_groups, condense_cycles, transitive_reduction, extract_neighbourhood
+
+from .rules import RuleSet, load_rules
+
+from .graph_cache import read_cached_artifact_graph
+
+from .columnar import graph_to_columns, columns_to_graph, read_npz_graph, write_npz_graph, graph_to_arrow, \
+    arrow_to_graph, read_parquet_graph, write_parquet_graph
+
+from .instrumentation import PipelineRecorder
+
+from .incremental import IncrementalPipeline
 
 __author__ = 'Tony Ganchev'
 __version__ = '1.0'
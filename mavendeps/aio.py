@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+import asyncio
+import hashlib
+import io
+import subprocess
+from collections import OrderedDict
+
+from .maven_dot import read_maven_graph, write_dot_graph
+from .maven_graph import filter_artifacts
+
+__author__ = 'Tony Ganchev'
+
+
+def filtered_dot(data, filter_chain, style_functions):
+    """
+    Reads the DOT text of a maven graph plugin graph, filters it and returns the styled DOT text write_dot_graph
+    produces. This is the CPU-bound part AsyncPipeline runs in its executor.
+    """
+    artifacts = read_maven_graph(io.StringIO(data))
+    if filter_chain:
+        artifacts = filter_artifacts(artifacts, filter_chain)
+    f = io.StringIO()
+    write_dot_graph(artifacts, f, style_functions)
+    return f.getvalue()
+
+
+def _read_text(source_file):
+    with open(source_file, 'r') as f:
+        return f.read()
+
+
+class AsyncPipeline:
+    """
+    Asyncio facade over the read, filter and render pipeline for serving rendered graphs without blocking the event
+    loop. Files get read and graphs get filtered in executor (the loop's default one unless given - a process pool
+    needs picklable filter and style functions), GraphViz runs as an asyncio subprocess.
+
+    Concurrent requests for the same input, filter chain, style functions and format share one computation and
+    finished results are kept in an LRU cache holding up to cache_bytes of output. Cancelling a request only cancels
+    the shared computation once no other request waits for it. A GraphViz process is killed then, executor work
+    already started runs to completion and gets discarded.
+
+    Requires Python 3.7 or newer, unlike the rest of the package.
+    """
+
+    def __init__(self, filter_chain=(), style_functions=(), executor=None, cache_bytes=64 * 1024 * 1024, prog='dot'):
+        self._filter_chain = tuple(filter_chain)
+        self._style_functions = tuple(style_functions)
+        self._executor = executor
+        self._cache_bytes = cache_bytes
+        self._prog = prog
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        # in-flight computations by key as [task, number of waiting requests] lists.
+        self._in_flight = {}
+
+    @property
+    def cached_bytes(self):
+        return self._cached_bytes
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    async def render_file(self, source_file, output_format='svg', filter_chain=None, style_functions=None):
+        """
+        Reads a DOT file generated by maven graph plugin and renders it, see render.
+        """
+        data = await asyncio.get_running_loop().run_in_executor(None, _read_text, source_file)
+        return await self.render(data, output_format, filter_chain, style_functions)
+
+    async def render(self, data, output_format='svg', filter_chain=None, style_functions=None):
+        """
+        Filters and styles the DOT text of a maven graph plugin graph and returns it as bytes laid out by GraphViz in
+        output_format, or as DOT text if output_format is 'dot'. The filter chain and style functions of the pipeline
+        are used unless given. Raises subprocess.CalledProcessError if GraphViz fails.
+        """
+        filter_chain = self._filter_chain if filter_chain is None else tuple(filter_chain)
+        style_functions = self._style_functions if style_functions is None else tuple(style_functions)
+        key = hashlib.sha256(data.encode('utf-8')).hexdigest(), filter_chain, style_functions, output_format
+
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            return result
+
+        entry = self._in_flight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._compute(data, output_format, filter_chain, style_functions))
+            entry = self._in_flight[key] = [task, 0]
+            task.add_done_callback(lambda t: self._finished(key, t))
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # the shield keeps a cancelled request from cancelling the computation other requests wait for.
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not task.done():
+                task.cancel()
+                # let the computation clean up so that no GraphViz process outlives the last request.
+                await asyncio.wait((task,))
+
+    async def _compute(self, data, output_format, filter_chain, style_functions):
+        dot = await asyncio.get_running_loop().run_in_executor(self._executor, filtered_dot, data, filter_chain,
+                                                                style_functions)
+        if output_format == 'dot':
+            return dot.encode('utf-8')
+        process = await asyncio.create_subprocess_exec(self._prog, '-T' + output_format, stdin=subprocess.PIPE,
+                                                       stdout=subprocess.PIPE)
+        try:
+            output, _ = await process.communicate(dot.encode('utf-8'))
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, self._prog)
+        return output
+
+    def _finished(self, key, task):
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if len(result) > self._cache_bytes:
+            return
+        self._cache[key] = result
+        self._cached_bytes += len(result)
+        while self._cached_bytes > self._cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
@@ -0,0 +1,509 @@
+#!/usr/bin/env python
+
+from array import array
+
+from .maven_graph import Artifact, ArtifactDependency, _neighbourhood_versions
+from .scopes import propagate_scopes
+from .versions import VersionIndex
+
+__author__ = 'Tony Ganchev'
+
+SCOPES = ('compile', 'provided', 'runtime', 'test', 'system', 'rsl')
+
+
+class ArtifactGraph(object):
+    """
+    Compact store for a whole Maven artifact graph. Every ArtifactDescriptor is interned to an integer id and edges are
+    kept in flat arrays - source, target, a small-int scope code and a liveness flag per edge. Forward and reverse
+    adjacency are CSR-style indexes over the edge arrays that are rebuilt lazily after edges get added. Removing an edge
+    only clears its liveness flag.
+    """
+
+    def __init__(self):
+        self._descriptors = []
+        self._ids = {}
+        self._in_reactor = bytearray()
+        self._tags = {}
+        self._scopes = list(SCOPES)
+        self._scope_codes = {s: i for i, s in enumerate(SCOPES)}
+        self._edge_sources = array('i')
+        self._edge_targets = array('i')
+        self._edge_scopes = bytearray()
+        self._edge_alive = bytearray()
+        self._dead_edges = 0
+        self._forward = None
+        self._reverse = None
+        self._closures = {}
+        self._effective_scopes = None
+        self._version_index = None
+        # neighbourhood version by artifact id, see Artifact._neighbourhood_version. Drawn on first use.
+        self._neighbourhood_versions = None
+        # edge liveness at the start of the running filter pass and the effective scopes computed from it.
+        self._pass_alive = None
+        self._pass_scopes = None
+        self._read_only = False
+
+    @classmethod
+    def from_arrays(cls, descriptors, in_reactor, scopes, edge_sources, edge_targets, edge_scopes, forward=None,
+                    reverse=None):
+        """
+        Builds a graph around existing flat arrays without copying them - descriptors by id, in_reactor flags, the scope
+        names the edge scope codes index into, the edge endpoints and codes, and optionally the (offsets, edges) CSR
+        forward and reverse indexes. Integer arrays may be read-only memoryviews of C ints, for example over a
+        memory-mapped file. They get copied on the first change that needs to append to them.
+        """
+        graph = cls()
+        graph._descriptors = list(descriptors)
+        graph._ids = {d: i for i, d in enumerate(graph._descriptors)}
+        graph._in_reactor = bytearray(in_reactor)
+        graph._scopes = list(scopes)
+        graph._scope_codes = {s: i for i, s in enumerate(graph._scopes)}
+        graph._edge_sources = edge_sources
+        graph._edge_targets = edge_targets
+        graph._edge_scopes = edge_scopes
+        graph._edge_alive = bytearray(b'\x01') * len(edge_sources)
+        graph._forward = tuple(forward) if forward is not None else None
+        graph._reverse = tuple(reverse) if reverse is not None else None
+        graph._read_only = True
+        return graph
+
+    def __len__(self):
+        return len(self._descriptors)
+
+    @property
+    def edge_count(self):
+        return len(self._edge_sources) - self._dead_edges
+
+    def copy(self):
+        """
+        Returns an independent copy of the graph. Descriptors are shared, the flat arrays are copied wholesale.
+        """
+        graph = ArtifactGraph.__new__(ArtifactGraph)
+        graph._descriptors = list(self._descriptors)
+        graph._ids = self._ids.copy()
+        graph._in_reactor = bytearray(self._in_reactor)
+        graph._tags = {i: set(tags) for i, tags in self._tags.items() if tags}
+        graph._scopes = list(self._scopes)
+        graph._scope_codes = self._scope_codes.copy()
+        graph._edge_sources = array('i', self._edge_sources)
+        graph._edge_targets = array('i', self._edge_targets)
+        graph._edge_scopes = bytearray(self._edge_scopes)
+        graph._edge_alive = bytearray(self._edge_alive)
+        graph._dead_edges = self._dead_edges
+        graph._forward = None if self._forward is None else tuple(array('i', a) for a in self._forward)
+        graph._reverse = None if self._reverse is None else tuple(array('i', a) for a in self._reverse)
+        graph._closures = {}
+        graph._effective_scopes = None
+        graph._version_index = None
+        graph._neighbourhood_versions = list(self._neighbourhood_version_list())
+        graph._pass_alive = None
+        graph._pass_scopes = None
+        graph._read_only = False
+        return graph
+
+    def add_artifact(self, descriptor, in_reactor=False):
+        """
+        Interns the descriptor and returns its id. Adding an already known descriptor returns the existing id.
+        """
+        artifact_id = self._ids.get(descriptor)
+        if artifact_id is None:
+            if self._read_only:
+                self._make_writable()
+            artifact_id = len(self._descriptors)
+            self._ids[descriptor] = artifact_id
+            self._descriptors.append(descriptor)
+            self._in_reactor.append(1 if in_reactor else 0)
+            if self._forward is not None:
+                self._forward[0].append(self._forward[0][-1])
+                self._reverse[0].append(self._reverse[0][-1])
+            if self._neighbourhood_versions is not None:
+                self._neighbourhood_versions.append(next(_neighbourhood_versions))
+            self._effective_scopes = None
+        elif in_reactor and not self._in_reactor[artifact_id]:
+            self._in_reactor[artifact_id] = 1
+            self._effective_scopes = None
+        return artifact_id
+
+    def id_of(self, descriptor):
+        return self._ids[descriptor]
+
+    def descriptor(self, artifact_id):
+        return self._descriptors[artifact_id]
+
+    def in_reactor(self, artifact_id):
+        return self._in_reactor[artifact_id] != 0
+
+    def tags(self, artifact_id):
+        tags = self._tags.get(artifact_id)
+        if tags is None:
+            tags = self._tags[artifact_id] = set()
+        return tags
+
+    def add_dependency(self, source_id, target_id, scope='compile'):
+        if self._read_only:
+            self._make_writable()
+        code = self._scope_codes.get(scope)
+        if code is None:
+            code = self._scope_codes[scope] = len(self._scopes)
+            self._scopes.append(scope)
+        self._edge_sources.append(source_id)
+        self._edge_targets.append(target_id)
+        self._edge_scopes.append(code)
+        self._edge_alive.append(1)
+        self._forward = self._reverse = None
+        self._closures = {}
+        self._effective_scopes = None
+        self._neighbourhood_changed(source_id, target_id)
+
+    def remove_dependency(self, source_id, target_id):
+        """
+        Removes the first live edge from source_id to target_id scanning the shorter of the two adjacency rows.
+        Returns whether an edge got removed.
+        """
+        forward_offsets, forward_edges = self._forward_index()
+        reverse_offsets, reverse_edges = self._reverse_index()
+        forward_degree = forward_offsets[source_id + 1] - forward_offsets[source_id]
+        reverse_degree = reverse_offsets[target_id + 1] - reverse_offsets[target_id]
+        if forward_degree <= reverse_degree:
+            row = forward_edges[forward_offsets[source_id]:forward_offsets[source_id + 1]]
+            other, other_id = self._edge_targets, target_id
+        else:
+            row = reverse_edges[reverse_offsets[target_id]:reverse_offsets[target_id + 1]]
+            other, other_id = self._edge_sources, source_id
+        alive = self._edge_alive
+        for e in row:
+            if alive[e] and other[e] == other_id:
+                alive[e] = 0
+                self._dead_edges += 1
+                self._closures = {}
+                self._effective_scopes = None
+                self._neighbourhood_changed(source_id, target_id)
+                return True
+        return False
+
+    def unlink(self, artifact_id, descriptors):
+        """
+        Removes all edges between the artifact and artifacts whose descriptors are in descriptors.
+        """
+        descriptor_list = self._descriptors
+        alive = self._edge_alive
+        removed = []
+        for (offsets, edges), other in ((self._forward_index(), self._edge_targets),
+                                        (self._reverse_index(), self._edge_sources)):
+            for i in range(offsets[artifact_id], offsets[artifact_id + 1]):
+                e = edges[i]
+                if alive[e] and descriptor_list[other[e]] in descriptors:
+                    alive[e] = 0
+                    removed.append(other[e])
+        if removed:
+            self._dead_edges += len(removed)
+            self._closures = {}
+            self._effective_scopes = None
+            self._neighbourhood_changed(artifact_id, *removed)
+
+    def neighbourhood_version(self, artifact_id):
+        """
+        Returns a value that changes whenever an edge of the artifact gets added or removed. Copies of the graph start
+        out with the values of the original.
+        """
+        return self._neighbourhood_version_list()[artifact_id]
+
+    def _neighbourhood_version_list(self):
+        versions = self._neighbourhood_versions
+        if versions is None:
+            versions = self._neighbourhood_versions = [next(_neighbourhood_versions)
+                                                       for _ in range(0, len(self._descriptors))]
+        return versions
+
+    def _neighbourhood_changed(self, *artifact_ids):
+        versions = self._neighbourhood_versions
+        if versions is not None:
+            for artifact_id in artifact_ids:
+                versions[artifact_id] = next(_neighbourhood_versions)
+
+    def dependencies(self, artifact_id):
+        """
+        Generates (target id, scope) pairs for the live dependencies of an artifact.
+        """
+        offsets, edges = self._forward_index()
+        return self._row(offsets, edges, self._edge_targets, artifact_id)
+
+    def dependents(self, artifact_id):
+        """
+        Generates (source id, scope) pairs for the live dependents of an artifact.
+        """
+        offsets, edges = self._reverse_index()
+        return self._row(offsets, edges, self._edge_sources, artifact_id)
+
+    def all_dependencies(self, artifact_id):
+        """
+        Ids of all artifacts the artifact depends on directly or transitively, in depth-first pre-order. Results are
+        cached until the next edge change.
+        """
+        return self._closure(artifact_id, self.dependencies)
+
+    def all_dependents(self, artifact_id):
+        """
+        Ids of all artifacts depending on the artifact directly or transitively, in depth-first pre-order. Results are
+        cached until the next edge change.
+        """
+        return self._closure(artifact_id, self.dependents)
+
+    def effective_scope(self, artifact_id):
+        """
+        The strongest scope any reactor module pulls the artifact in with or None, see Artifact.effective_scope. The
+        scopes of all artifacts get computed in one pass and cached until the next edge change. During a filter pass
+        that rejected artifacts they are the scopes of the graph as it was at the start of the pass.
+        """
+        if self._pass_alive is not None:
+            if self._pass_scopes is None:
+                self._pass_scopes = self._propagate_scopes(self._pass_alive)
+            return self._pass_scopes[artifact_id]
+        if self._effective_scopes is None:
+            self._effective_scopes = self._propagate_scopes(self._edge_alive)
+        return self._effective_scopes[artifact_id]
+
+    def _propagate_scopes(self, alive):
+        offsets, edges = self._forward_index()
+        targets = self._edge_targets
+        edge_scopes = self._edge_scopes
+        scopes = self._scopes
+        successors = [[(targets[e], scopes[edge_scopes[e]]) for e in edges[offsets[i]:offsets[i + 1]] if alive[e]]
+                      for i in range(0, len(self._descriptors))]
+        return propagate_scopes(successors, (i for i in range(0, len(self._descriptors)) if self._in_reactor[i]))
+
+    def _pin_pass(self, pinned):
+        """
+        Keeps the edge liveness flags of the graph as the effective scopes are to be read at until _end_pass, see
+        Artifact._pin_pass.
+        """
+        if self._pass_alive is None:
+            # build the indexes first, building them compacts the edges and would invalidate the flags.
+            self._forward_index()
+            self._reverse_index()
+            self._pass_alive = bytes(self._edge_alive)
+            pinned.append(self)
+
+    def _end_pass(self):
+        self._pass_alive = None
+        self._pass_scopes = None
+
+    def artifact(self, artifact_id):
+        return ArtifactView(self, artifact_id)
+
+    def artifacts(self):
+        return [ArtifactView(self, i) for i in range(0, len(self._descriptors))]
+
+    @classmethod
+    def from_artifacts(cls, in_artifacts):
+        """
+        Builds a compact graph out of a collection of Artifact instances and their direct neighbours.
+        """
+        graph = cls()
+        in_artifacts = tuple(in_artifacts)
+        for artifact in in_artifacts:
+            graph.add_artifact(artifact.descriptor, artifact.in_reactor)
+        for artifact in in_artifacts:
+            source_id = graph.id_of(artifact.descriptor)
+            if artifact.tags:
+                graph.tags(source_id).update(artifact.tags)
+            for dep in artifact.dependencies:
+                target_id = graph.add_artifact(dep.artifact.descriptor, dep.artifact.in_reactor)
+                graph.add_dependency(source_id, target_id, dep.scope)
+        return graph
+
+    def _make_writable(self):
+        def writable(values):
+            if not isinstance(values, memoryview):
+                return array('i', values)
+            result = array('i')
+            result.frombytes(values.cast('B'))
+            return result
+        self._edge_sources = writable(self._edge_sources)
+        self._edge_targets = writable(self._edge_targets)
+        self._edge_scopes = bytearray(self._edge_scopes)
+        if self._forward is not None:
+            self._forward = tuple(writable(a) for a in self._forward)
+            self._reverse = tuple(writable(a) for a in self._reverse)
+        self._read_only = False
+
+    def _closure(self, artifact_id, row):
+        key = artifact_id, row.__name__
+        closure = self._closures.get(key)
+        if closure is None:
+            seen = {artifact_id}
+            closure = array('i')
+            stack = [row(artifact_id)]
+            while stack:
+                for i, _ in stack[-1]:
+                    if i not in seen:
+                        seen.add(i)
+                        closure.append(i)
+                        stack.append(row(i))
+                        break
+                else:
+                    stack.pop()
+            self._closures[key] = closure
+        return closure
+
+    def _row(self, offsets, edges, other, artifact_id):
+        alive = self._edge_alive
+        scopes = self._scopes
+        edge_scopes = self._edge_scopes
+        for i in range(offsets[artifact_id], offsets[artifact_id + 1]):
+            e = edges[i]
+            if alive[e]:
+                yield other[e], scopes[edge_scopes[e]]
+
+    def _forward_index(self):
+        if self._forward is None:
+            self._build_indexes()
+        return self._forward
+
+    def _reverse_index(self):
+        if self._reverse is None:
+            self._build_indexes()
+        return self._reverse
+
+    def _build_indexes(self):
+        if self._dead_edges:
+            self._compact_edges()
+            # the edge ids a running filter pass pinned are gone, fall back to the current scopes.
+            self._pass_alive = None
+            self._pass_scopes = None
+        self._forward = self._csr(self._edge_sources)
+        self._reverse = self._csr(self._edge_targets)
+
+    def _compact_edges(self):
+        alive = self._edge_alive
+        keep = [e for e in range(0, len(alive)) if alive[e]]
+        self._edge_sources = array('i', (self._edge_sources[e] for e in keep))
+        self._edge_targets = array('i', (self._edge_targets[e] for e in keep))
+        self._edge_scopes = bytearray(self._edge_scopes[e] for e in keep)
+        self._edge_alive = bytearray(b'\x01') * len(keep)
+        self._dead_edges = 0
+
+    def _csr(self, keys):
+        """
+        Counting-sorts the edge ids by the given endpoint array into an (offsets, edges) pair.
+        """
+        offsets = array('i', [0]) * (len(self._descriptors) + 1)
+        for k in keys:
+            offsets[k + 1] += 1
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+        positions = offsets[:-1]
+        edges = array('i', [0]) * len(keys)
+        for e, k in enumerate(keys):
+            edges[positions[k]] = e
+            positions[k] += 1
+        return offsets, edges
+
+
+class ArtifactView(Artifact):
+    """
+    Lightweight Artifact facade over a single node of an ArtifactGraph. Views are created on demand and hold nothing
+    but the graph and the artifact id.
+    """
+
+    def __init__(self, graph, artifact_id):
+        self._graph = graph
+        self._id = artifact_id
+
+    @property
+    def graph(self):
+        return self._graph
+
+    @property
+    def index(self):
+        return self._id
+
+    @property
+    def descriptor(self):
+        return self._graph.descriptor(self._id)
+
+    @property
+    def dependencies(self):
+        graph = self._graph
+        return (ArtifactDependency(ArtifactView(graph, i), scope) for i, scope in graph.dependencies(self._id))
+
+    @property
+    def all_dependencies(self):
+        graph = self._graph
+        return tuple(ArtifactView(graph, i) for i in graph.all_dependencies(self._id))
+
+    @property
+    def dependents(self):
+        graph = self._graph
+        return (ArtifactDependency(ArtifactView(graph, i), scope) for i, scope in graph.dependents(self._id))
+
+    @property
+    def all_dependents(self):
+        graph = self._graph
+        return tuple(ArtifactView(graph, i) for i in graph.all_dependents(self._id))
+
+    @property
+    def effective_scope(self):
+        return self._graph.effective_scope(self._id)
+
+    @property
+    def _neighbourhood_version(self):
+        return self._graph.neighbourhood_version(self._id)
+
+    @property
+    def version_index(self):
+        """
+        The VersionIndex shared by the views of the graph, built from the descriptor column on first use.
+        """
+        graph = self._graph
+        if graph._version_index is None:
+            graph._version_index = VersionIndex(graph._descriptors)
+        return graph._version_index
+
+    @property
+    def _version_index(self):
+        return self._graph._version_index
+
+    @_version_index.setter
+    def _version_index(self, index):
+        self._graph._version_index = index
+
+    @property
+    def tags(self):
+        return self._graph.tags(self._id)
+
+    @property
+    def in_reactor(self):
+        return self._graph.in_reactor(self._id)
+
+    def __str__(self):
+        return '<Artifact {}>'.format(str(self.descriptor))
+
+    def __eq__(self, other):
+        return self.descriptor == other.descriptor if isinstance(other, Artifact) else False
+
+    def add_dependency(self, dep):
+        target_id = self._graph.add_artifact(dep.artifact.descriptor, dep.artifact.in_reactor)
+        self._graph.add_dependency(self._id, target_id, dep.scope)
+
+    def add_dependent(self, dep):
+        source_id = self._graph.add_artifact(dep.artifact.descriptor, dep.artifact.in_reactor)
+        self._graph.add_dependency(source_id, self._id, dep.scope)
+
+    def remove_dependency(self, artifact):
+        self._graph.remove_dependency(self._id, self._graph.id_of(artifact.descriptor))
+
+    def remove_dependent(self, artifact):
+        self._graph.remove_dependency(self._graph.id_of(artifact.descriptor), self._id)
+
+    def _unlink(self, descriptors):
+        self._graph.unlink(self._id, descriptors)
+
+    def _pin_pass(self, pinned):
+        self._graph._pin_pass(pinned)
+
+    def _snapshot(self, copies):
+        graph = copies.get(id(self._graph))
+        if graph is None:
+            graph = copies[id(self._graph)] = self._graph.copy()
+        return ArtifactView(graph, self._id)
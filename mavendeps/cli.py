@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""
+Filters and styles a dependency graph generated by maven graph plugin and writes it as SVG, DOT or JSON.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+
+from .graph_cache import read_cached_artifact_graph
+from .instrumentation import PipelineRecorder
+from .maven_dot import read_maven_graph, write_dot_graph
+from .maven_graph import filter_artifacts
+from .rules import load_rules
+from .transforms import collapse_groups, condense_cycles, extract_neighbourhood, transitive_reduction
+
+__author__ = 'Tony Ganchev'
+
+CACHE_DIR_VARIABLE = 'MAVENDEPS_CACHE_DIR'
+
+
+def _read(source, cache_dir):
+    if source == '-':
+        return read_maven_graph(sys.stdin)
+    if cache_dir:
+        return read_cached_artifact_graph(source, cache_dir).artifacts()
+    return read_maven_graph(source)
+
+
+def write_json_graph(in_artifacts, f):
+    """
+    Writes the artifacts and their dependencies as a JSON document.
+    """
+    json.dump({'artifacts': [{
+        'id': str(a.descriptor),
+        'group_id': a.descriptor.group_id,
+        'artifact_id': a.descriptor.artifact_id,
+        'version': a.descriptor.version,
+        'packaging': a.descriptor.packaging,
+        'classifier': a.descriptor.classifier,
+        'in_reactor': a.in_reactor,
+        'dependencies': [{'id': str(d.artifact.descriptor), 'scope': d.scope} for d in a.dependencies]
+    } for a in in_artifacts]}, f, indent=2)
+    f.write('\n')
+
+
+def _render(artifacts, style_functions, output, output_format, prog):
+    process = subprocess.Popen([prog, '-T' + output_format], stdin=subprocess.PIPE, stdout=output)
+    # Python 2 pipes take the str DOT lines as they are.
+    with process.stdin if str is bytes else io.TextIOWrapper(process.stdin, encoding='utf-8') as dot_input:
+        write_dot_graph(artifacts, dot_input, style_functions)
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, prog)
+
+
+def _write(artifacts, style_functions, args, output):
+    if args.format == 'json':
+        write_json_graph(artifacts, output)
+    elif args.format == 'dot' or args.no_render:
+        write_dot_graph(artifacts, output, style_functions)
+    else:
+        output.flush()
+        _render(artifacts, style_functions, output, args.format, args.prog)
+
+
+def _run(args):
+    filter_rules = [load_rules(f) for f in args.rules + args.filter_rules]
+    style_rules = [load_rules(f) for f in args.rules + args.style_rules]
+    binary = args.format not in ('dot', 'json') and not args.no_render
+
+    artifacts = _read(args.source, args.cache_dir)
+    if args.around:
+        artifacts = extract_neighbourhood(artifacts, args.around, args.depth)
+    if filter_rules:
+        artifacts = filter_artifacts(artifacts, tuple(r.filter for r in filter_rules), fixed_point=args.fixed_point)
+    if args.condense_cycles:
+        artifacts = condense_cycles(artifacts)
+    if args.collapse_group:
+        artifacts = collapse_groups(artifacts, args.collapse_group)
+    if args.reduce:
+        artifacts = transitive_reduction(artifacts)
+    style_functions = tuple(r.style for r in style_rules)
+    if args.output is None:
+        _write(artifacts, style_functions, args, getattr(sys.stdout, 'buffer', sys.stdout) if binary else sys.stdout)
+    else:
+        with open(args.output, 'wb' if binary else 'w') as f:
+            _write(artifacts, style_functions, args, f)
+
+
+def _print_stats(recorder, f):
+    for event in recorder.events:
+        name = event['stage'] if 'filter' not in event else '{} {}'.format(event['stage'], event['filter'])
+        counts = ' '.join('{}={}'.format(k, event[k]) for k in ('artifacts', 'edges') if k in event)
+        f.write('{:<40} {:10.3f}s {}\n'.format(name, event['seconds'], counts))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='mavendeps', description=__doc__)
+    parser.add_argument('source', nargs='?', default='-',
+                        help='DOT file generated by maven graph plugin, standard input by default')
+    parser.add_argument('-o', '--output', help='target file, standard output by default')
+    parser.add_argument('-r', '--rules', action='append', default=[],
+                        help='JSON, YAML or TOML file with filter and style rules, may be repeated')
+    parser.add_argument('--filter-rules', action='append', default=[],
+                        help='rule file whose filter rules only are applied, may be repeated')
+    parser.add_argument('--style-rules', action='append', default=[],
+                        help='rule file whose style rules only are applied, may be repeated')
+    parser.add_argument('--around', action='append', default=[], metavar='PATTERN',
+                        help='only keep artifacts within --depth hops of the artifacts matching the glob, e.g. '
+                             'org.apache.karaf:*; may be repeated')
+    parser.add_argument('--depth', type=int, default=1, help='number of hops --around extends to, 1 by default')
+    parser.add_argument('--fixed-point', action='store_true',
+                        help='re-apply every filter rule file until its rejects no longer change the graph')
+    parser.add_argument('--collapse-group', action='append', default=[], metavar='GROUP_ID',
+                        help='collapse the artifacts of a group id and its subgroups into one node, may be repeated')
+    parser.add_argument('--condense-cycles', action='store_true', help='replace dependency cycles with single nodes')
+    parser.add_argument('--reduce', action='store_true',
+                        help='drop dependencies implied by longer dependency paths (transitive reduction)')
+    parser.add_argument('-T', '--format', choices=('svg', 'dot', 'json'), default='svg', help='output format')
+    parser.add_argument('--no-render', action='store_true',
+                        help='write the DOT text instead of laying it out with GraphViz')
+    parser.add_argument('--prog', default='dot', help='GraphViz executable used for rendering')
+    parser.add_argument('--cache-dir', default=os.environ.get(CACHE_DIR_VARIABLE),
+                        help='directory caching converted input files, ${} by default'.format(CACHE_DIR_VARIABLE))
+    parser.add_argument('--stats', action='store_true',
+                        help='print the time and the remaining artifacts and edges of every stage to standard error')
+    args = parser.parse_args(args)
+
+    try:
+        if args.stats:
+            recorder = PipelineRecorder()
+            with recorder:
+                _run(args)
+            _print_stats(recorder, sys.stderr)
+        else:
+            _run(args)
+    except (IOError, OSError, ValueError, subprocess.CalledProcessError) as e:
+        sys.exit('mavendeps: {}'.format(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+
+import os
+from collections import namedtuple
+
+from .artifact_graph import ArtifactGraph
+from .instrumentation import recorded_stage
+from .maven_graph import ArtifactDescriptor
+
+__author__ = 'Tony Ganchev'
+
+DESCRIPTOR_FIELDS = ('group_id', 'artifact_id', 'version', 'packaging', 'classifier')
+
+# file names of the two tables in a Parquet graph directory.
+NODES_FILE = 'nodes.parquet'
+EDGES_FILE = 'edges.parquet'
+
+GraphColumns = namedtuple('GraphColumns', 'nodes edges')
+
+
+def _numpy():
+    """
+    Imports NumPy on first use so that the graph model loads without it.
+    """
+    import numpy
+    return numpy
+
+
+def _arrow():
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.parquet
+    return pyarrow
+
+
+def _as_graph(graph):
+    return graph if isinstance(graph, ArtifactGraph) else ArtifactGraph.from_artifacts(graph)
+
+
+def _live_edges(graph):
+    """
+    Returns the edge source, target and scope code arrays of the graph as NumPy arrays, dropping removed edges.
+    """
+    numpy = _numpy()
+    if graph._dead_edges:
+        graph._build_indexes()
+    return (numpy.frombuffer(graph._edge_sources, dtype=numpy.intc).astype(numpy.int32),
+            numpy.frombuffer(graph._edge_targets, dtype=numpy.intc).astype(numpy.int32),
+            numpy.frombuffer(graph._edge_scopes, dtype=numpy.uint8).copy())
+
+
+def _encode(values):
+    """
+    Dictionary-encodes strings into an int32 codes array, -1 standing for None, and the list of distinct values.
+    """
+    numpy = _numpy()
+    codes = {}
+    encoded = numpy.fromiter((-1 if v is None else codes.setdefault(v, len(codes)) for v in values), numpy.int32,
+                             len(values))
+    return encoded, list(codes)
+
+
+def _strings(values):
+    numpy = _numpy()
+    return numpy.array(values, dtype=str) if values else numpy.zeros(0, dtype='U1')
+
+
+def _decode(codes, values):
+    return [None if c < 0 else values[c] for c in codes.tolist()]
+
+
+def graph_to_columns(graph):
+    """
+    Exports an ArtifactGraph, or the graph of a collection of Artifact instances, as a node and an edge table of
+    NumPy arrays. Node ids are row numbers in the node table. String columns are dictionary encoded: an int32 codes
+    column named after the field, -1 for a missing classifier, next to a <field>_values string array.
+
+    * nodes - the descriptor fields, in_reactor and the tags of node i as the tags codes from tag_offsets[i] to
+      tag_offsets[i + 1],
+    * edges - source and target node ids and the scope.
+    """
+    numpy = _numpy()
+    graph = _as_graph(graph)
+    with recorded_stage('graph_to_columns') as event:
+        descriptors = graph._descriptors
+        nodes = {}
+        for field in DESCRIPTOR_FIELDS:
+            codes, values = _encode([getattr(d, field) for d in descriptors])
+            nodes[field] = codes
+            nodes[field + '_values'] = _strings(values)
+        nodes['in_reactor'] = numpy.frombuffer(bytes(graph._in_reactor), dtype=numpy.uint8).astype(bool)
+
+        tag_offsets = numpy.zeros(len(descriptors) + 1, dtype=numpy.int32)
+        tag_lists = []
+        for artifact_id, tags in sorted(graph._tags.items()):
+            if tags:
+                tag_offsets[artifact_id + 1] = len(tags)
+                tag_lists.extend(sorted(tags))
+        numpy.cumsum(tag_offsets, out=tag_offsets)
+        nodes['tag_offsets'] = tag_offsets
+        nodes['tags'], tag_values = _encode(tag_lists)
+        nodes['tags_values'] = _strings(tag_values)
+
+        sources, targets, scopes = _live_edges(graph)
+        edges = {'source': sources, 'target': targets, 'scope': scopes, 'scope_values': _strings(graph._scopes)}
+        if event is not None:
+            event['artifacts'] = len(descriptors)
+            event['edges'] = len(sources)
+    return GraphColumns(nodes, edges)
+
+
+def _csr(numpy, keys, node_count):
+    offsets = numpy.zeros(node_count + 1, dtype=numpy.intc)
+    numpy.cumsum(numpy.bincount(keys, minlength=node_count), out=offsets[1:])
+    return memoryview(offsets), memoryview(numpy.argsort(keys, kind='stable').astype(numpy.intc))
+
+
+def _build_graph(descriptors, in_reactor, tags, scopes, sources, targets, scope_codes):
+    """
+    Wraps decoded columns in an ArtifactGraph through ArtifactGraph.from_arrays with the CSR indexes sorted by NumPy
+    rather than counted in Python. tags is a sequence of (node id, tags) pairs.
+    """
+    numpy = _numpy()
+    node_count = len(descriptors)
+    sources = numpy.ascontiguousarray(sources, dtype=numpy.intc)
+    targets = numpy.ascontiguousarray(targets, dtype=numpy.intc)
+    scope_codes = numpy.ascontiguousarray(scope_codes, dtype=numpy.uint8)
+    if not len(sources) == len(targets) == len(scope_codes):
+        raise ValueError('Edge columns differ in length')
+    if len(in_reactor) != node_count:
+        raise ValueError('in_reactor column does not match the node count')
+    for ids in sources, targets:
+        if len(ids) and (ids.min() < 0 or ids.max() >= node_count):
+            raise ValueError('Edge refers to an unknown node')
+    if len(scope_codes) and scope_codes.max() >= len(scopes):
+        raise ValueError('Edge refers to an unknown scope')
+
+    graph = ArtifactGraph.from_arrays(descriptors, numpy.ascontiguousarray(in_reactor, dtype=numpy.uint8), scopes,
+                                      memoryview(sources), memoryview(targets), memoryview(scope_codes),
+                                      _csr(numpy, sources, node_count), _csr(numpy, targets, node_count))
+    for artifact_id, artifact_tags in tags:
+        graph.tags(artifact_id).update(artifact_tags)
+    return graph
+
+
+def columns_to_graph(nodes, edges):
+    """
+    Builds an ArtifactGraph out of the node and edge tables graph_to_columns produces, mappings of column names to
+    arrays. Edge arrays are shared with the graph until it gets changed.
+    """
+    with recorded_stage('columns_to_graph') as event:
+        fields = [_decode(nodes[f], nodes[f + '_values'].tolist()) for f in DESCRIPTOR_FIELDS]
+        descriptors = list(map(ArtifactDescriptor, *fields))
+        tag_offsets = nodes['tag_offsets'].tolist()
+        tag_values = _decode(nodes['tags'], nodes['tags_values'].tolist())
+        tags = [(i, tag_values[tag_offsets[i]:tag_offsets[i + 1]]) for i in range(0, len(descriptors))
+                if tag_offsets[i] != tag_offsets[i + 1]]
+        graph = _build_graph(descriptors, nodes['in_reactor'], tags, edges['scope_values'].tolist(), edges['source'],
+                             edges['target'], edges['scope'])
+        if event is not None:
+            event['artifacts'] = len(graph)
+            event['edges'] = graph.edge_count
+    return graph
+
+
+def write_npz_graph(graph, target_file, compressed=False):
+    """
+    Writes the tables of graph_to_columns to a NumPy .npz file, the node columns prefixed with node_ and the edge
+    columns with edge_.
+    """
+    numpy = _numpy()
+    nodes, edges = graph_to_columns(graph)
+    arrays = {'node_' + k: v for k, v in nodes.items()}
+    arrays.update(('edge_' + k, v) for k, v in edges.items())
+    (numpy.savez_compressed if compressed else numpy.savez)(target_file, **arrays)
+
+
+def read_npz_graph(source_file):
+    """
+    Reads an ArtifactGraph from a file written by write_npz_graph.
+    """
+    numpy = _numpy()
+    with numpy.load(source_file) as data:
+        nodes = {k[len('node_'):]: data[k] for k in data.files if k.startswith('node_')}
+        edges = {k[len('edge_'):]: data[k] for k in data.files if k.startswith('edge_')}
+    return columns_to_graph(nodes, edges)
+
+
+def graph_to_arrow(graph):
+    """
+    Exports an ArtifactGraph, or the graph of a collection of Artifact instances, as a node and an edge pyarrow
+    Table. The node table has an id column, dictionary-typed descriptor fields, in_reactor and a list of tags per
+    node, the edge table has source and target ids and a dictionary-typed scope. Requires pyarrow.
+    """
+    pyarrow = _arrow()
+    numpy = _numpy()
+    nodes, edges = graph_to_columns(graph)
+
+    def dictionary(codes, values):
+        return pyarrow.DictionaryArray.from_arrays(pyarrow.array(codes, mask=codes < 0),
+                                                   pyarrow.array(values.tolist(), type=pyarrow.string()))
+
+    node_columns = {'id': pyarrow.array(numpy.arange(len(nodes['in_reactor']), dtype=numpy.int32))}
+    for field in DESCRIPTOR_FIELDS:
+        node_columns[field] = dictionary(nodes[field], nodes[field + '_values'])
+    node_columns['in_reactor'] = pyarrow.array(nodes['in_reactor'])
+    tag_values = pyarrow.array(_decode(nodes['tags'], nodes['tags_values'].tolist()), type=pyarrow.string())
+    node_columns['tags'] = pyarrow.ListArray.from_arrays(pyarrow.array(nodes['tag_offsets']), tag_values)
+    edge_columns = {'source': pyarrow.array(edges['source']), 'target': pyarrow.array(edges['target']),
+                    'scope': dictionary(edges['scope'].astype(numpy.int32), edges['scope_values'])}
+    return pyarrow.table(node_columns), pyarrow.table(edge_columns)
+
+
+def _arrow_strings(column):
+    """
+    Returns the (codes, values) dictionary encoding of a pyarrow string column with -1 codes for nulls.
+    """
+    pyarrow = _arrow()
+    numpy = _numpy()
+    column = column.combine_chunks() if isinstance(column, pyarrow.ChunkedArray) else column
+    if not pyarrow.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    indices = column.indices
+    if indices.null_count:
+        indices = pyarrow.compute.fill_null(indices, -1)
+    return numpy.asarray(indices.to_numpy(), dtype=numpy.int32), column.dictionary.to_pylist()
+
+
+def arrow_to_graph(nodes, edges):
+    """
+    Builds an ArtifactGraph out of the node and edge pyarrow Tables graph_to_arrow produces. Node ids are row numbers
+    of the node table. Plain string columns are accepted in place of dictionary-typed ones. Requires pyarrow.
+    """
+    numpy = _numpy()
+    with recorded_stage('arrow_to_graph') as event:
+        fields = [_decode(*_arrow_strings(nodes.column(f))) for f in DESCRIPTOR_FIELDS]
+        descriptors = list(map(ArtifactDescriptor, *fields))
+        in_reactor = numpy.asarray(nodes.column('in_reactor').to_numpy(), dtype=bool)
+        tags = ([(i, t) for i, t in enumerate(nodes.column('tags').to_pylist()) if t]
+                if 'tags' in nodes.column_names else ())
+        scope_codes, scopes = _arrow_strings(edges.column('scope'))
+        graph = _build_graph(descriptors, in_reactor, tags, scopes, edges.column('source').to_numpy(),
+                             edges.column('target').to_numpy(), scope_codes)
+        if event is not None:
+            event['artifacts'] = len(graph)
+            event['edges'] = graph.edge_count
+    return graph
+
+
+def write_parquet_graph(graph, target_dir):
+    """
+    Writes the tables of graph_to_arrow as nodes.parquet and edges.parquet into target_dir, creating it if needed.
+    Requires pyarrow.
+    """
+    pyarrow = _arrow()
+    nodes, edges = graph_to_arrow(graph)
+    if not os.path.isdir(target_dir):
+        os.makedirs(target_dir)
+    pyarrow.parquet.write_table(nodes, os.path.join(target_dir, NODES_FILE))
+    pyarrow.parquet.write_table(edges, os.path.join(target_dir, EDGES_FILE))
+
+
+def read_parquet_graph(source_dir):
+    """
+    Reads an ArtifactGraph from a directory written by write_parquet_graph. Requires pyarrow.
+    """
+    pyarrow = _arrow()
+    return arrow_to_graph(pyarrow.parquet.read_table(os.path.join(source_dir, NODES_FILE)),
+                          pyarrow.parquet.read_table(os.path.join(source_dir, EDGES_FILE)))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+__author__ = 'Tony Ganchev'
+
+
+def index_artifacts(in_artifacts, reverse=False):
+    """
+    Numbers the incoming artifacts and everything reachable from them through their dependencies (or dependents if
+    reverse is set). Returns an (artifacts, indexes, successors) triple where artifacts lists the artifacts by number,
+    indexes maps descriptors to numbers and successors holds the numbers of the neighbours of every artifact.
+    """
+    artifacts = []
+    indexes = {}
+    successors = []
+    pending = []
+    for artifact in in_artifacts:
+        if artifact.descriptor not in indexes:
+            indexes[artifact.descriptor] = len(artifacts)
+            artifacts.append(artifact)
+            pending.append(artifact)
+    while pending:
+        artifact = pending.pop()
+        for d in artifact.dependents if reverse else artifact.dependencies:
+            if d.artifact.descriptor not in indexes:
+                indexes[d.artifact.descriptor] = len(artifacts)
+                artifacts.append(d.artifact)
+                pending.append(d.artifact)
+    for artifact in artifacts:
+        successors.append([indexes[d.artifact.descriptor]
+                           for d in (artifact.dependents if reverse else artifact.dependencies)])
+    return artifacts, indexes, successors
+
+
+def strongly_connected_components(successors):
+    """
+    Iterative Tarjan's algorithm over a graph given as a list of successor lists. Returns the components as lists of
+    node numbers in reverse topological order - every component comes after all components reachable from it.
+    """
+    count = len(successors)
+    order = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+    for root in range(0, count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            v, i = work[-1]
+            succ = successors[v]
+            if i < len(succ):
+                work[-1] = v, i + 1
+                w = succ[i]
+                if order[w] == -1:
+                    order[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w] and order[w] < low[v]:
+                    low[v] = order[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == order[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+    return components
+
+
+class TransitiveClosure:
+    """
+    Transitive dependencies (or dependents if reverse is set) of every artifact reachable from the incoming ones,
+    computed in a single pass over the strongly connected component condensation. Every component gets a bitset of
+    the artifacts it reaches, built by OR-ing the bitsets of its successor components in reverse topological order.
+    Like Artifact.all_dependencies an artifact is never part of its own closure.
+    """
+
+    def __init__(self, in_artifacts, reverse=False):
+        self._artifacts, self._indexes, successors = index_artifacts(in_artifacts, reverse)
+        components = strongly_connected_components(successors)
+        component_of = [0] * len(self._artifacts)
+        for c, component in enumerate(components):
+            for v in component:
+                component_of[v] = c
+        reached = [0] * len(components)
+        for c, component in enumerate(components):
+            bits = 0
+            for v in component:
+                for w in successors[v]:
+                    if component_of[w] != c:
+                        bits |= reached[component_of[w]] | (1 << w)
+            if len(component) > 1:
+                for v in component:
+                    bits |= 1 << v
+            reached[c] = bits
+        self._bits = [reached[component_of[v]] & ~(1 << v) for v in range(0, len(self._artifacts))]
+
+    def __contains__(self, artifact):
+        return artifact.descriptor in self._indexes
+
+    def reaches(self, artifact, other):
+        """
+        Checks whether other is in the closure of artifact.
+        """
+        index = self._indexes.get(other.descriptor)
+        return index is not None and (self._bits[self._indexes[artifact.descriptor]] >> index) & 1 == 1
+
+    def size(self, artifact):
+        return bin(self._bits[self._indexes[artifact.descriptor]]).count('1')
+
+    def closure(self, artifact):
+        """
+        Returns the closure of the artifact as a tuple of artifacts.
+        """
+        bits = self._bits[self._indexes[artifact.descriptor]]
+        artifacts = self._artifacts
+        result = []
+        index = 0
+        while bits:
+            chunk = bits & 0xffffffff
+            if chunk:
+                for i in range(0, 32):
+                    if (chunk >> i) & 1:
+                        result.append(artifacts[index + i])
+            bits >>= 32
+            index += 32
+        return tuple(result)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from .artifact_graph import ArtifactGraph
+from .maven_dot import read_artifact_graph
+from .maven_graph import ArtifactDescriptor
+
+__author__ = 'Tony Ganchev'
+
+MAGIC = b'MVNDEPS' + (b'L' if sys.byteorder == 'little' else b'B')
+VERSION = 1
+HEADER = struct.Struct('=8sIIIIII')
+
+
+def _padding(length):
+    return b'\0' * (-length % 8)
+
+
+def _int_bytes(values):
+    values = array('i', values)
+    # array.tobytes is called tostring on Python 2.7.
+    return values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+
+
+def save_graph(graph, cache_file):
+    """
+    Writes an ArtifactGraph to a binary file: an interned string table followed by flat integer arrays for the node
+    fields, the edges and the CSR indexes, each section aligned to 8 bytes. Tags are not persisted. The file is
+    written to a temporary name first and renamed into place.
+    """
+    if graph._dead_edges:
+        graph._build_indexes()
+    forward = graph._forward_index()
+    reverse = graph._reverse_index()
+
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        return string_id
+
+    fields = array('i')
+    for d in graph._descriptors:
+        fields.extend((intern(d.group_id), intern(d.artifact_id), intern(d.version), intern(d.packaging),
+                       -1 if d.classifier is None else intern(d.classifier)))
+    string_blob = '\0'.join(strings).encode('utf-8')
+    scope_blob = '\0'.join(graph._scopes).encode('utf-8')
+
+    sections = [string_blob, scope_blob, _int_bytes(fields), bytes(graph._in_reactor),
+                _int_bytes(graph._edge_sources), _int_bytes(graph._edge_targets), bytes(graph._edge_scopes)]
+    for offsets, edges in forward, reverse:
+        sections.append(_int_bytes(offsets))
+        sections.append(_int_bytes(edges))
+
+    directory = os.path.dirname(cache_file) or '.'
+    fd, temp_file = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, array('i').itemsize, len(graph), len(graph._edge_sources),
+                                len(string_blob), len(scope_blob)))
+            f.write(_padding(HEADER.size))
+            for section in sections:
+                f.write(section)
+                f.write(_padding(len(section)))
+        os.rename(temp_file, cache_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
+def load_graph(cache_file):
+    """
+    Memory-maps a file written by save_graph and wraps its edge and index arrays in an ArtifactGraph without copying
+    them. Only the descriptors get materialized. Returns None for files in an unknown format. Python 2.7 cannot view
+    memory-mapped files as integer arrays, the sections get copied out of the mapping there.
+    """
+    with open(cache_file, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        data = memoryview(data)
+    except TypeError:
+        pass
+    if len(data) < HEADER.size:
+        return None
+    magic, version, itemsize, node_count, edge_count, strings_length, scopes_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or itemsize != array('i').itemsize:
+        return None
+
+    position = [HEADER.size + len(_padding(HEADER.size))]
+
+    def section(length, fmt=None):
+        start = position[0]
+        position[0] += length + len(_padding(length))
+        chunk = data[start:start + length]
+        if not isinstance(chunk, memoryview):
+            return array(fmt, chunk) if fmt is not None else bytearray(chunk)
+        return chunk.cast(fmt) if fmt is not None else chunk
+
+    strings = bytes(section(strings_length)).decode('utf-8').split('\0')
+    scopes = bytes(section(scopes_length)).decode('utf-8').split('\0')
+    fields = section(node_count * 5 * itemsize, 'i').tolist()
+    in_reactor = section(node_count)
+    edge_sources = section(edge_count * itemsize, 'i')
+    edge_targets = section(edge_count * itemsize, 'i')
+    edge_scopes = section(edge_count)
+    forward = section((node_count + 1) * itemsize, 'i'), section(edge_count * itemsize, 'i')
+    reverse = section((node_count + 1) * itemsize, 'i'), section(edge_count * itemsize, 'i')
+
+    descriptors = [ArtifactDescriptor(strings[fields[i]], strings[fields[i + 1]], strings[fields[i + 2]],
+                                      strings[fields[i + 3]], None if fields[i + 4] < 0 else strings[fields[i + 4]])
+                   for i in range(0, node_count * 5, 5)]
+    return ArtifactGraph.from_arrays(descriptors, in_reactor, scopes, edge_sources, edge_targets, edge_scopes,
+                                     forward, reverse)
+
+
+def _content_hash(source_file):
+    digest = hashlib.sha256()
+    with open(source_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_cached_artifact_graph(source_file, cache_dir):
+    """
+    Same as read_artifact_graph but keeps the converted graph in cache_dir keyed by the SHA-256 of the input file.
+    The file's size and modification time are remembered next to the path, so unchanged inputs are not even hashed
+    again.
+    """
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    stat = os.stat(source_file)
+    stamp = '{} {}'.format(stat.st_size, stat.st_mtime)
+    path_key = hashlib.sha256(os.path.abspath(source_file).encode('utf-8')).hexdigest()
+    stamp_file = os.path.join(cache_dir, path_key + '.stamp')
+
+    content_hash = None
+    if os.path.exists(stamp_file):
+        with open(stamp_file, 'r') as f:
+            cached_stamp, _, cached_hash = f.read().rpartition(' ')
+        if cached_stamp == stamp:
+            content_hash = cached_hash
+    if content_hash is None:
+        content_hash = _content_hash(source_file)
+        with open(stamp_file, 'w') as f:
+            f.write('{} {}'.format(stamp, content_hash))
+
+    cache_file = os.path.join(cache_dir, content_hash + '.graph')
+    if os.path.exists(cache_file):
+        graph = load_graph(cache_file)
+        if graph is not None:
+            return graph
+    graph = read_artifact_graph(source_file)
+    save_graph(graph, cache_file)
+    return graph
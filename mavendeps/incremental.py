@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+import pickle
+import types
+
+from .instrumentation import recorded_stage, function_name
+from .maven_dot import DOT_HEADER, DOT_FOOTER, dot_node_line, dot_edge_line, node_id, text_writer
+from .maven_graph import snapshot_artifacts, _filter_pass
+
+__author__ = 'Tony Ganchev'
+
+STATE_VERSION = 2
+
+
+def _signature(artifact):
+    return artifact.in_reactor, frozenset(artifact.tags), \
+        frozenset((d.artifact.descriptor, d.scope) for d in artifact.dependencies)
+
+
+def _function_key(func):
+    """
+    Returns a picklable value identifying what a filter or style function does or None if that cannot be told: the
+    key recorded by configured_as, the state_key of the object a method is bound to, or the module and name of a
+    plain module-level function. Closures, lambdas and callable objects may carry configuration their name does not
+    reflect.
+    """
+    key = getattr(func, 'state_key', None)
+    if key is not None:
+        return key
+    owner = getattr(func, '__self__', None)
+    if owner is not None:
+        owner_key = getattr(owner, 'state_key', None)
+        return None if owner_key is None else (owner_key, func.__name__)
+    if not isinstance(func, types.FunctionType) or func.__closure__ or func.__name__ == '<lambda>' or \
+            '<locals>' in getattr(func, '__qualname__', ''):
+        return None
+    return func.__module__, func.__name__
+
+
+def _current_neighbours(artifact):
+    for d in artifact.dependencies:
+        yield d.artifact.descriptor
+    for d in artifact.dependents:
+        yield d.artifact.descriptor
+
+
+def _neighbourhood(seeds, neighbours, radius):
+    """
+    Returns the descriptors within radius hops of the seeds given a function returning the neighbour descriptors of a
+    descriptor.
+    """
+    reached = set(seeds)
+    frontier = list(reached)
+    for _ in range(0, radius):
+        next_frontier = []
+        for descriptor in frontier:
+            for n in neighbours(descriptor):
+                if n not in reached:
+                    reached.add(n)
+                    next_frontier.append(n)
+        frontier = next_frontier
+    return reached
+
+
+class IncrementalPipeline:
+    """
+    Filters and writes successive versions of the same dependency graph re-evaluating only what changed since the
+    previous update. Artifacts whose reactor flag or dependencies changed, together with their neighbours up to radius
+    hops away in the old and the new graph, are dirty: the filter chain runs for them while the other artifacts replay
+    the actions they got in the previous update. Whenever a filter returns a different action than in the previous
+    update the neighbourhood of the artifact becomes dirty as well.
+    The DOT lines of clean artifacts are reused from the previous update.
+
+    The results match a full filter_artifacts and write_dot_graph run as long as filter and style functions look no
+    further than radius hops from the artifact they get.
+
+    State saved by save_state is only restored by a pipeline with the same state_key and radius. state_key defaults
+    to a key derived from the filter and style functions, which exists only if each of them is a module-level
+    function, a method of an object with a state_key attribute like RuleSet or was created by a factory marked with
+    configured_as.
+    """
+
+    def __init__(self, filter_chain, style_functions=(), radius=1, state_key=None):
+        self._filter_chain = tuple(filter_chain)
+        self._style_functions = tuple(style_functions)
+        self._radius = radius
+        self._state_key = state_key
+        self._reset()
+
+    def _reset(self):
+        self._signatures = {}
+        self._neighbours = {}
+        self._decisions = [{} for _ in self._filter_chain]
+        self._lines = {}
+        self._order = ()
+        self.dirty = frozenset()
+
+    def _replaying(self, filter_func, decisions, dirty, artifacts_by_descriptor):
+        def replay(artifact):
+            descriptor = artifact.descriptor
+            previous = decisions.get(descriptor)
+            if previous is not None and descriptor not in dirty:
+                return previous
+            action = filter_func(artifact)
+            decisions[descriptor] = action
+            if action != previous:
+                # the artifact may now be kept where it was rejected before or the other way around, possibly in a
+                # later pass, so its neighbours may see it appear or disappear.
+                dirty.update(_neighbourhood((descriptor,), lambda d: _current_neighbours(artifacts_by_descriptor[d]),
+                                            self._radius))
+            return action
+        replay.__name__ = function_name(filter_func)
+        return replay
+
+    def update(self, in_artifacts):
+        """
+        Filters the new version of the graph and returns the remaining artifacts the same way filter_artifacts does.
+        The input is left intact.
+        """
+        with recorded_stage('incremental_update') as event:
+            artifacts = snapshot_artifacts(in_artifacts)
+            artifacts_by_descriptor = {a.descriptor: a for a in artifacts}
+            signatures = {}
+            neighbours = {}
+            for artifact in artifacts:
+                signatures[artifact.descriptor] = _signature(artifact)
+                neighbours[artifact.descriptor] = set(_current_neighbours(artifact))
+
+            changed = [d for d, s in signatures.items() if self._signatures.get(d) != s]
+            changed.extend(d for d in self._signatures if d not in signatures)
+            old_neighbours = self._neighbours
+            dirty = _neighbourhood(changed, lambda d: neighbours.get(d, set()) | old_neighbours.get(d, set()),
+                                   self._radius)
+
+            required_artifacts = set()
+            for filter_func, decisions in zip(self._filter_chain, self._decisions):
+                artifacts = _filter_pass(artifacts, self._replaying(filter_func, decisions, dirty,
+                                                                    artifacts_by_descriptor), required_artifacts)
+
+            for decisions in self._decisions:
+                for descriptor in [d for d in decisions if d not in signatures]:
+                    del decisions[descriptor]
+            self._signatures = signatures
+            self._neighbours = neighbours
+            self._update_lines(artifacts, dirty)
+            self.dirty = frozenset(dirty)
+            if event is not None:
+                event['artifacts'] = len(artifacts)
+                event['dirty'] = len(dirty)
+        return tuple(artifacts)
+
+    def _update_lines(self, artifacts, dirty):
+        lines = {}
+        for artifact in artifacts:
+            descriptor = artifact.descriptor
+            cached = self._lines.get(descriptor)
+            if cached is None or descriptor in dirty:
+                node_line = dot_node_line(artifact, self._style_functions)
+            else:
+                node_line = cached[0]
+            edges = tuple((d.artifact.descriptor, d.scope) for d in artifact.dependencies)
+            if cached is None or cached[1] != edges:
+                source = node_id(descriptor)
+                edge_lines = ''.join(dot_edge_line(source, d) for d in artifact.dependencies)
+            else:
+                edge_lines = cached[2]
+            lines[descriptor] = node_line, edges, edge_lines
+        self._lines = lines
+        self._order = tuple(a.descriptor for a in artifacts)
+
+    def write_dot(self, f):
+        """
+        Writes the graph of the last update as write_dot_graph would.
+        """
+        write = text_writer(f)
+        write(DOT_HEADER)
+        for descriptor in self._order:
+            write(self._lines[descriptor][0])
+        for descriptor in self._order:
+            write(self._lines[descriptor][2])
+        write(DOT_FOOTER)
+
+    def _chain_key(self):
+        state_key = self._state_key
+        if state_key is None:
+            keys = tuple(_function_key(f) for f in self._filter_chain + self._style_functions)
+            if None in keys:
+                names = [function_name(f) for f, k in zip(self._filter_chain + self._style_functions, keys)
+                         if k is None]
+                raise ValueError('Cannot tell the configuration of {} apart, pass a state_key to persist the state'
+                                 .format(', '.join(names)))
+            state_key = keys[:len(self._filter_chain)], keys[len(self._filter_chain):]
+        return state_key, self._radius
+
+    def save_state(self, f):
+        """
+        Pickles the state of the last update to the binary file object f so that a later process can continue
+        incrementally from it. Raises ValueError if the pipeline has no state_key and cannot derive one.
+        """
+        pickle.dump((STATE_VERSION, self._chain_key(), self._signatures, self._neighbours, self._decisions,
+                     self._lines, self._order), f, pickle.HIGHEST_PROTOCOL)
+
+    def load_state(self, f):
+        """
+        Restores a state written by save_state. State saved with a different state_key or radius is discarded and the
+        next update runs in full. Returns whether the state was restored. Raises ValueError like save_state.
+        """
+        chain_key = self._chain_key()
+        state = pickle.load(f)
+        if state[0] != STATE_VERSION or state[1] != chain_key:
+            self._reset()
+            return False
+        self._signatures, self._neighbours, self._decisions, self._lines, self._order = state[2:]
+        return True
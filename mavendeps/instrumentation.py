@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+__author__ = 'Tony Ganchev'
+
+_recorders = []
+
+# Python 2.7 has neither time.perf_counter nor threading.get_ident.
+_clock = getattr(time, 'perf_counter', time.time)
+_thread_ident = getattr(threading, 'get_ident', lambda: threading.current_thread().ident)
+
+
+def active_recorder():
+    """
+    Returns the innermost PipelineRecorder currently entered as a context manager or None when instrumentation is off.
+    """
+    return _recorders[-1] if _recorders else None
+
+
+def function_name(func):
+    return getattr(func, '__name__', None) or type(func).__name__
+
+
+def count_edges(artifacts):
+    return sum(1 for a in artifacts for _ in a.dependencies)
+
+
+class PipelineRecorder:
+    """
+    Opt-in instrumentation of the reduce pipeline. While a recorder is entered as a context manager the pipeline
+    functions report every stage they run as a dict holding the stage name, its start offset and wall time in seconds
+    and, depending on the stage, the calls made to each filter or style function, the actions returned by the filters
+    the re-evaluation rounds of fixed point filter passes and the artifacts and edges left afterwards. Finished stages
+    are kept in events and passed to every callback.
+    """
+
+    def __init__(self, *callbacks):
+        self.callbacks = list(callbacks)
+        self.events = []
+        self._origin = _clock()
+
+    def __enter__(self):
+        _recorders.append(self)
+        return self
+
+    def __exit__(self, *_):
+        _recorders.remove(self)
+        return False
+
+    @contextmanager
+    def stage(self, name, **args):
+        event = {'stage': name}
+        event.update(args)
+        event['thread'] = _thread_ident()
+        start = _clock()
+        event['start'] = start - self._origin
+        try:
+            yield event
+        finally:
+            event['seconds'] = _clock() - start
+            self.events.append(event)
+            for callback in self.callbacks:
+                callback(event)
+
+    def to_dict(self):
+        return {'events': self.events}
+
+    def dump_json(self, f):
+        json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def chrome_trace(self):
+        """
+        Returns the events as complete ('X') events of the Chrome trace event format viewable in chrome://tracing or
+        Perfetto.
+        """
+        pid = os.getpid()
+        trace_events = []
+        for event in self.events:
+            name = event['stage'] if 'filter' not in event else '{} {}'.format(event['stage'], event['filter'])
+            trace_events.append({
+                'name': name,
+                'cat': 'mavendeps',
+                'ph': 'X',
+                'ts': event['start'] * 1e6,
+                'dur': event['seconds'] * 1e6,
+                'pid': pid,
+                'tid': event['thread'],
+                'args': {k: v for k, v in event.items() if k not in ('stage', 'start', 'seconds', 'thread')}
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, f):
+        json.dump(self.chrome_trace(), f, default=str)
+
+
+@contextmanager
+def recorded_stage(name, **args):
+    """
+    Records the enclosed block as a stage of the active recorder yielding the stage's event dict, or None when no
+    recorder is active.
+    """
+    recorder = active_recorder()
+    if recorder is None:
+        yield None
+    else:
+        with recorder.stage(name, **args) as event:
+            yield event
+
+
+def counted_filter(event, filter_func):
+    """
+    Wraps a filter function, and its batch implementation if any, so that its calls and the actions it returns are
+    tallied in event.
+    """
+    calls = event.setdefault('calls', {})
+    actions = event.setdefault('actions', {})
+    name = function_name(filter_func)
+
+    def counted(artifact):
+        action = filter_func(artifact)
+        calls[name] = calls.get(name, 0) + 1
+        actions[action] = actions.get(action, 0) + 1
+        return action
+
+    batch_func = getattr(filter_func, 'filter_batch', None)
+    if batch_func is not None:
+        def counted_batch(columns):
+            result = batch_func(columns)
+            calls[name] = calls.get(name, 0) + 1
+            for action, count in Counter(list(result)).items():
+                actions[action] = actions.get(action, 0) + count
+            return result
+        counted.filter_batch = counted_batch
+    counted.__name__ = name
+    return counted
+
+
+def counted_style_functions(event, style_functions):
+    """
+    Wraps style functions so that their calls and the time spent in each are accumulated in event.
+    """
+    calls = event.setdefault('calls', {})
+    seconds = event.setdefault('function_seconds', {})
+
+    def counted(style_function):
+        name = function_name(style_function)
+
+        def style(artifact, node):
+            start = _clock()
+            try:
+                return style_function(artifact, node)
+            finally:
+                calls[name] = calls.get(name, 0) + 1
+                seconds[name] = seconds.get(name, 0.0) + _clock() - start
+        return style
+
+    return tuple(counted(s) for s in style_functions)
@@ -1,8 +1,16 @@
 #!/usr/bin/env python
 
-from pydot import *
+import glob
+import io
+import os
+import re
+from collections import OrderedDict
 
 from .maven_graph import *
+from .maven_graph import _share_version
+from .artifact_graph import ArtifactGraph
+from .instrumentation import recorded_stage, counted_style_functions, count_edges
+from .scopes import SCOPE_WEIGHTS, stronger_scope
 
 __author__ = 'Tony Ganchev'
 
@@ -38,14 +46,22 @@ def parse_artifact_descriptor(label):
     return ArtifactDescriptor(group_id, artifact_id, version, packaging, classifier)
 
 
+def _pydot():
+    """
+    Imports pydot, and pyparsing with it, on first use so that the graph model loads without them.
+    """
+    import pydot
+    return pydot
+
+
 def graph_node():
-    node = Node('graph')
+    node = _pydot().Node('graph')
     node.set('rankdir', 'LR')
     return node
 
 
 def default_node():
-    node = Node('node')
+    node = _pydot().Node('node')
     node.set_shape('rect')
     # node.add_style('solid')
     node.add_style('filled')
@@ -55,7 +71,7 @@ def default_node():
 
 
 def edge_node():
-    node = Node('edge')
+    node = _pydot().Node('edge')
     node.set_fontname('Tahoma')
     node.set_fontsize(10)
     return node
@@ -65,87 +81,476 @@ def node_id(artifact_id):
     return '"' + str(artifact_id) + '"'
 
 
-def parse_dot_graph(source_file):
-    with open(source_file, 'r') as f:
-        data = f.read()
-    graph = dot_parser.parse_dot_data(data)
+def parse_dot_data(data):
+    graph = _pydot().dot_parser.parse_dot_data(data)
     return graph[0] if graph is not None else None
 
 
-SCOPE_WEIGHTS = {
-    'test': 0,
-    'runtime': 1,
-    'system': 3,
-    'provided': 2,
-    'compile': 4,
-    'rsl': 1
-}
+def parse_dot_graph(source_file):
+    with recorded_stage('parse_dot_graph', source_file=source_file):
+        with open(source_file, 'r') as f:
+            data = f.read()
+        graph = parse_dot_data(data)
+    return graph
 
 
-def stronger_scope(lhs, rhs):
-    return lhs if SCOPE_WEIGHTS[lhs] > SCOPE_WEIGHTS[rhs] else rhs
+def _add_dependency(dependencies, source, destination, scope):
+    source_dependencies = dependencies.setdefault(source, {})
+    if destination not in source_dependencies:
+        source_dependencies[destination] = scope
+    else:
+        source_dependencies[destination] = stronger_scope(source_dependencies[destination], scope)
 
 
-def dot_to_maven_graph(in_graph):
-    artifacts_by_descriptor = {}
-    old_to_new_nodes = {}
+class MavenGraphBuilder:
+    """
+    Accumulates the nodes and edges of a maven graph plugin DOT graph and turns them into Artifact instances. Node
+    names, labels and fill colors are expected in their raw quoted DOT form.
+    """
 
+    def __init__(self):
+        self._artifacts_by_descriptor = {}
+        self._descriptors_by_name = {}
+        # edges between node names of this builder, and edges between descriptors, see _resolve.
+        self._dependencies = {}
+        self._resolved = {}
+
+    def add_node(self, name, label, fillcolor):
+        if name in ('graph', 'node', 'edge'):
+            return
+        descriptor = parse_artifact_descriptor(label)
+        in_reactor = fillcolor == '"#dddddd"'
+        self._artifacts_by_descriptor[descriptor] = Artifact(descriptor, in_reactor)
+        self._descriptors_by_name[name] = descriptor
+
+    def add_edge(self, source, destination, label):
+        if label is None:
+            label = ''
+        elif label.startswith('"') and label.endswith('"'):
+            label = label[1:-1]
+        scope = 'compile' if label == '' else label
+        _add_dependency(self._dependencies, source, destination, scope)
+
+    def _resolve(self):
+        """
+        Moves the edges collected so far from node names over to the descriptors the names stand for and returns all
+        edges by source and destination descriptor. Node names only identify artifacts within a single file.
+        """
+        descriptors_by_name = self._descriptors_by_name
+        for source, sd in self._dependencies.items():
+            for destination, scope in sd.items():
+                _add_dependency(self._resolved, descriptors_by_name[source], descriptors_by_name[destination], scope)
+        self._dependencies = {}
+        return self._resolved
+
+    def merge(self, other):
+        """
+        Adds the nodes and edges collected by another builder. Nodes are matched by descriptor, an artifact is in the
+        reactor if either builder says so and parallel edges keep the stronger scope.
+        """
+        resolved = self._resolve()
+        for descriptor, other_artifact in other._artifacts_by_descriptor.items():
+            artifact = self._artifacts_by_descriptor.get(descriptor)
+            if artifact is None or not artifact.in_reactor:
+                self._artifacts_by_descriptor[descriptor] = other_artifact
+        for source, od in other._resolve().items():
+            for destination, scope in od.items():
+                _add_dependency(resolved, source, destination, scope)
+        return self
+
+    def build(self):
+        artifacts_by_descriptor = self._artifacts_by_descriptor
+        _share_version(artifacts_by_descriptor.values())
+        for source, sd in self._resolve().items():
+            for destination, scope in sd.items():
+                artifacts_by_descriptor[source].add_dependency(
+                    ArtifactDependency(artifacts_by_descriptor[destination], scope))
+
+        artifacts = [a for _, a in artifacts_by_descriptor.items()]
+        index_versions(artifacts)
+        return artifacts
+
+    def build_graph(self):
+        """
+        Same as build() but produces a compact ArtifactGraph instead of individual Artifact instances.
+        """
+        graph = ArtifactGraph()
+        for descriptor, artifact in self._artifacts_by_descriptor.items():
+            graph.add_artifact(descriptor, artifact.in_reactor)
+        for source, sd in self._resolve().items():
+            source_id = graph.id_of(source)
+            for destination, scope in sd.items():
+                graph.add_dependency(source_id, graph.id_of(destination), scope)
+        return graph
+
+
+def _feed_dot_graph(builder, in_graph):
     for node in in_graph.get_nodes():
-        node_name = node.get_name()
-        if node_name not in ('graph', 'node', 'edge'):
-            node_label = node.get_label()
-            descriptor = parse_artifact_descriptor(node_label)
-            in_reactor = node.get_fillcolor() == '"#dddddd"'
-            artifact = Artifact(descriptor, in_reactor)
-            artifacts_by_descriptor[descriptor] = artifact
-            old_to_new_nodes[node_name] = descriptor
-
-    dependencies = {}
+        builder.add_node(node.get_name(), node.get_label(), node.get_fillcolor())
     for edge in in_graph.get_edges():
-        label = edge.get_label()[1:-1]
+        builder.add_edge(edge.get_source(), edge.get_destination(), edge.get_label())
+    return builder
 
-        scope = 'compile' if label == '' else label
 
-        source = old_to_new_nodes[edge.get_source()]
-        destination = old_to_new_nodes[edge.get_destination()]
+def _record_artifacts(event, artifacts):
+    if event is not None:
+        event['artifacts'] = len(artifacts)
+        event['edges'] = count_edges(artifacts)
+
+
+def dot_to_maven_graph(in_graph):
+    with recorded_stage('dot_to_maven_graph') as event:
+        artifacts = _feed_dot_graph(MavenGraphBuilder(), in_graph).build()
+        _record_artifacts(event, artifacts)
+    return artifacts
+
+
+class UnsupportedDotSyntax(Exception):
+    """
+    Raised by the streaming reader when the DOT input leaves the dialect emitted by maven graph plugin.
+    """
+    pass
+
+
+DOT_GRAPH_START_REGEX = re.compile(r'\s*(strict\s+)?digraph(\s+("[^"]*"|\w+))?\s*\{\s*$')
+DOT_DEFAULTS_START_REGEX = re.compile(r'\s*(?P<name>graph|node|edge)\s*\[\s*$')
+DOT_NODE_START_REGEX = re.compile(r'\s*(?P<name>"[^"]*")\s*\[\s*$')
+DOT_EDGE_START_REGEX = re.compile(r'\s*(?P<source>"[^"]*")\s*->\s*(?P<destination>"[^"]*")\s*\[\s*$')
+DOT_ATTRIBUTE_REGEX = re.compile(r'\s*(?P<key>\w+)\s*=\s*(?P<value>"([^"\\]|\\.)*"|[^\s",;\]]+)\s*[,;]?\s*$')
+DOT_STATEMENT_END_REGEX = re.compile(r'\s*\]\s*;?\s*$')
+DOT_GRAPH_END_REGEX = re.compile(r'\s*\}\s*$')
+
 
-        if source not in dependencies:
-            dependencies[source] = {}
-        if destination not in dependencies[source]:
-            dependencies[source][destination] = scope
+def read_dot_statements(lines):
+    """
+    Streams the node and edge statements out of the lines of a DOT graph written by maven graph plugin. Yields
+    (source, destination, attributes) tuples where destination is None for nodes. Raises UnsupportedDotSyntax for
+    anything outside the restricted line-oriented dialect the plugin emits.
+    """
+    started = False
+    statement = None
+    attributes = None
+    for line in lines:
+        if statement is not None:
+            m = DOT_ATTRIBUTE_REGEX.match(line)
+            if m:
+                attributes[m.group('key')] = m.group('value')
+            elif DOT_STATEMENT_END_REGEX.match(line):
+                if statement[0] is not None:
+                    yield statement[0], statement[1], attributes
+                statement = None
+            else:
+                raise UnsupportedDotSyntax(line)
+        elif not line.strip():
+            pass
+        elif not started:
+            if not DOT_GRAPH_START_REGEX.match(line):
+                raise UnsupportedDotSyntax(line)
+            started = True
+        else:
+            m = DOT_EDGE_START_REGEX.match(line)
+            if m:
+                statement = m.group('source'), m.group('destination')
+                attributes = {}
+                continue
+            m = DOT_NODE_START_REGEX.match(line)
+            if m:
+                statement = m.group('name'), None
+                attributes = {}
+                continue
+            if DOT_DEFAULTS_START_REGEX.match(line):
+                statement = None, None
+                attributes = {}
+            elif DOT_GRAPH_END_REGEX.match(line):
+                started = None
+            else:
+                raise UnsupportedDotSyntax(line)
+    if started is not None or statement is not None:
+        raise UnsupportedDotSyntax('unexpected end of graph')
+
+
+def _seekable(f):
+    seekable = getattr(f, 'seekable', None)
+    if seekable is not None:
+        return seekable()
+    try:
+        f.tell()
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _recorded_lines(f, consumed):
+    for line in iter(f.readline, ''):
+        consumed.append(line)
+        yield line
+
+
+def _read_dot_stream(f):
+    # A non-seekable stream cannot be rewound for pydot, so the lines the streaming reader consumed are kept instead.
+    consumed = None if _seekable(f) else []
+    builder = MavenGraphBuilder()
+    try:
+        for source, destination, attributes in read_dot_statements(f if consumed is None else
+                                                                   _recorded_lines(f, consumed)):
+            if destination is None:
+                builder.add_node(source, attributes.get('label'), attributes.get('fillcolor'))
+            else:
+                builder.add_edge(source, destination, attributes.get('label'))
+    except UnsupportedDotSyntax:
+        if consumed is None:
+            f.seek(0)
+            data = f.read()
+        else:
+            data = ''.join(consumed) + f.read()
+        with recorded_stage('parse_dot_graph'):
+            graph = parse_dot_data(data)
+        return _feed_dot_graph(MavenGraphBuilder(), graph)
+    return builder
+
+
+def _read_dot_file(source_file):
+    if hasattr(source_file, 'read'):
+        return _read_dot_stream(source_file)
+    with open(source_file, 'r') as f:
+        return _read_dot_stream(f)
+
+
+def read_maven_graph(source_file):
+    """
+    Reads a DOT file generated by maven graph plugin straight into a list of Artifact instances without building a
+    pydot graph first. Input outside the plugin's dialect is handed over to pydot and dot_to_maven_graph. source_file
+    is either a file name or a text file object such as standard input.
+    """
+    with recorded_stage('read_maven_graph', source_file=source_file) as event:
+        artifacts = _read_dot_file(source_file).build()
+        _record_artifacts(event, artifacts)
+    return artifacts
+
+
+def read_artifact_graph(source_file):
+    """
+    Same as read_maven_graph but produces a compact ArtifactGraph.
+    """
+    with recorded_stage('read_artifact_graph', source_file=source_file) as event:
+        graph = _read_dot_file(source_file).build_graph()
+        if event is not None:
+            event['artifacts'] = len(graph)
+            event['edges'] = graph.edge_count
+    return graph
+
+
+def expand_sources(sources):
+    """
+    Expands directories to the .dot files directly inside them and glob patterns to the files they match. Plain file
+    names are kept as they are. Every file is listed once in the order it was first found.
+    """
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            files.extend(sorted(glob.glob(os.path.join(source, '*.dot'))))
+        elif glob.has_magic(source):
+            files.extend(sorted(glob.glob(source)))
         else:
-            dependencies[source][destination] = stronger_scope(
-                dependencies[source][destination], scope)
+            files.append(source)
+    seen = set()
+    return [f for f in files if not (f in seen or seen.add(f))]
+
+
+def _merged_builder(sources, processes):
+    files = expand_sources(sources)
+    with recorded_stage('merge_dot_files', files=len(files)):
+        builder = MavenGraphBuilder()
+        if len(files) > 1 and processes != 1:
+            from multiprocessing import Pool
+            pool = Pool(processes)
+            try:
+                for partial in pool.imap(_read_dot_file, files):
+                    builder.merge(partial)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for source_file in files:
+                builder.merge(_read_dot_file(source_file))
+    return builder
+
+
+def read_merged_maven_graph(sources, processes=None):
+    """
+    Reads all DOT files named by sources (see expand_sources) in parallel using up to processes worker processes and
+    merges them into one list of Artifact instances. Artifacts are deduplicated by descriptor and dependencies listed
+    in several files keep the stronger scope.
+    """
+    return _merged_builder(sources, processes).build()
 
-    for source, sd in dependencies.items():
-        for destination, scope in sd.items():
-            artifacts_by_descriptor[source].add_dependency(
-                ArtifactDependency(artifacts_by_descriptor[destination]))
 
-    return [a for _, a in artifacts_by_descriptor.items()]
+def read_merged_artifact_graph(sources, processes=None):
+    """
+    Same as read_merged_maven_graph but produces a compact ArtifactGraph.
+    """
+    return _merged_builder(sources, processes).build_graph()
 
 
 def apply_style_functions(artifact, node, style_functions):
+    """
+    Applies the style functions to a node. Style functions either call the node's setters or return a dict of
+    attributes.
+    """
     for style_function in style_functions:
-        style_function(artifact, node)
+        attributes = style_function(artifact, node)
+        if attributes:
+            for name, value in attributes.items():
+                node.set(name, value)
+
+
+def version_conflict_style(fillcolor='"#ffcccc"'):
+    """
+    Creates a style function filling the nodes of artifacts present in more than one version with fillcolor.
+    """
+    @configured_as(('version_conflict_style', fillcolor))
+    def version_conflict(artifact, node):
+        if artifact.version_index.is_conflicting(artifact.descriptor):
+            node.set('fillcolor', fillcolor)
+    return version_conflict
 
 
 def maven_to_dot_graph(in_artifacts, style_functions):
-    graph = Dot()
-    graph.add_node(graph_node())
-    graph.add_node(default_node())
-    graph.add_node(edge_node())
-
-    artifacts = {a.descriptor: a for a in in_artifacts}
-    for _, artifact in artifacts.items():
-        node = Node(node_id(artifact.descriptor))
-        node.set_label(artifact_label(artifact.descriptor))
-        apply_style_functions(artifact, node, style_functions)
-        graph.add_node(node)
-    for _, artifact in artifacts.items():
-        for dep in artifact.dependencies:
-            edge = Edge(node_id(artifact.descriptor), node_id(dep.artifact.descriptor))
-            if dep.scope != 'compile':
-                edge.set_label(dep.scope)
-            graph.add_edge(edge)
+    with recorded_stage('maven_to_dot_graph') as event:
+        if event is not None:
+            style_functions = counted_style_functions(event, style_functions)
+        pydot = _pydot()
+        graph = pydot.Dot()
+        graph.add_node(graph_node())
+        graph.add_node(default_node())
+        graph.add_node(edge_node())
+
+        artifacts = {a.descriptor: a for a in in_artifacts}
+        for _, artifact in artifacts.items():
+            node = pydot.Node(node_id(artifact.descriptor))
+            node.set_label(artifact_label(artifact.descriptor))
+            apply_style_functions(artifact, node, style_functions)
+            graph.add_node(node)
+        for _, artifact in artifacts.items():
+            for dep in artifact.dependencies:
+                edge = pydot.Edge(node_id(artifact.descriptor), node_id(dep.artifact.descriptor))
+                if dep.scope != 'compile':
+                    edge.set_label(dep.scope)
+                graph.add_edge(edge)
+        if event is not None:
+            event['artifacts'] = len(artifacts)
     return graph
+
+
+class NodeAttributes:
+    """
+    Collects the attributes of a node or edge written by write_dot_graph. Stands in for a pydot Node in style functions
+    supporting set(), get(), add_style() and the set_<attribute>() and get_<attribute>() shorthands.
+    """
+
+    def __init__(self):
+        self._attributes = OrderedDict()
+
+    @property
+    def attributes(self):
+        return self._attributes
+
+    def set(self, name, value):
+        self._attributes[name] = value
+
+    def get(self, name):
+        return self._attributes.get(name)
+
+    def add_style(self, style):
+        current = self._attributes.get('style')
+        self._attributes['style'] = style if current is None else '{},{}'.format(current, style)
+
+    def __getattr__(self, name):
+        if name.startswith('set_'):
+            return lambda value: self.set(name[4:], value)
+        if name.startswith('get_'):
+            return lambda: self.get(name[4:])
+        raise AttributeError(name)
+
+
+DOT_ID_REGEX = re.compile(r'^([a-zA-Z_][a-zA-Z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?))$')
+
+
+def dot_value(value):
+    """
+    Formats an attribute value the way pydot does - numbers and identifiers as they are, already quoted strings
+    untouched and everything else quoted.
+    """
+    value = str(value)
+    if DOT_ID_REGEX.match(value) or (len(value) > 1 and value[0] == '"' and value[-1] == '"'):
+        return value
+    return '"{}"'.format(value.replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _dot_attributes(attributes):
+    if not attributes:
+        return ''
+    return ' [{}]'.format(', '.join('{}={}'.format(k, dot_value(v)) for k, v in attributes.items()))
+
+
+DOT_HEADER = 'digraph G {\n' \
+             'graph [rankdir=LR];\n' \
+             'node [shape=rect, style=filled, fontname=Tahoma, fontsize=10];\n' \
+             'edge [fontname=Tahoma, fontsize=10];\n'
+DOT_FOOTER = '}\n'
+
+
+def text_writer(f):
+    """
+    Returns the write method of f for the str DOT lines. On Python 2 text streams such as io.StringIO only take unicode
+    so the lines get decoded first.
+    """
+    if str is bytes and isinstance(f, io.TextIOBase):
+        return lambda text: f.write(text.decode('utf-8'))
+    return f.write
+
+
+def dot_node_line(artifact, style_functions):
+    node = NodeAttributes()
+    node.set('label', artifact_label(artifact.descriptor))
+    apply_style_functions(artifact, node, style_functions)
+    return '{}{};\n'.format(node_id(artifact.descriptor), _dot_attributes(node.attributes))
+
+
+def dot_edge_line(source, dep):
+    label = '  [label={}]'.format(dot_value(dep.scope)) if dep.scope != 'compile' else ''
+    return '{} -> {}{};\n'.format(source, node_id(dep.artifact.descriptor), label)
+
+
+def write_dot_graph(in_artifacts, f, style_functions=(), external_edges=True):
+    """
+    Streams the same graph maven_to_dot_graph builds straight to the file object f as DOT text without creating any
+    pydot objects. Style functions receive a NodeAttributes instance in place of a pydot Node. Unless external_edges is
+    set, edges to artifacts outside in_artifacts are left out.
+    """
+    with recorded_stage('write_dot_graph') as event:
+        if event is not None:
+            style_functions = counted_style_functions(event, style_functions)
+        write = text_writer(f)
+        write(DOT_HEADER)
+
+        artifacts = OrderedDict((a.descriptor, a) for a in in_artifacts)
+        for _, artifact in artifacts.items():
+            write(dot_node_line(artifact, style_functions))
+        for _, artifact in artifacts.items():
+            source = node_id(artifact.descriptor)
+            for dep in artifact.dependencies:
+                if not external_edges and dep.artifact.descriptor not in artifacts:
+                    continue
+                write(dot_edge_line(source, dep))
+        write(DOT_FOOTER)
+        if event is not None:
+            event['artifacts'] = len(artifacts)
+
+
+def render_dot_file(source_file, target_file, output_format='svg', prog='dot'):
+    """
+    Lays out a DOT file with the GraphViz executable prog and writes the result in the given format.
+    """
+    import subprocess
+    subprocess.check_call([prog, '-T' + output_format, '-o', target_file, source_file])
@@ -1,19 +1,36 @@
 #!/usr/bin/env python
 
+from itertools import count
+from weakref import WeakValueDictionary
+
+from .instrumentation import recorded_stage, counted_filter, count_edges, function_name
+from .scopes import effective_scopes, propagate_scopes
+from .versions import VersionIndex
+
 __author__ = 'Tony Ganchev'
 
 
-class ArtifactDescriptor:
+class ArtifactDescriptor(object):
     """
-    Identifies a Maven artifact.
+    Identifies a Maven artifact. Descriptors are immutable and interned - constructing a descriptor with the
+    coordinates of one that is still alive returns the existing instance, so equal descriptors are normally identical
+    and compare by identity. The hash is computed once from the coordinate tuple.
     """
 
-    def __init__(self, group_id, artifact_id, version, packaging='jar', classifier=None):
-        self._group_id = group_id
-        self._artifact_id = artifact_id
-        self._version = version
-        self._packaging = packaging
-        self._classifier = classifier
+    __slots__ = ('_group_id', '_artifact_id', '_version', '_packaging', '_classifier', '_key', '_hash', '__weakref__')
+
+    _interned = WeakValueDictionary()
+
+    def __new__(cls, group_id, artifact_id, version, packaging='jar', classifier=None):
+        key = (group_id, artifact_id, version, packaging, classifier)
+        descriptor = cls._interned.get(key)
+        if descriptor is None:
+            descriptor = object.__new__(cls)
+            for name, value in zip(('_group_id', '_artifact_id', '_version', '_packaging', '_classifier', '_key',
+                                    '_hash'), key + (key, hash(key))):
+                object.__setattr__(descriptor, name, value)
+            cls._interned[key] = descriptor
+        return descriptor
 
     @property
     def group_id(self):
@@ -40,13 +57,121 @@ class ArtifactDescriptor:
         return '{}:{}:{}:{}'.format(self._group_id, self._artifact_id, packaging, self._version)
 
     def __eq__(self, other):
-        return str(self) == str(other) if isinstance(other, ArtifactDescriptor) else False
+        if self is other:
+            return True
+        return self._key == other._key if isinstance(other, ArtifactDescriptor) else False
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ArtifactDescriptor is immutable')
+
+    def __reduce__(self):
+        return ArtifactDescriptor, self._key
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _closure(artifact, neighbours):
+    """
+    Depth-first pre-order walk over the artifacts reachable from artifact through the neighbours function. Every
+    artifact is visited once, so diamonds produce no duplicates and cycles terminate. The artifact itself is not part
+    of the result.
+    """
+    seen = {artifact.descriptor}
+    result = []
+    stack = [iter(neighbours(artifact))]
+    while stack:
+        for d in stack[-1]:
+            a = d.artifact
+            if a.descriptor not in seen:
+                seen.add(a.descriptor)
+                result.append(a)
+                stack.append(iter(neighbours(a)))
+                break
+        else:
+            stack.pop()
+    return tuple(result)
+
+
+def _component(artifact):
+    """
+    Returns the artifacts connected to artifact through dependencies in either direction, artifact included.
+    """
+    seen = {artifact.descriptor}
+    component = [artifact]
+    pending = [artifact]
+    while pending:
+        a = pending.pop()
+        for d in a.dependencies:
+            if d.artifact.descriptor not in seen:
+                seen.add(d.artifact.descriptor)
+                component.append(d.artifact)
+                pending.append(d.artifact)
+        for d in a.dependents:
+            if d.artifact.descriptor not in seen:
+                seen.add(d.artifact.descriptor)
+                component.append(d.artifact)
+                pending.append(d.artifact)
+    return component
+
+
+class _GraphVersion(object):
+    """
+    Modification count shared by the artifacts of one graph. Cached transitive closures and effective scopes are only
+    valid for the count they were computed at. When an edge connects two graphs their counts get merged union-find
+    style, the surviving count continuing above both so that no earlier cached value of either graph matches it.
+    """
+
+    __slots__ = ('value', 'parent', 'pass_value', 'pass_rejected')
+
+    def __init__(self):
+        self.value = 0
+        self.parent = None
+        # the value at the start of the running filter pass and the artifacts it rejected so far, see _pin_pass.
+        self.pass_value = None
+        self.pass_rejected = None
+
+    def root(self):
+        """
+        Returns the version this one got merged into, pointing every version on the way straight at it.
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        version = self
+        while version.parent is not None and version.parent is not root:
+            version.parent, version = root, version.parent
+        return root
+
+    def _end_pass(self):
+        self.pass_value = None
+        self.pass_rejected = None
+
 
+# source of neighbourhood versions. Values are unique process-wide, so a value identifies one state of the direct
+# dependencies and dependents of an artifact, shared only with its snapshots until either side changes.
+_neighbourhood_versions = count()
 
-class Artifact:
+
+def _share_version(artifacts):
+    """
+    Makes the freshly created artifacts of one graph share a single graph version.
+    """
+    version = _GraphVersion()
+    for artifact in artifacts:
+        artifact._graph_version = version
+
+
+class Artifact(object):
     """
     Holds an artifact with all its Artifact dependencies
     """
@@ -57,6 +182,37 @@ class Artifact:
         self._dependents = []
         self._tags = set()
         self._in_reactor = in_reactor
+        self._all_dependencies = None
+        self._all_dependents = None
+        self._effective_scope = None
+        self._version_index = None
+        self._graph_version = _GraphVersion()
+        self._neighbourhood_version = next(_neighbourhood_versions)
+
+    def _version(self):
+        """
+        Returns the graph version of this artifact, following merges.
+        """
+        version = self._graph_version
+        if version.parent is not None:
+            version = self._graph_version = version.root()
+        return version
+
+    def _modified(self):
+        self._version().value += 1
+        self._neighbourhood_version = next(_neighbourhood_versions)
+
+    def _connected(self, other):
+        """
+        Records an edge change between this artifact and other, merging their graph versions if they differ.
+        """
+        version = self._version()
+        other_version = other._version()
+        if other_version is not version:
+            version.value = max(version.value, other_version.value)
+            other_version.parent = version
+        version.value += 1
+        self._neighbourhood_version = next(_neighbourhood_versions)
 
     @property
     def descriptor(self):
@@ -68,10 +224,13 @@ class Artifact:
 
     @property
     def all_dependencies(self):
-        for d in self._dependencies:
-            yield d.artifact
-            for a in d.artifact.all_dependencies:
-                yield a
+        """
+        All artifacts this one depends on directly or transitively, each listed once in depth-first pre-order.
+        """
+        version = self._version().value
+        if self._all_dependencies is None or self._all_dependencies[0] != version:
+            self._all_dependencies = version, _closure(self, lambda a: a.dependencies)
+        return self._all_dependencies[1]
 
     @property
     def dependents(self):
@@ -79,10 +238,44 @@ class Artifact:
 
     @property
     def all_dependents(self):
-        for d in self._dependents:
-            yield d.artifact
-            for a in d.artifact.all_dependents:
-                yield a
+        """
+        All artifacts depending on this one directly or transitively, each listed once in depth-first pre-order.
+        """
+        version = self._version().value
+        if self._all_dependents is None or self._all_dependents[0] != version:
+            self._all_dependents = version, _closure(self, lambda a: a.dependents)
+        return self._all_dependents[1]
+
+    @property
+    def effective_scope(self):
+        """
+        The strongest scope any reactor module pulls this artifact in with, directly or transitively through Maven's
+        scope mediation, or None if no module does. The scopes of the whole weakly connected component get computed
+        and cached together. Filter functions see the scopes of the graph as it was at the start of their pass, like
+        batch filters do, so the scopes get computed at most once per pass no matter how many artifacts it rejects.
+        """
+        version = self._version()
+        key = version.value if version.pass_value is None else version.pass_value
+        if self._effective_scope is None or self._effective_scope[0] != key:
+            if version.pass_value is None:
+                component = _component(self)
+                scopes = effective_scopes(component)
+                for artifact in component:
+                    artifact._effective_scope = key, scopes[artifact.descriptor]
+            else:
+                _pass_start_scopes(self, version.pass_rejected, key)
+        return self._effective_scope[1]
+
+    @property
+    def version_index(self):
+        """
+        The VersionIndex shared by the artifacts of the graph. Graphs read from DOT files and the working copies of
+        filter_artifacts get theirs up front, for other artifacts it gets built over the weakly connected component on
+        first use.
+        """
+        if self._version_index is None:
+            index_versions(_component(self))
+        return self._version_index
 
     @property
     def tags(self):
@@ -96,20 +289,23 @@ class Artifact:
         return '<Artifact {}>'.format(str(self._descriptor))
 
     def __eq__(self, other):
-        return str(self._descriptor) == str(other.descriptor) if isinstance(other, Artifact) else False
+        return self._descriptor == other.descriptor if isinstance(other, Artifact) else False
 
     def add_dependency(self, dep):
         self._dependencies.append(dep)
+        self._connected(dep.artifact)
         dep.artifact.add_dependent(ArtifactDependency(self, dep.scope))
 
     def add_dependent(self, dep):
         self._dependents.append(dep)
+        self._connected(dep.artifact)
 
     def remove_dependency(self, artifact):
         for d in self._dependencies:
             if d.artifact == artifact:
                 # print('{} dropping dependency to {}'.format(self._descriptor, d.artifact.descriptor))
                 self._dependencies.remove(d)
+                self._modified()
                 d.artifact.remove_dependent(self)
                 break
 
@@ -118,8 +314,110 @@ class Artifact:
             if d.artifact == artifact:
                 # print('{} dropping dependency from {}'.format(self._descriptor, d.artifact.descriptor))
                 self._dependents.remove(d)
+                self._modified()
                 break
 
+    def _unlink(self, descriptors):
+        """
+        Drops all dependencies and dependents whose artifact descriptor is in descriptors in a single pass over each
+        adjacency list.
+        """
+        self._dependencies = [d for d in self._dependencies if d.artifact.descriptor not in descriptors]
+        self._dependents = [d for d in self._dependents if d.artifact.descriptor not in descriptors]
+        self._modified()
+
+    def _pin_pass(self, pinned):
+        """
+        Called by a filter pass right before it rejects this artifact. The first reject of a pass in a graph pins the
+        graph version the effective scopes are read at and appends the version to pinned, every reject gets recorded.
+        """
+        version = self._version()
+        if version.pass_value is None:
+            version.pass_value = version.value
+            version.pass_rejected = []
+            pinned.append(version)
+        version.pass_rejected.append(self)
+
+    def _snapshot(self, copies):
+        """
+        Copies the artifacts reachable from this one without recursion. Descriptors are shared, tags and adjacency get
+        copied. copies maps id() of the already copied artifacts to their copies and is updated in place.
+        """
+        if id(self) in copies:
+            return copies[id(self)]
+        reached = []
+        pending = [self]
+        version = _GraphVersion()
+        while pending:
+            artifact = pending.pop()
+            if id(artifact) in copies:
+                continue
+            copy = Artifact(artifact._descriptor, artifact._in_reactor)
+            copy._tags = set(artifact._tags)
+            copy._graph_version = version
+            copy._neighbourhood_version = artifact._neighbourhood_version
+            copies[id(artifact)] = copy
+            reached.append(artifact)
+            for d in artifact._dependencies:
+                if id(d.artifact) not in copies:
+                    pending.append(d.artifact)
+            for d in artifact._dependents:
+                if id(d.artifact) not in copies:
+                    pending.append(d.artifact)
+        for artifact in reached:
+            copy = copies[id(artifact)]
+            copy._dependencies = [ArtifactDependency(copies[id(d.artifact)], d.scope) for d in artifact._dependencies]
+            copy._dependents = [ArtifactDependency(copies[id(d.artifact)], d.scope) for d in artifact._dependents]
+        return copies[id(self)]
+
+
+def _pass_start_scopes(artifact, rejected, key):
+    """
+    Computes the effective scopes of the graph as it was at the start of the running filter pass for the component of
+    artifact and the artifacts rejected during the pass and caches them under key. Rejected artifacts keep their own
+    adjacency lists, so every edge removed during the pass is still listed by whichever of its ends got rejected first.
+    """
+    removed_dependencies = {}
+    for r in rejected:
+        for d in r._dependents:
+            removed_dependencies.setdefault(id(d.artifact), []).append((r, d.scope))
+    indexes = {}
+    nodes = []
+    for node in [artifact] + rejected:
+        if id(node) not in indexes:
+            indexes[id(node)] = len(nodes)
+            nodes.append(node)
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        i += 1
+        for d in node._dependencies + node._dependents:
+            if id(d.artifact) not in indexes:
+                indexes[id(d.artifact)] = len(nodes)
+                nodes.append(d.artifact)
+    successors = [[(indexes[id(d.artifact)], d.scope) for d in node._dependencies] +
+                  [(indexes[id(r)], scope) for r, scope in removed_dependencies.get(id(node), ())] for node in nodes]
+    scopes = propagate_scopes(successors, (v for v, node in enumerate(nodes) if node._in_reactor))
+    for node, scope in zip(nodes, scopes):
+        node._effective_scope = key, scope
+
+
+def _link_artifacts(artifacts, dependencies):
+    """
+    Sets the adjacency of freshly created artifacts in bulk given a list of (artifact number, scope) dependency lists,
+    creating the mirroring dependents.
+    """
+    _share_version(artifacts)
+    for artifact in artifacts:
+        artifact._dependencies = []
+        artifact._dependents = []
+        artifact._neighbourhood_version = next(_neighbourhood_versions)
+    for artifact, artifact_dependencies in zip(artifacts, dependencies):
+        for w, scope in artifact_dependencies:
+            target = artifacts[w]
+            artifact._dependencies.append(ArtifactDependency(target, scope))
+            target._dependents.append(ArtifactDependency(artifact, scope))
+
 
 class ArtifactDependency:
     """
@@ -163,45 +461,373 @@ class FilterAction:
         raise NotImplemented
 
 
-def filter_artifacts(in_artifacts, filter_chain):
+def snapshot_artifacts(in_artifacts):
     """
-    Generates a set of Maven artifacts from an incoming set of artifacts by
-    passing the incoming set through a chain of filter functions.
-    """
-    from sys import getrecursionlimit, setrecursionlimit
-    rl = getrecursionlimit()
-    setrecursionlimit(10000)
-    from copy import deepcopy
-    artifacts = [a for a in deepcopy(in_artifacts)]
-    setrecursionlimit(rl)
-
-    # descriptors of the artifacts that need to be preserved.
-    required_artifacts = set()
-    for filter_func in filter_chain:
-        # filter_name = filter_func.__name__
-        # print('{}: applying for {} artifact(s).'.format(filter_name, len(artifacts)))
+    Creates an independent copy of the graph the incoming artifacts belong to, preserving their order. The immutable
+    descriptors are shared between the original and the copy, only adjacency and tags get copied. Unlike deepcopy
+    this does not recurse and therefore works for dependency chains of any depth.
+    """
+    copies = {}
+    artifacts = [a._snapshot(copies) for a in in_artifacts]
+    index_versions(artifacts)
+    return artifacts
+
+
+def index_versions(artifacts):
+    """
+    Builds a VersionIndex over the artifacts and makes it their version_index. Returns the index.
+    """
+    index = VersionIndex(a.descriptor for a in artifacts)
+    for artifact in artifacts:
+        artifact._version_index = index
+    return index
+
+
+def _forget_version(artifact):
+    index = artifact._version_index
+    if index is not None:
+        index.discard(artifact.descriptor)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ArtifactColumns:
+    """
+    Columnar view over a list of artifacts handed to batch filter functions. Every descriptor field as well as
+    in_reactor is available as a NumPy array built on first access.
+    """
+
+    def __init__(self, artifacts):
+        self._artifacts = artifacts
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._artifacts)
+
+    @property
+    def artifacts(self):
+        return self._artifacts
+
+    @property
+    def group_id(self):
+        return self._column('group_id')
+
+    @property
+    def artifact_id(self):
+        return self._column('artifact_id')
+
+    @property
+    def version(self):
+        return self._column('version')
+
+    @property
+    def packaging(self):
+        return self._column('packaging')
+
+    @property
+    def classifier(self):
+        return self._column('classifier')
+
+    @property
+    def in_reactor(self):
+        column = self._columns.get('in_reactor')
+        if column is None:
+            column = self._columns['in_reactor'] = _numpy().fromiter((a.in_reactor for a in self._artifacts), bool,
+                                                                     len(self._artifacts))
+        return column
+
+    def fill(self, action):
+        """
+        Returns an action vector assigning the same action to every artifact.
+        """
+        return _numpy().full(len(self._artifacts), action, dtype=object)
+
+    def select(self, mask, action):
+        """
+        Returns an action vector assigning action where mask is set and FilterAction.no_action elsewhere.
+        """
+        return _numpy().where(mask, action, FilterAction.no_action).astype(object)
+
+    def _column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            values = [getattr(a.descriptor, name) for a in self._artifacts]
+            column = self._columns[name] = _numpy().array(values, dtype=object if name == 'classifier' else None)
+        return column
+
+
+class FilterDependency:
+    """
+    Declares what the action of a filter function depends on, see filter_depends_on. artifact filters only look at
+    the descriptor, the reactor flag and the tags of the artifact, neighbours filters also at its direct dependencies
+    and dependents with their reactor flags and scopes and graph filters at anything else.
+    """
+    artifact = 'artifact'
+    neighbours = 'neighbours'
+    graph = 'graph'
+
+    def __init__(self):
+        raise NotImplemented
+
+
+def filter_depends_on(dependency):
+    """
+    Decorator declaring the FilterDependency of a filter function. FilterCache only caches the results of filters
+    declared to depend on the artifact or its neighbours.
+    """
+    def decorate(filter_func):
+        filter_func.filter_depends_on = dependency
+        return filter_func
+    return decorate
+
+
+def configured_as(key):
+    """
+    Decorator recording a picklable key for the configuration of a filter or style function created by a factory, so
+    that IncrementalPipeline can tell the functions of two factory calls apart when persisting its state.
+    """
+    def decorate(func):
+        func.state_key = key
+        return func
+    return decorate
+
+
+class FilterCache:
+    """
+    Remembers the actions filter functions returned so that repeated filter_artifacts runs with different filter
+    chains over the same graph evaluate every filter once per artifact. Results are keyed by the filter function and
+    the descriptor, reactor flag and tags of the artifact - and for neighbours filters also by its neighbourhood
+    version, which changes with every edge added to or removed from the artifact and is carried over to the working
+    copies of filter_artifacts, so they get re-evaluated once rejects changed the neighbourhood. Filters without a
+    FilterDependency declaration, graph filters and batch filters are always evaluated.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        self._results = {}
+
+    def cached(self, filter_func):
+        """
+        Returns a filter function consulting the cache before calling filter_func, or filter_func itself if its
+        results cannot be cached.
+        """
+        dependency = getattr(filter_func, 'filter_depends_on', FilterDependency.graph)
+        if dependency == FilterDependency.graph or hasattr(filter_func, 'filter_batch'):
+            return filter_func
+        neighbours = dependency == FilterDependency.neighbours
+        results = self._results
+
+        def cached_filter(artifact):
+            tags = artifact.tags
+            key = filter_func, artifact.descriptor, artifact.in_reactor, frozenset(tags) if tags else None
+            if neighbours:
+                key += artifact._neighbourhood_version,
+            action = results.get(key)
+            if action is None:
+                self.misses += 1
+                action = results[key] = filter_func(artifact)
+            else:
+                self.hits += 1
+            return action
+        cached_filter.__name__ = function_name(filter_func)
+        return cached_filter
+
+
+def batch_filter(batch_func):
+    """
+    Decorator attaching a batch implementation to a filter function. batch_func receives an ArtifactColumns instance
+    for all artifacts still subject to filtering and returns a vector with one FilterAction per artifact.
+    filter_artifacts prefers the batch implementation whenever NumPy is available. Batch filters see the graph as it is
+    at the start of their pass and their rejects are applied in one bulk step afterwards, so they should not depend on
+    the neighbours of the artifacts.
+    """
+    def decorate(filter_func):
+        filter_func.filter_batch = batch_func
+        return filter_func
+    return decorate
+
+
+def _detach_artifacts(rejected, affected=None):
+    """
+    Removes all edges between the rejected artifacts (a dict by descriptor) and the rest of the graph visiting every
+    affected neighbour once. The remaining neighbours get appended to the affected list if one is given.
+    """
+    neighbours = {}
+    for artifact in rejected.values():
+        for d in artifact.dependencies:
+            neighbours.setdefault(d.artifact.descriptor, d.artifact)
+        for d in artifact.dependents:
+            neighbours.setdefault(d.artifact.descriptor, d.artifact)
+    for descriptor, artifact in neighbours.items():
+        if descriptor not in rejected:
+            artifact._unlink(rejected)
+            if affected is not None:
+                affected.append(artifact)
+
+
+def _apply_batch_filter(artifacts, batch_func, required_artifacts, affected=None):
+    numpy = _numpy()
+    pending = [a for a in artifacts if a.descriptor not in required_artifacts]
+    actions = numpy.asarray(batch_func(ArtifactColumns(pending)), dtype=object)
+    for i in numpy.flatnonzero(actions == FilterAction.accept):
+        required_artifacts.add(pending[i].descriptor)
+    rejected = {pending[i].descriptor: pending[i] for i in numpy.flatnonzero(actions == FilterAction.reject)}
+    if not rejected:
+        return artifacts
+    _detach_artifacts(rejected, affected)
+    for artifact in rejected.values():
+        _forget_version(artifact)
+    return [a for a in artifacts if a.descriptor not in rejected]
+
+
+def _filter_pass(artifacts, filter_func, required_artifacts, affected=None):
+    """
+    Runs a filter over the artifacts once. The neighbours left behind by rejected artifacts get appended to the
+    affected list if one is given.
+    """
+    batch_func = getattr(filter_func, 'filter_batch', None)
+    if batch_func is not None and _numpy() is not None:
+        return _apply_batch_filter(artifacts, batch_func, required_artifacts, affected)
+    # graphs whose effective scopes got pinned to the start of the pass by a reject.
+    pinned = []
+    try:
         for artifact_idx in range(0, len(artifacts)):
             artifact = artifacts[artifact_idx]
             if artifact.descriptor not in required_artifacts:
                 filter_action = filter_func(artifact)
-                # print('{}: {} {}'.format(filter_name, filter_action, artifact.descriptor))
                 if filter_action == FilterAction.no_action:
                     pass
                 elif filter_action == FilterAction.accept:
                     required_artifacts.add(artifact.descriptor)
                 elif filter_action == FilterAction.reject:
                     artifacts[artifact_idx] = None
+                    artifact._pin_pass(pinned)
+                    _forget_version(artifact)
+                    if affected is not None:
+                        affected.extend(d.artifact for d in artifact.dependencies)
+                        affected.extend(d.artifact for d in artifact.dependents)
                     for dependency in tuple(artifact.dependencies):
                         dependency.artifact.remove_dependent(artifact)
                     for dependent in tuple(artifact.dependents):
                         dependent.artifact.remove_dependency(artifact)
-            else:
-                # print('{}: skipping {}'.format(filter_name, artifact.descriptor))
-                pass
-        artifacts = [artifact for artifact in artifacts if artifact is not None]
+    finally:
+        for graph in pinned:
+            graph._end_pass()
+    return [artifact for artifact in artifacts if artifact is not None]
+
+
+def _converges(filter_func):
+    """
+    Whether a filter may change its mind when neighbours of an artifact get rejected - all but the ones declared to
+    depend on the artifact alone and batch filters.
+    """
+    if getattr(filter_func, 'filter_depends_on', None) == FilterDependency.artifact:
+        return False
+    return getattr(filter_func, 'filter_batch', None) is None or _numpy() is None
+
+
+def _fixed_point_pass(artifacts, filter_func, required_artifacts, event=None):
+    """
+    Runs a filter to a fixed point: after a regular pass the artifacts that lost a neighbour to a reject and are not
+    accepted yet get evaluated again, so do the ones losing neighbours to rejects during that round and so on until a
+    round rejects nothing.
+    """
+    affected = []
+    artifacts = _filter_pass(artifacts, filter_func, required_artifacts, affected)
+    remaining = None
+    rounds = 0
+    while affected:
+        if remaining is None:
+            remaining = {a.descriptor: a for a in artifacts}
+        # graph views are created per access, pick the instances the working copy keeps.
+        pending = {}
+        for artifact in affected:
+            descriptor = artifact.descriptor
+            if descriptor in remaining and descriptor not in required_artifacts:
+                pending.setdefault(descriptor, remaining[descriptor])
+        if not pending:
+            break
+        rounds += 1
+        affected = []
+        kept = _filter_pass(list(pending.values()), filter_func, required_artifacts, affected)
+        if len(kept) != len(pending):
+            for descriptor in set(pending) - {a.descriptor for a in kept}:
+                del remaining[descriptor]
+    if event is not None:
+        event['rounds'] = rounds
+    return artifacts if remaining is None else [a for a in artifacts if a.descriptor in remaining]
+
+
+def filter_artifacts(in_artifacts, filter_chain, cache=None, fixed_point=False):
+    """
+    Generates a set of Maven artifacts from an incoming set of artifacts by
+    passing the incoming set through a chain of filter functions. A FilterCache
+    passed as cache is consulted for and updated with the filter results.
+
+    With fixed_point every filter runs to a fixed point before the next one
+    starts: artifacts that lose a neighbour to one of its rejects get evaluated
+    by the same filter again until its rejects no longer change the graph. This
+    replaces chaining the same neighbour-dependent filter several times and
+    only costs work proportional to the rejects after the first pass.
+    """
+    with recorded_stage('filter_artifacts') as event:
+        artifacts = snapshot_artifacts(in_artifacts)
+        filter_chain = tuple(filter_chain)
+        # decided before wrapping, cached and counted filters do not carry the declarations.
+        converging = [fixed_point and _converges(f) for f in filter_chain]
+        if cache is not None:
+            filter_chain = [cache.cached(f) for f in filter_chain]
+
+        # descriptors of the artifacts that need to be preserved.
+        required_artifacts = set()
+        for index, filter_func in enumerate(filter_chain):
+            if event is None:
+                if converging[index]:
+                    artifacts = _fixed_point_pass(artifacts, filter_func, required_artifacts)
+                else:
+                    artifacts = _filter_pass(artifacts, filter_func, required_artifacts)
+                continue
+            with recorded_stage('filter_pass', filter=function_name(filter_func), index=index) as pass_event:
+                counted = counted_filter(pass_event, filter_func)
+                if converging[index]:
+                    artifacts = _fixed_point_pass(artifacts, counted, required_artifacts, pass_event)
+                else:
+                    artifacts = _filter_pass(artifacts, counted, required_artifacts)
+                pass_event['artifacts'] = len(artifacts)
+                pass_event['edges'] = count_edges(artifacts)
+        if event is not None:
+            event['artifacts'] = len(artifacts)
+            event['edges'] = count_edges(artifacts)
     return tuple(artifacts)
 
 
+def _no_action_batch(columns):
+    return columns.fill(FilterAction.no_action)
+
+
+def _accept_batch(columns):
+    return columns.fill(FilterAction.accept)
+
+
+def _reject_batch(columns):
+    return columns.fill(FilterAction.reject)
+
+
+@filter_depends_on(FilterDependency.artifact)
+@batch_filter(_no_action_batch)
 def ignore_any(_):
     """
     Stock filter function that skips processing the passed artifact. The artifact
@@ -210,6 +836,8 @@ def ignore_any(_):
     return FilterAction.no_action
 
 
+@filter_depends_on(FilterDependency.artifact)
+@batch_filter(_accept_batch)
 def accept_any(_):
     """
     Stock filter function that accepts the passed artifact. The artifact remains
@@ -218,9 +846,64 @@ def accept_any(_):
     return FilterAction.accept
 
 
+@filter_depends_on(FilterDependency.artifact)
+@batch_filter(_reject_batch)
 def reject_any(_):
     """
     Stock filter function that rejects the passed artifact. The artifact is
     removed from the resulting graph and is not a subject to further filtering.
     """
     return FilterAction.reject
+
+
+def in_reactor_filter(action=FilterAction.accept):
+    """
+    Creates a stock filter function returning action for artifacts that are part of the reactor and
+    FilterAction.no_action for the rest.
+    """
+    @configured_as(('in_reactor_filter', action))
+    @filter_depends_on(FilterDependency.artifact)
+    @batch_filter(lambda columns: columns.select(columns.in_reactor, action))
+    def in_reactor(artifact):
+        return action if artifact.in_reactor else FilterAction.no_action
+    return in_reactor
+
+
+def packaging_filter(packaging, action=FilterAction.accept):
+    """
+    Creates a stock filter function returning action for artifacts with the given packaging and
+    FilterAction.no_action for the rest.
+    """
+    @configured_as(('packaging_filter', packaging, action))
+    @filter_depends_on(FilterDependency.artifact)
+    @batch_filter(lambda columns: columns.select(columns.packaging == packaging, action))
+    def packaging_equals(artifact):
+        return action if artifact.descriptor.packaging == packaging else FilterAction.no_action
+    return packaging_equals
+
+
+def version_conflict_filter(action=FilterAction.accept):
+    """
+    Creates a stock filter function returning action for artifacts present in more than one version and
+    FilterAction.no_action for the rest.
+    """
+    @configured_as(('version_conflict_filter', action))
+    @filter_depends_on(FilterDependency.graph)
+    def version_conflict(artifact):
+        return action if artifact.version_index.is_conflicting(artifact.descriptor) else FilterAction.no_action
+    return version_conflict
+
+
+def superseded_version_filter(action=FilterAction.reject):
+    """
+    Creates a stock filter function returning action for artifacts a newer version of which is present and
+    FilterAction.no_action for the rest. Rejecting them collapses every version conflict to its newest version.
+    """
+    @configured_as(('superseded_version_filter', action))
+    @filter_depends_on(FilterDependency.graph)
+    def superseded_version(artifact):
+        descriptor = artifact.descriptor
+        newest_version = artifact.version_index.newest_version(descriptor)
+        return action if newest_version is not None and newest_version != descriptor.version \
+            else FilterAction.no_action
+    return superseded_version
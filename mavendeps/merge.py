@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""
+Merges the DOT files maven graph plugin produced for several modules or reactor slices into one graph.
+"""
+
+import argparse
+import sys
+
+from .maven_dot import read_merged_maven_graph, write_dot_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def plugin_style(artifact, node):
+    """
+    Labels and fills nodes the way maven graph plugin does so the merged output reads back into the same graph.
+    """
+    descriptor = artifact.descriptor
+    packaging = descriptor.packaging if descriptor.classifier is None else '{}:{}'.format(descriptor.packaging,
+                                                                                         descriptor.classifier)
+    attributes = {'label': '{}\n{}\n{}\n{}'.format(descriptor.group_id, descriptor.artifact_id, packaging,
+                                                   descriptor.version)}
+    if artifact.in_reactor:
+        attributes['fillcolor'] = '#dddddd'
+    return attributes
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m mavendeps.merge', description=__doc__)
+    parser.add_argument('sources', nargs='+', help='DOT files, directories holding DOT files or glob patterns')
+    parser.add_argument('-o', '--output', help='target DOT file, standard output by default')
+    parser.add_argument('-j', '--processes', type=int, help='worker processes, one per CPU by default')
+    args = parser.parse_args(args)
+
+    artifacts = read_merged_maven_graph(args.sources, args.processes)
+    if args.output is None:
+        write_dot_graph(artifacts, sys.stdout, (plugin_style,))
+    else:
+        with open(args.output, 'w') as f:
+            write_dot_graph(artifacts, f, (plugin_style,))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+
+from collections import namedtuple
+
+from .graph_algorithms import index_artifacts
+from .scopes import SCOPE_MEDIATION, stronger_scope
+
+__author__ = 'Tony Ganchev'
+
+Explanation = namedtuple('Explanation', 'module path scope')
+
+
+def mediated_scope(scopes):
+    """
+    Folds the scopes of the edges along a dependency path into the scope the last artifact ends up with in the first
+    one according to Maven's dependency scope table. Returns None if the artifact is not pulled in along the path.
+    """
+    scopes = iter(scopes)
+    scope = next(scopes, None)
+    for s in scopes:
+        scope = SCOPE_MEDIATION.get(scope, {}).get(s)
+        if scope is None:
+            return None
+    return scope
+
+
+class DependencyQuery:
+    """
+    Answers path and provenance questions over the incoming artifacts and everything they depend on. The artifacts get
+    numbered once and both the dependency and the dependent adjacency are kept as lists of numbers, so queries do not
+    walk Artifact instances. Queries take artifacts or descriptors and return paths as tuples of artifacts starting
+    with the depending one.
+    """
+
+    def __init__(self, in_artifacts):
+        self._artifacts, self._indexes, self._successors = index_artifacts(in_artifacts)
+        self._predecessors = [[] for _ in self._artifacts]
+        self._scopes = {}
+        for v, artifact in enumerate(self._artifacts):
+            for d in artifact.dependencies:
+                w = self._indexes[d.artifact.descriptor]
+                self._predecessors[w].append(v)
+                scope = self._scopes.get((v, w))
+                self._scopes[v, w] = d.scope if scope is None else stronger_scope(scope, d.scope)
+
+    def __contains__(self, artifact):
+        return getattr(artifact, 'descriptor', artifact) in self._indexes
+
+    def artifact(self, descriptor):
+        return self._artifacts[self._indexes[descriptor]]
+
+    def _index(self, artifact):
+        return self._indexes[getattr(artifact, 'descriptor', artifact)]
+
+    def _path(self, indexes):
+        return tuple(self._artifacts[i] for i in indexes)
+
+    def shortest_path(self, source, target):
+        """
+        Returns a shortest dependency path from source to target or None if target is not reachable. Searches from
+        both ends at once, always expanding the smaller frontier.
+        """
+        s, t = self._index(source), self._index(target)
+        if s == t:
+            return self._path((s,))
+        forward = {s: (None, 0)}
+        backward = {t: (None, 0)}
+        forward_frontier = [s]
+        backward_frontier = [t]
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, others, neighbours = forward_frontier, forward, backward, self._successors
+            else:
+                frontier, parents, others, neighbours = backward_frontier, backward, forward, self._predecessors
+            next_frontier = []
+            best = None
+            for v in frontier:
+                depth = parents[v][1] + 1
+                for w in neighbours[v]:
+                    if w in parents:
+                        continue
+                    parents[w] = v, depth
+                    next_frontier.append(w)
+                    # every meeting point of this level is as far from the expanded end, so the one closest to the
+                    # other end gives the shortest path.
+                    if w in others and (best is None or others[w][1] < others[best][1]):
+                        best = w
+            if best is not None:
+                return self._path(self._join(best, forward, backward))
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return None
+
+    @staticmethod
+    def _join(middle, forward, backward):
+        path = []
+        v = middle
+        while v is not None:
+            path.append(v)
+            v = forward[v][0]
+        path.reverse()
+        v = backward[middle][0]
+        while v is not None:
+            path.append(v)
+            v = backward[v][0]
+        return path
+
+    def shortest_paths(self, source, targets):
+        """
+        Batch version of shortest_path running a single breadth-first search from source. Returns a dict mapping the
+        descriptor of every target to its path or None.
+        """
+        s = self._index(source)
+        wanted = {self._index(t) for t in targets}
+        parents = {s: None}
+        pending = len(wanted - {s})
+        frontier = [s]
+        while frontier and pending:
+            next_frontier = []
+            for v in frontier:
+                for w in self._successors[v]:
+                    if w not in parents:
+                        parents[w] = v
+                        next_frontier.append(w)
+                        if w in wanted:
+                            pending -= 1
+            frontier = next_frontier
+        paths = {}
+        for t in wanted:
+            if t not in parents:
+                paths[self._artifacts[t].descriptor] = None
+                continue
+            path = []
+            v = t
+            while v is not None:
+                path.append(v)
+                v = parents[v]
+            path.reverse()
+            paths[self._artifacts[t].descriptor] = self._path(path)
+        return paths
+
+    def _reaching(self, t):
+        reaching = {t}
+        pending = [t]
+        while pending:
+            for v in self._predecessors[pending.pop()]:
+                if v not in reaching:
+                    reaching.add(v)
+                    pending.append(v)
+        return reaching
+
+    def all_paths(self, source, target, limit=None):
+        """
+        Generates the simple dependency paths from source to target, at most limit of them if given. The search never
+        enters artifacts that cannot reach target.
+        """
+        s, t = self._index(source), self._index(target)
+        reaching = self._reaching(t)
+        if s not in reaching:
+            return
+        count = 0
+        path = [s]
+        on_path = {s}
+        work = [iter(self._successors[s])]
+        while work:
+            if path[-1] == t:
+                yield self._path(path)
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+                work.pop()
+                on_path.discard(path.pop())
+                continue
+            w = next((w for w in work[-1] if w in reaching and w not in on_path), None)
+            if w is None:
+                work.pop()
+                on_path.discard(path.pop())
+            else:
+                path.append(w)
+                on_path.add(w)
+                work.append(iter(self._successors[w]))
+
+    def path_scopes(self, path):
+        """
+        Returns the scopes of the edges along a path.
+        """
+        indexes = [self._index(a) for a in path]
+        return tuple(self._scopes[v, w] for v, w in zip(indexes, indexes[1:]))
+
+    def effective_scope(self, path):
+        """
+        Returns the scope the last artifact of a path gets in the first one along that path (see mediated_scope).
+        """
+        return mediated_scope(self.path_scopes(path))
+
+    def strongest_scopes(self, source, targets=None):
+        """
+        Returns a dict mapping descriptors to the strongest scope any path from source mediates to them, for all
+        artifacts source pulls in or just for the given targets. Searches (artifact, scope) pairs, so every artifact
+        is visited at most once per scope instead of once per path.
+        """
+        s = self._index(source)
+        seen = set()
+        pending = []
+        for w in self._successors[s]:
+            state = w, self._scopes[s, w]
+            if state not in seen:
+                seen.add(state)
+                pending.append(state)
+        while pending:
+            v, scope = pending.pop()
+            for w in self._successors[v]:
+                mediated = SCOPE_MEDIATION.get(scope, {}).get(self._scopes[v, w])
+                if mediated is not None and (w, mediated) not in seen:
+                    seen.add((w, mediated))
+                    pending.append((w, mediated))
+        wanted = None if targets is None else {self._index(t) for t in targets}
+        scopes = {}
+        for w, scope in seen:
+            if wanted is None or w in wanted:
+                descriptor = self._artifacts[w].descriptor
+                scopes[descriptor] = scope if descriptor not in scopes else stronger_scope(scopes[descriptor], scope)
+        return scopes
+
+    def pulling_modules(self, target):
+        """
+        Returns the reactor modules that pull in target directly or through non-reactor artifacts only - the minimal
+        set of modules to change to get rid of target. Walks the dependents of target without going past reactor
+        modules.
+        """
+        t = self._index(target)
+        seen = {t}
+        pending = [t]
+        modules = []
+        while pending:
+            for v in self._predecessors[pending.pop()]:
+                if v in seen:
+                    continue
+                seen.add(v)
+                if self._artifacts[v].in_reactor:
+                    modules.append(v)
+                else:
+                    pending.append(v)
+        return tuple(self._artifacts[v] for v in sorted(modules))
+
+    def pulling_modules_of(self, targets):
+        """
+        Batch version of pulling_modules returning a dict by target descriptor.
+        """
+        return {getattr(t, 'descriptor', t): self.pulling_modules(t) for t in targets}
+
+    def explain(self, target):
+        """
+        Explains why target is in the graph: returns an Explanation with a shortest path and its effective scope for
+        every module pulling it in.
+        """
+        explanations = []
+        for module in self.pulling_modules(target):
+            path = self.shortest_path(module, target)
+            explanations.append(Explanation(module, path, self.effective_scope(path)))
+        return explanations
+
+    def explain_all(self, targets):
+        """
+        Batch version of explain returning a dict by target descriptor.
+        """
+        return {getattr(t, 'descriptor', t): self.explain(t) for t in targets}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from multiprocessing.pool import ThreadPool
+
+from .maven_dot import write_dot_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def weakly_connected_components(in_artifacts):
+    """
+    Splits the incoming artifacts into lists of weakly connected components considering only edges between the
+    incoming artifacts. Components are ordered by their first artifact in the incoming order.
+    """
+    in_artifacts = tuple(in_artifacts)
+    artifacts = {a.descriptor: a for a in in_artifacts}
+    seen = set()
+    components = []
+    for artifact in in_artifacts:
+        if artifact.descriptor in seen:
+            continue
+        seen.add(artifact.descriptor)
+        component = []
+        pending = [artifact]
+        while pending:
+            a = pending.pop()
+            component.append(a)
+            for d in tuple(a.dependencies) + tuple(a.dependents):
+                descriptor = d.artifact.descriptor
+                if descriptor in artifacts and descriptor not in seen:
+                    seen.add(descriptor)
+                    pending.append(artifacts[descriptor])
+        components.append(component)
+    return components
+
+
+def reactor_module_partitions(in_artifacts):
+    """
+    Splits the incoming artifacts into one subgraph per reactor module holding the module, the non-reactor artifacts
+    it pulls in through other non-reactor artifacts and the reactor modules it depends on directly. Artifacts not
+    pulled in by any reactor module end up in weakly connected components of their own. Subgraphs may overlap.
+    """
+    in_artifacts = tuple(in_artifacts)
+    artifacts = {a.descriptor: a for a in in_artifacts}
+    covered = set()
+    partitions = []
+    for module in in_artifacts:
+        if not module.in_reactor:
+            continue
+        seen = {module.descriptor}
+        partition = [module]
+        pending = [module]
+        while pending:
+            a = pending.pop()
+            for d in a.dependencies:
+                descriptor = d.artifact.descriptor
+                if descriptor in artifacts and descriptor not in seen:
+                    seen.add(descriptor)
+                    partition.append(artifacts[descriptor])
+                    if not d.artifact.in_reactor:
+                        pending.append(artifacts[descriptor])
+        covered.update(seen)
+        partitions.append(partition)
+    partitions.extend(weakly_connected_components(a for a in in_artifacts if a.descriptor not in covered))
+    return partitions
+
+
+PARTITIONS = {
+    'components': weakly_connected_components,
+    'modules': reactor_module_partitions
+}
+
+
+def _render(job):
+    dot_data, target_file, output_format, prog = job
+    directory = os.path.dirname(target_file) or '.'
+    fd, temp_file = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            process = subprocess.Popen([prog, '-T' + output_format], stdin=subprocess.PIPE, stdout=f)
+            process.communicate(dot_data)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, prog)
+        os.rename(temp_file, target_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+    return target_file
+
+
+def render_partitions(in_artifacts, target_dir, style_functions=(), partition='components', output_format='svg',
+                      processes=None, cache_dir=None, prog='dot'):
+    """
+    Splits the artifacts into subgraphs (see PARTITIONS) and lays out each one separately with GraphViz running up to
+    processes instances of prog side by side. The layout happens in the GraphViz processes, so a thread pool is enough
+    to keep them busy. When cache_dir is given rendered outputs are cached there under the SHA-256 of their DOT text,
+    so unchanged subgraphs are not laid out again on the next run. Returns the paths of the rendered files in partition
+    order.
+    """
+    if not os.path.isdir(target_dir):
+        os.makedirs(target_dir)
+    if cache_dir is not None and not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    targets = []
+    jobs = {}
+    cached = []
+    for i, artifacts in enumerate(PARTITIONS[partition](in_artifacts)):
+        f = io.StringIO()
+        write_dot_graph(artifacts, f, style_functions, external_edges=False)
+        dot_data = f.getvalue().encode('utf-8')
+        target_file = os.path.join(target_dir, 'partition-{:04d}.{}'.format(i, output_format))
+        targets.append(target_file)
+        if cache_dir is None:
+            jobs[target_file] = dot_data, target_file, output_format, prog
+            continue
+        key = hashlib.sha256(dot_data + '\0{}\0{}'.format(output_format, prog).encode('utf-8')).hexdigest()
+        cache_file = os.path.join(cache_dir, '{}.{}'.format(key, output_format))
+        if not os.path.exists(cache_file):
+            jobs[cache_file] = dot_data, cache_file, output_format, prog
+        cached.append((cache_file, target_file))
+
+    if len(jobs) > 1 and processes != 1:
+        pool = ThreadPool(processes)
+        try:
+            pool.map(_render, jobs.values())
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs.values():
+            _render(job)
+
+    for cache_file, target_file in cached:
+        shutil.copyfile(cache_file, target_file)
+    return targets
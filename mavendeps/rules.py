@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+import json
+import re
+from fnmatch import translate
+
+from .maven_graph import FilterAction
+
+__author__ = 'Tony Ganchev'
+
+GLOB_CONDITIONS = ('group_id', 'artifact_id', 'version')
+VALUE_CONDITIONS = ('packaging', 'classifier', 'scope')
+FLAG_CONDITIONS = ('in_reactor', 'has_reactor_dependent', 'version_conflict')
+
+_WILDCARDS = re.compile(r'[*?\[]')
+
+
+def _as_tuple(value):
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+# JSON and YAML strings are unicode on Python 2.
+_TEXT_TYPES = (str, type(u''))
+
+
+def _quote(value):
+    if isinstance(value, _TEXT_TYPES) and not (len(value) > 1 and value[0] == '"' and value[-1] == '"'):
+        return '"{}"'.format(value.replace('"', '\\"'))
+    return value
+
+
+class _Rule:
+    """
+    A single compiled rule - its remaining condition checks after the group_id and packaging indexes got applied.
+    """
+
+    def __init__(self, when, payload):
+        for key in when:
+            if key not in GLOB_CONDITIONS + VALUE_CONDITIONS + FLAG_CONDITIONS:
+                raise ValueError('Unknown rule condition: ' + key)
+        self.payload = payload
+        self.group_patterns = _as_tuple(when['group_id']) if 'group_id' in when else None
+        self.packagings = frozenset(_as_tuple(when['packaging'])) if 'packaging' in when else None
+        self._checks = []
+        if self.group_patterns is not None and not all(self._is_prefix(p) for p in self.group_patterns):
+            self._add_glob_check('group_id', self.group_patterns)
+        for key in GLOB_CONDITIONS[1:]:
+            if key in when:
+                self._add_glob_check(key, _as_tuple(when[key]))
+        if 'classifier' in when:
+            classifiers = frozenset(_as_tuple(when['classifier']))
+            self._checks.append(lambda a: a.descriptor.classifier in classifiers)
+        if 'scope' in when:
+            scopes = frozenset(_as_tuple(when['scope']))
+            self._checks.append(lambda a: any(d.scope in scopes for d in a.dependents))
+        if 'in_reactor' in when:
+            in_reactor = bool(when['in_reactor'])
+            self._checks.append(lambda a: a.in_reactor == in_reactor)
+        if 'has_reactor_dependent' in when:
+            has_reactor_dependent = bool(when['has_reactor_dependent'])
+            self._checks.append(
+                lambda a: any(d.artifact.in_reactor for d in a.dependents) == has_reactor_dependent)
+        if 'version_conflict' in when:
+            version_conflict = bool(when['version_conflict'])
+            self._checks.append(lambda a: a.version_index.is_conflicting(a.descriptor) == version_conflict)
+
+    @staticmethod
+    def _is_prefix(pattern):
+        """
+        Patterns of the literal* form are fully decided by the prefix trie.
+        """
+        m = _WILDCARDS.search(pattern)
+        return m is None or (m.start() == len(pattern) - 1 and pattern[-1] == '*')
+
+    def _add_glob_check(self, key, patterns):
+        regex = re.compile('|'.join('(?:{})'.format(translate(p)) for p in patterns))
+        self._checks.append(lambda a: regex.match(getattr(a.descriptor, key)) is not None)
+
+    def matches(self, artifact):
+        for check in self._checks:
+            if not check(artifact):
+                return False
+        return True
+
+
+class _RuleMatcher:
+    """
+    Indexes an ordered list of rules by the literal prefixes of their group_id globs (a character trie) and by
+    packaging (a hash table). Matching an artifact walks the trie along its group_id, intersects the collected rule
+    bitmask with the one for its packaging and only evaluates the remaining conditions of the surviving rules.
+    """
+
+    def __init__(self, rules):
+        self._rules = rules
+        self._trie = [{}, 0]
+        self._by_packaging = {}
+        self._any_packaging = 0
+        self._candidates = {}
+        for i, rule in enumerate(rules):
+            bit = 1 << i
+            for pattern in rule.group_patterns if rule.group_patterns is not None else ('*',):
+                m = _WILDCARDS.search(pattern)
+                prefix = pattern if m is None else pattern[:m.start()]
+                node = self._trie
+                for c in prefix:
+                    node = node[0].setdefault(c, [{}, 0])
+                if m is None:
+                    node = node[0].setdefault(None, [{}, 0])
+                node[1] |= bit
+            if rule.packagings is None:
+                self._any_packaging |= bit
+            else:
+                for packaging in rule.packagings:
+                    self._by_packaging[packaging] = self._by_packaging.get(packaging, 0) | bit
+
+    def _candidate_mask(self, descriptor):
+        key = descriptor.group_id, descriptor.packaging
+        mask = self._candidates.get(key)
+        if mask is None:
+            node = self._trie
+            mask = node[1]
+            for c in descriptor.group_id:
+                node = node[0].get(c)
+                if node is None:
+                    break
+                mask |= node[1]
+            else:
+                exact = node[0].get(None)
+                if exact is not None:
+                    mask |= exact[1]
+            mask &= self._by_packaging.get(descriptor.packaging, 0) | self._any_packaging
+            self._candidates[key] = mask
+        return mask
+
+    def matches(self, artifact):
+        """
+        Generates the payloads of all rules matching the artifact in rule order.
+        """
+        mask = self._candidate_mask(artifact.descriptor)
+        i = 0
+        while mask:
+            if mask & 1 and self._rules[i].matches(artifact):
+                yield self._rules[i].payload
+            mask >>= 1
+            i += 1
+
+
+class RuleSet:
+    """
+    Declarative filter and style rules compiled into indexed matchers. Every rule has an optional "when" mapping of
+    conditions that all need to hold:
+
+    * group_id, artifact_id, version - a glob or a list of globs,
+    * packaging, classifier - a value or a list of values,
+    * scope - a scope or a list of scopes any dependent uses to depend on the artifact,
+    * in_reactor, has_reactor_dependent - booleans,
+    * version_conflict - a boolean, whether the artifact is present in more than one version.
+
+    Filter rules carry an "action" and the first matching one decides the action for an artifact. Style rules carry a
+    "set" mapping of node attributes and all matching ones get applied in order. The filter and style methods are a
+    filter function and a style function respectively. state_key holds the rules in canonical JSON form and identifies
+    the configuration of both methods, see configured_as.
+    """
+
+    def __init__(self, filter_rules=(), style_rules=()):
+        filter_rules = list(filter_rules)
+        style_rules = list(style_rules)
+        self.state_key = json.dumps([filter_rules, style_rules], sort_keys=True, default=repr)
+        filters = []
+        for rule in filter_rules:
+            action = rule.get('action')
+            if action not in (FilterAction.accept, FilterAction.reject, FilterAction.no_action):
+                raise ValueError('Unknown filter action: {}'.format(action))
+            filters.append(_Rule(rule.get('when', {}), action))
+        styles = [_Rule(rule.get('when', {}), {k: _quote(v) for k, v in rule.get('set', {}).items()})
+                  for rule in style_rules]
+        self._filters = _RuleMatcher(filters)
+        self._styles = _RuleMatcher(styles)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('filters', ()), data.get('styles', ()))
+
+    def filter(self, artifact):
+        for action in self._filters.matches(artifact):
+            return action
+        return FilterAction.no_action
+
+    def style_attributes(self, artifact):
+        attributes = {}
+        for payload in self._styles.matches(artifact):
+            attributes.update(payload)
+        return attributes
+
+    def style(self, artifact, node):
+        for name, value in self.style_attributes(artifact).items():
+            node.set(name, value)
+
+
+def load_rules(source_file):
+    """
+    Loads a RuleSet from a JSON, YAML (requires PyYAML) or TOML (requires Python 3.11 or the toml package) file
+    depending on its extension.
+    """
+    if source_file.endswith(('.yaml', '.yml')):
+        import yaml
+        with open(source_file, 'r') as f:
+            data = yaml.safe_load(f)
+    elif source_file.endswith('.toml'):
+        try:
+            import tomllib
+            with open(source_file, 'rb') as f:
+                data = tomllib.load(f)
+        except ImportError:
+            import toml
+            with open(source_file, 'r') as f:
+                data = toml.load(f)
+    else:
+        with open(source_file, 'r') as f:
+            data = json.load(f)
+    return RuleSet.from_dict(data or {})
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+from .graph_algorithms import index_artifacts, strongly_connected_components
+
+__author__ = 'Tony Ganchev'
+
+SCOPE_WEIGHTS = {
+    'test': 0,
+    'runtime': 1,
+    'system': 3,
+    'provided': 2,
+    'compile': 4,
+    'rsl': 1
+}
+
+# scope a transitive dependency gets given the scope of the dependency pulling it in (outer key) and the scope it is
+# declared with (inner key). Combinations missing from the table are not pulled in transitively.
+SCOPE_MEDIATION = {
+    'compile': {'compile': 'compile', 'runtime': 'runtime'},
+    'provided': {'compile': 'provided', 'runtime': 'provided'},
+    'runtime': {'compile': 'runtime', 'runtime': 'runtime'},
+    'test': {'compile': 'test', 'runtime': 'test'}
+}
+
+
+def stronger_scope(lhs, rhs):
+    return lhs if SCOPE_WEIGHTS[lhs] > SCOPE_WEIGHTS[rhs] else rhs
+
+
+class _ScopeMasks:
+    """
+    Encodes sets of scopes as bit masks, one bit per scope name in the order they are first seen, and mediates whole
+    masks through an edge scope at once. Mediated masks are memoized by (mask, edge scope).
+    """
+
+    def __init__(self):
+        self._scopes = []
+        self._bits = {}
+        self._mediated = {}
+
+    def bit(self, scope):
+        bit = self._bits.get(scope)
+        if bit is None:
+            bit = self._bits[scope] = 1 << len(self._scopes)
+            self._scopes.append(scope)
+        return bit
+
+    def mediate(self, mask, scope):
+        key = mask, scope
+        mediated = self._mediated.get(key)
+        if mediated is None:
+            mediated = 0
+            for i, outer in enumerate(self._scopes):
+                if (mask >> i) & 1:
+                    inner = SCOPE_MEDIATION.get(outer, {}).get(scope)
+                    if inner is not None:
+                        mediated |= self.bit(inner)
+            self._mediated[key] = mediated
+        return mediated
+
+    def strongest(self, mask):
+        strongest = None
+        for i, scope in enumerate(self._scopes):
+            if (mask >> i) & 1:
+                strongest = scope if strongest is None else stronger_scope(strongest, scope)
+        return strongest
+
+
+def propagate_scopes(successors, roots):
+    """
+    Computes the strongest scope every node gets in any of the root nodes given a graph as a list of (node number,
+    scope) successor lists. Roots pull in their direct successors with the declared edge scope and the scopes get
+    mediated along every further edge. The strongly connected components are processed in topological order so every
+    edge is followed once per scope reaching its source at most. Returns a list with a scope or None per node.
+    """
+    masks = _ScopeMasks()
+    reached = [0] * len(successors)
+    for v in roots:
+        for w, scope in successors[v]:
+            reached[w] |= masks.bit(scope)
+    components = strongly_connected_components([[w for w, _ in s] for s in successors])
+    for component in reversed(components):
+        pending = list(component)
+        members = set(component)
+        while pending:
+            v = pending.pop()
+            mask = reached[v]
+            if not mask:
+                continue
+            for w, scope in successors[v]:
+                mediated = masks.mediate(mask, scope)
+                if mediated & ~reached[w]:
+                    reached[w] |= mediated
+                    # successors outside the component are handled after it, those inside have to be revisited.
+                    if w in members:
+                        pending.append(w)
+    return [masks.strongest(mask) for mask in reached]
+
+
+def effective_scopes(in_artifacts):
+    """
+    Returns a dict mapping the descriptor of every incoming artifact and every artifact they depend on to the
+    strongest scope it gets in any reactor module among them according to Maven's dependency mediation, or None if no
+    module pulls it in.
+    """
+    artifacts, indexes, _ = index_artifacts(in_artifacts)
+    successors = [[(indexes[d.artifact.descriptor], d.scope) for d in a.dependencies] for a in artifacts]
+    scopes = propagate_scopes(successors, (v for v, a in enumerate(artifacts) if a.in_reactor))
+    return {a.descriptor: scope for a, scope in zip(artifacts, scopes)}
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+
+import re
+from fnmatch import translate
+
+from .artifact_graph import ArtifactGraph
+from .graph_algorithms import index_artifacts, strongly_connected_components
+from .instrumentation import recorded_stage, count_edges
+from .maven_graph import Artifact, ArtifactDescriptor, index_versions, _link_artifacts
+from .scopes import stronger_scope
+
+__author__ = 'Tony Ganchev'
+
+# packaging of the nodes collapse_groups and condense_cycles create.
+GROUP_PACKAGING = 'group'
+CYCLE_PACKAGING = 'cycle'
+
+
+def _indexed(in_artifacts):
+    artifacts, indexes, _ = index_artifacts(in_artifacts)
+    successors = [[(indexes[d.artifact.descriptor], d.scope) for d in a.dependencies] for a in artifacts]
+    return artifacts, successors
+
+
+def _finish(event, artifacts):
+    index_versions(artifacts)
+    if event is not None:
+        event['artifacts'] = len(artifacts)
+        event['edges'] = count_edges(artifacts)
+    return tuple(artifacts)
+
+
+def _quotient(artifacts, successors, node_of, descriptors):
+    """
+    Builds the graph whose nodes are the given descriptors and node_of maps every artifact to. A node is in the
+    reactor if any of its artifacts is and gets the tags of all of them. Parallel edges are merged keeping the
+    stronger scope and edges between artifacts of the same node are dropped.
+    """
+    in_reactor = [False] * len(descriptors)
+    tags = [set() for _ in descriptors]
+    edges = [{} for _ in descriptors]
+    for v, artifact in enumerate(artifacts):
+        n = node_of[v]
+        in_reactor[n] = in_reactor[n] or artifact.in_reactor
+        tags[n].update(artifact.tags)
+        node_edges = edges[n]
+        for w, scope in successors[v]:
+            m = node_of[w]
+            if m != n:
+                node_edges[m] = scope if m not in node_edges else stronger_scope(node_edges[m], scope)
+    nodes = [Artifact(d, r) for d, r in zip(descriptors, in_reactor)]
+    for node, node_tags in zip(nodes, tags):
+        node.tags.update(node_tags)
+    _link_artifacts(nodes, [e.items() for e in edges])
+    return nodes
+
+
+def _group_of(group_id, groups):
+    """
+    Returns the longest of the groups equal to group_id or a dot-separated prefix of it, None if there is none.
+    """
+    while True:
+        if group_id in groups:
+            return group_id
+        dot = group_id.rfind('.')
+        if dot == -1:
+            return None
+        group_id = group_id[:dot]
+
+
+def collapse_groups(in_artifacts, groups=None, members=None):
+    """
+    Collapses the incoming artifacts and everything they depend on into one node per group id, or per group id
+    prefix if groups are given - org.apache covers org.apache and org.apache.karaf but not org.apachex. Artifacts
+    outside the groups and groups with a single artifact are left as they are. Collapsed nodes get a
+    group:*:group:* descriptor. If members is a dict it receives the descriptors of the artifacts of every collapsed
+    node by its descriptor. The input is left intact.
+    """
+    with recorded_stage('collapse_groups') as event:
+        artifacts, successors = _indexed(in_artifacts)
+        groups = None if groups is None else frozenset(groups)
+        group_cache = {}
+        keys = []
+        sizes = {}
+        for artifact in artifacts:
+            group_id = artifact.descriptor.group_id
+            if groups is None:
+                key = group_id
+            else:
+                key = group_cache.get(group_id, False)
+                if key is False:
+                    key = group_cache[group_id] = _group_of(group_id, groups)
+            keys.append(key)
+            if key is not None:
+                sizes[key] = sizes.get(key, 0) + 1
+
+        descriptors = []
+        nodes_by_key = {}
+        collapsed = {}
+        node_of = []
+        for artifact, key in zip(artifacts, keys):
+            if key is None or sizes[key] == 1:
+                node_of.append(len(descriptors))
+                descriptors.append(artifact.descriptor)
+                continue
+            n = nodes_by_key.get(key)
+            if n is None:
+                n = nodes_by_key[key] = len(descriptors)
+                descriptors.append(ArtifactDescriptor(key, '*', '*', GROUP_PACKAGING))
+                collapsed[n] = []
+            node_of.append(n)
+            collapsed[n].append(artifact.descriptor)
+        if members is not None:
+            members.update((descriptors[n], tuple(c)) for n, c in collapsed.items())
+        nodes = _quotient(artifacts, successors, node_of, descriptors)
+        return _finish(event, nodes)
+
+
+def condense_cycles(in_artifacts, members=None):
+    """
+    Replaces every dependency cycle - strongly connected component of more than one artifact - among the incoming
+    artifacts and everything they depend on with a single node. The node is described by the artifact of the cycle
+    whose descriptor sorts first, with cycle packaging and the size of the cycle as classifier. If members is a dict
+    it receives the descriptors of the artifacts of every condensed node by its descriptor. The input is left intact.
+    """
+    with recorded_stage('condense_cycles') as event:
+        artifacts, successors = _indexed(in_artifacts)
+        components = strongly_connected_components([[w for w, _ in s] for s in successors])
+        node_of = [0] * len(artifacts)
+        component_of = [0] * len(artifacts)
+        for c, component in enumerate(components):
+            for v in component:
+                component_of[v] = c
+        descriptors = []
+        nodes_by_component = {}
+        for v, artifact in enumerate(artifacts):
+            component = components[component_of[v]]
+            if len(component) == 1:
+                node_of[v] = len(descriptors)
+                descriptors.append(artifact.descriptor)
+                continue
+            n = nodes_by_component.get(component_of[v])
+            if n is None:
+                n = nodes_by_component[component_of[v]] = len(descriptors)
+                cycle = sorted((artifacts[w].descriptor for w in component), key=str)
+                first = cycle[0]
+                descriptors.append(ArtifactDescriptor(first.group_id, first.artifact_id, first.version,
+                                                      CYCLE_PACKAGING, str(len(cycle))))
+                if members is not None:
+                    members[descriptors[n]] = tuple(cycle)
+            node_of[v] = n
+        nodes = _quotient(artifacts, successors, node_of, descriptors)
+        return _finish(event, nodes)
+
+
+def transitive_reduction(in_artifacts):
+    """
+    Drops every dependency of the incoming artifacts and everything they depend on that is implied by a longer
+    dependency path, regardless of scopes. Dependency cycles are kept whole and only the edges between them get
+    reduced. Works on the strongly connected component condensation in reverse topological order with a bitset of
+    the components every component reaches, each bitset being released as soon as all components depending on it got
+    processed. The input is left intact.
+    """
+    with recorded_stage('transitive_reduction') as event:
+        artifacts, successors = _indexed(in_artifacts)
+        components = strongly_connected_components([[w for w, _ in s] for s in successors])
+        component_of = [0] * len(artifacts)
+        for c, component in enumerate(components):
+            for v in component:
+                component_of[v] = c
+        successor_components = []
+        pending_dependents = [0] * len(components)
+        for c, component in enumerate(components):
+            reached = {component_of[w] for v in component for w, _ in successors[v]}
+            reached.discard(c)
+            successor_components.append(reached)
+            for x in reached:
+                pending_dependents[x] += 1
+
+        reach = [0] * len(components)
+        direct = []
+        for c in range(0, len(components)):
+            covered = 0
+            for x in successor_components[c]:
+                covered |= reach[x]
+            kept = {x for x in successor_components[c] if not (covered >> x) & 1}
+            direct.append(kept)
+            bits = covered
+            for x in successor_components[c]:
+                bits |= 1 << x
+                pending_dependents[x] -= 1
+                if not pending_dependents[x]:
+                    reach[x] = 0
+            if pending_dependents[c]:
+                reach[c] = bits
+
+        nodes = [Artifact(a.descriptor, a.in_reactor) for a in artifacts]
+        for artifact, node in zip(artifacts, nodes):
+            node.tags.update(artifact.tags)
+        _link_artifacts(nodes, [[(w, scope) for w, scope in successors[v]
+                                 if component_of[w] == component_of[v] or component_of[w] in direct[component_of[v]]]
+                                for v in range(0, len(artifacts))])
+        return _finish(event, nodes)
+
+
+def _resolve_roots(in_artifacts, roots):
+    """
+    Returns the root artifacts: Artifact instances as they are plus the incoming artifacts whose descriptor is among
+    the given descriptors or whose string form matches one of the given glob patterns.
+    """
+    found = []
+    descriptors = set()
+    patterns = []
+    for root in roots:
+        if isinstance(root, Artifact):
+            found.append(root)
+        elif isinstance(root, ArtifactDescriptor):
+            descriptors.add(root)
+        else:
+            patterns.append(root)
+    regex = re.compile('|'.join('(?:{})'.format(translate(p)) for p in patterns)) if patterns else None
+    if isinstance(in_artifacts, ArtifactGraph):
+        found.extend(in_artifacts.artifact(in_artifacts.id_of(d)) for d in descriptors if d in in_artifacts._ids)
+        if regex is not None:
+            found.extend(in_artifacts.artifact(i) for i, d in enumerate(in_artifacts._descriptors)
+                         if d not in descriptors and regex.match(str(d)) is not None)
+    elif descriptors or regex is not None:
+        for artifact in in_artifacts:
+            descriptor = artifact.descriptor
+            if descriptor in descriptors or regex is not None and regex.match(str(descriptor)) is not None:
+                found.append(artifact)
+    return found
+
+
+def _neighbours(artifact, dependencies, dependents):
+    if dependencies:
+        for d in artifact.dependencies:
+            yield d.artifact
+    if dependents:
+        for d in artifact.dependents:
+            yield d.artifact
+
+
+def extract_neighbourhood(in_artifacts, roots, depth=1, dependencies=True, dependents=True):
+    """
+    Extracts everything within depth dependency hops of the roots - following dependencies, dependents or both - with
+    the dependencies among the extracted artifacts. A depth of None does not bound the search. Roots are Artifact
+    instances, descriptors or glob patterns matched against descriptors in group:artifact:packaging:version form
+    (org.apache.karaf:* for a whole group). Descriptors and patterns are looked up among the incoming artifacts, which
+    may also be an ArtifactGraph so that none of the rest of it gets materialized. The breadth-first search and the
+    copy only visit the extracted artifacts and their edges. The input is left intact.
+    """
+    with recorded_stage('extract_neighbourhood') as event:
+        seen = {}
+        region = []
+        for artifact in _resolve_roots(in_artifacts, roots):
+            if artifact.descriptor not in seen:
+                seen[artifact.descriptor] = len(region)
+                region.append(artifact)
+        frontier = list(region)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+            for artifact in frontier:
+                for neighbour in _neighbours(artifact, dependencies, dependents):
+                    if neighbour.descriptor not in seen:
+                        seen[neighbour.descriptor] = len(region)
+                        region.append(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        nodes = [Artifact(a.descriptor, a.in_reactor) for a in region]
+        for artifact, node in zip(region, nodes):
+            node.tags.update(artifact.tags)
+        _link_artifacts(nodes, [[(seen[d.artifact.descriptor], d.scope) for d in a.dependencies
+                                 if d.artifact.descriptor in seen] for a in region])
+        return _finish(event, nodes)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import re
+from collections import namedtuple
+
+from .query import DependencyQuery
+
+__author__ = 'Tony Ganchev'
+
+VersionConflict = namedtuple('VersionConflict', 'group_id artifact_id classifier versions')
+VersionUse = namedtuple('VersionUse', 'version modules')
+
+_VERSION_TOKEN_REGEX = re.compile(r'\d+|[a-zA-Z]+')
+
+
+def version_key(version):
+    """
+    Sort key approximating Maven's version ordering: numeric parts compare as numbers, zeros in front of a qualifier
+    or the end do not count and a qualifier sorts before the release it qualifies, so
+    1.0-alpha-2 < 1.0-alpha-10 < 1.0-SNAPSHOT < 1.0 = 1.0.0 < 1.0.1.
+    """
+    parts = []
+    for token in _VERSION_TOKEN_REGEX.findall(version) + [None]:
+        if token is None or not token.isdigit():
+            while parts and parts[-1] == (2, 0):
+                parts.pop()
+        parts.append((1, '') if token is None else (2, int(token)) if token.isdigit() else (0, token.lower()))
+    return tuple(parts)
+
+
+class VersionIndex:
+    """
+    Index from (group_id, artifact_id, classifier) to the versions of the artifact present in a graph. Adding and
+    discarding descriptors and checking an artifact for a conflict take constant time. Graphs read from DOT files
+    and the working copies of filter_artifacts get an index up front, see Artifact.version_index.
+    """
+
+    def __init__(self, descriptors=()):
+        self._versions = {}
+        for descriptor in descriptors:
+            self.add(descriptor)
+
+    @staticmethod
+    def key(descriptor):
+        return descriptor.group_id, descriptor.artifact_id, descriptor.classifier
+
+    def add(self, descriptor):
+        versions = self._versions.setdefault(self.key(descriptor), {})
+        versions.setdefault(descriptor.version, set()).add(descriptor)
+
+    def discard(self, descriptor):
+        key = self.key(descriptor)
+        versions = self._versions.get(key)
+        if versions is None or descriptor.version not in versions:
+            return
+        descriptors = versions[descriptor.version]
+        descriptors.discard(descriptor)
+        if not descriptors:
+            del versions[descriptor.version]
+            if not versions:
+                del self._versions[key]
+
+    def versions(self, descriptor):
+        """
+        Returns the versions present for the group id, artifact id and classifier of the descriptor, oldest first.
+        """
+        return tuple(sorted(self._versions.get(self.key(descriptor), ()), key=version_key))
+
+    def newest_version(self, descriptor):
+        versions = self._versions.get(self.key(descriptor))
+        return max(versions, key=version_key) if versions else None
+
+    def is_conflicting(self, descriptor):
+        return len(self._versions.get(self.key(descriptor), ())) > 1
+
+    def conflicting_keys(self):
+        return sorted((k for k, v in self._versions.items() if len(v) > 1), key=lambda k: (k[0], k[1], k[2] or ''))
+
+    def conflicts(self, in_artifacts):
+        """
+        Reports every artifact present in more than one version with the reactor modules pulling in each version (see
+        DependencyQuery.pulling_modules), given the artifacts of the indexed graph. A reactor module present in
+        several versions counts as pulling in itself.
+        """
+        query = DependencyQuery(in_artifacts)
+        conflicts = []
+        for key in self.conflicting_keys():
+            versions = self._versions[key]
+            uses = []
+            for version in sorted(versions, key=version_key):
+                modules = {}
+                for descriptor in sorted(versions[version], key=str):
+                    if descriptor not in query:
+                        continue
+                    artifact = query.artifact(descriptor)
+                    if artifact.in_reactor:
+                        modules.setdefault(descriptor, artifact)
+                    for module in query.pulling_modules(descriptor):
+                        modules.setdefault(module.descriptor, module)
+                uses.append(VersionUse(version, tuple(modules.values())))
+            conflicts.append(VersionConflict(key[0], key[1], key[2], tuple(uses)))
+        return conflicts
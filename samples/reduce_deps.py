@@ -1,17 +1,24 @@
 #!/usr/bin/env python
-from mavendeps import parse_dot_graph, dot_to_maven_graph, maven_to_dot_graph, filter_artifacts
+from mavendeps import read_maven_graph, write_dot_graph, render_dot_file, filter_artifacts, PipelineRecorder
 
 __author__ = 'Tony Ganchev'
 
 
-def reduce_deps(source_file, target_file, filter_chain, style_functions):
-    in_graph = parse_dot_graph(source_file)
-
-    artifacts = dot_to_maven_graph(in_graph)
+def _reduce(source_file, target_file, filter_chain, style_functions):
+    artifacts = read_maven_graph(source_file)
 
     artifacts = filter_artifacts(artifacts, filter_chain)
 
-    out_graph = maven_to_dot_graph(artifacts, style_functions)
+    with open(target_file, 'w') as f:
+        write_dot_graph(artifacts, f, style_functions)
+
 
-    out_graph.write(target_file)
-    out_graph.write_svg(target_file + '.svg')
+def reduce_deps(source_file, target_file, filter_chain, style_functions, trace_file=None):
+    if trace_file is None:
+        _reduce(source_file, target_file, filter_chain, style_functions)
+    else:
+        with PipelineRecorder() as recorder:
+            _reduce(source_file, target_file, filter_chain, style_functions)
+        with open(trace_file, 'w') as f:
+            recorder.dump_chrome_trace(f)
+    render_dot_file(target_file, target_file + '.svg')
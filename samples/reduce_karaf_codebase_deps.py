@@ -1,15 +1,17 @@
 #!/usr/bin/env python
 
 from reduce_deps import reduce_deps
-from mavendeps import reject_any, FilterAction
+from mavendeps import reject_any, FilterAction, FilterDependency, filter_depends_on
 
 __author__ = 'Tony Ganchev'
 
 
+@filter_depends_on(FilterDependency.artifact)
 def include_reactor_artifacts(artifact):
     return FilterAction.accept if artifact.in_reactor else FilterAction.no_action
 
 
+@filter_depends_on(FilterDependency.neighbours)
 def exclude_non_reactor_dependencies(artifact):
     for a in artifact.dependents:
         if a.artifact.in_reactor:
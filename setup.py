@@ -36,11 +36,14 @@ setup(name='mavendeps',
           dependency webs to figure out a specific issue or for presentation
           purposes.
       ''',
+      extras_require={'numpy': ['numpy'], 'parquet': ['numpy', 'pyarrow']},
+      entry_points={'console_scripts': ['mavendeps = mavendeps.cli:main']},
       tests_require=['tox'],
       cmdclass={'test': Tox},
       packages=['mavendeps'],
       include_package_data=True,
       platforms='any',
+      python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*',
       classifiers=[
           'Programming Language :: Python',
           'Development Status :: 5 - Production/Stable',
@@ -51,6 +54,8 @@ setup(name='mavendeps',
           'Operating System :: OS Independent',
           'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: 3',
+          'Programming Language :: Python :: 3.4',
+          'Programming Language :: Python :: 3.7',
           'Topic :: Scientific/Engineering :: Visualization',
           'Topic :: Software Development :: Build Tools',
           'Topic :: Software Development :: Libraries :: Python Modules'
@@ -0,0 +1,7 @@
+import sys
+
+__author__ = 'Tony Ganchev'
+
+# mavendeps.aio uses async/await and asyncio.get_running_loop. The rest of the package and its tests run on Python 2.7
+# and 3.4+, the envlist of tox.ini and the Travis build.
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 7) else []
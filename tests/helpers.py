@@ -0,0 +1,35 @@
+import io
+
+from mavendeps import Artifact, ArtifactDependency, ArtifactDescriptor, FilterAction
+
+__author__ = 'Tony Ganchev'
+
+# in-memory stand-in for the standard streams, which take str - bytes on Python 2.
+NativeStringIO = io.BytesIO if str is bytes else io.StringIO
+
+
+def build_graph(edges, reactor=(), group=lambda name: 'grp'):
+    """
+    Builds Artifact instances out of (source, target, scope) edges between artifact ids. Returns them by artifact id.
+    """
+    artifacts = {}
+    for source, target, _ in edges:
+        for name in source, target:
+            if name not in artifacts:
+                artifacts[name] = Artifact(ArtifactDescriptor(group(name), name, '1.0'), name in reactor)
+    for source, target, scope in edges:
+        artifacts[source].add_dependency(ArtifactDependency(artifacts[target], scope))
+    return artifacts
+
+
+def graph_signature(artifacts):
+    return sorted((str(a.descriptor), a.in_reactor,
+                   tuple(sorted((str(d.artifact.descriptor), d.scope) for d in a.dependencies)))
+                  for a in artifacts)
+
+
+def exclude_non_reactor_dependencies(artifact):
+    for a in artifact.dependents:
+        if a.artifact.in_reactor:
+            return FilterAction.accept
+    return FilterAction.no_action
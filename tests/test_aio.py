@@ -0,0 +1,112 @@
+import asyncio
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+
+from mavendeps import FilterAction, in_reactor_filter, reject_any
+from mavendeps.aio import AsyncPipeline, filtered_dot
+
+__author__ = 'Tony Ganchev'
+
+
+class CountingFilter:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, artifact):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.001)
+        return FilterAction.no_action
+
+
+class AsyncPipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._cat = self._script('fake-dot', 'cat')
+        with open('tests/karaf-sample.dot') as f:
+            self._data = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _script(self, name, command):
+        path = os.path.join(self._dir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\n{}\n'.format(command))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def test_render(self):
+        chain = in_reactor_filter(), reject_any
+        pipeline = AsyncPipeline(chain, prog=self._cat)
+        expected = filtered_dot(self._data, chain, ()).encode('utf-8')
+        self.assertEqual(expected, asyncio.run(pipeline.render(self._data)))
+        self.assertEqual(expected, asyncio.run(pipeline.render_file('tests/karaf-sample.dot', 'dot')))
+
+    def test_deduplication_and_cache(self):
+        counting = CountingFilter()
+        pipeline = AsyncPipeline((counting,), prog=self._cat)
+
+        async def run():
+            results = await asyncio.gather(*(pipeline.render(self._data) for _ in range(0, 5)))
+            self.assertEqual(0, pipeline.in_flight)
+            results.append(await pipeline.render(self._data))
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(1, len(set(results)))
+        self.assertEqual(30, counting.calls)
+        self.assertEqual(len(results[0]), pipeline.cached_bytes)
+        asyncio.run(pipeline.render(self._data, filter_chain=(counting, reject_any)))
+        self.assertEqual(60, counting.calls)
+
+    def test_eviction(self):
+        size = len(filtered_dot(self._data, (), ()))
+        pipeline = AsyncPipeline(prog=self._cat, cache_bytes=2 * size)
+
+        async def run():
+            for output_format in 'dot', 'svg', 'png', 'svg', 'dot':
+                await pipeline.render(self._data, output_format)
+            return pipeline.cached_bytes
+
+        self.assertEqual(2 * size, asyncio.run(run()))
+        self.assertEqual(['svg', 'dot'], [key[3] for key in pipeline._cache])
+
+    def test_cancellation(self):
+        pipeline = AsyncPipeline(prog=self._script('slow-dot', 'exec sleep 30'))
+
+        async def run():
+            first = asyncio.ensure_future(pipeline.render(self._data))
+            second = asyncio.ensure_future(pipeline.render(self._data))
+            await asyncio.sleep(0.3)
+            first.cancel()
+            await asyncio.sleep(0.1)
+            self.assertEqual(1, pipeline.in_flight)
+            second.cancel()
+            for task in first, second:
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+            await asyncio.sleep(0)
+            return pipeline.in_flight
+
+        start = time.time()
+        self.assertEqual(0, asyncio.run(run()))
+        self.assertLess(time.time() - start, 10)
+        self.assertEqual(0, pipeline.cached_bytes)
+
+    def test_failure(self):
+        pipeline = AsyncPipeline(prog=self._script('failing-dot', 'exit 3'))
+        with self.assertRaises(subprocess.CalledProcessError):
+            asyncio.run(pipeline.render(self._data))
+        self.assertEqual(0, pipeline.in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
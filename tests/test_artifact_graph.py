@@ -0,0 +1,109 @@
+import unittest
+
+from mavendeps import ArtifactDescriptor, Artifact, ArtifactDependency, ArtifactGraph, filter_artifacts, \
+    FilterAction, read_maven_graph, read_artifact_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def _descriptor(artifact_id):
+    return ArtifactDescriptor('grp', artifact_id, '1.0.0')
+
+
+class ArtifactGraphTestCase(unittest.TestCase):
+    def _create_graph(self, artifact_ids, dependencies):
+        graph = ArtifactGraph()
+        for artifact_id in artifact_ids:
+            graph.add_artifact(_descriptor(artifact_id))
+        for from_id, to_id in dependencies:
+            graph.add_dependency(graph.id_of(_descriptor(from_id)), graph.id_of(_descriptor(to_id)))
+        return graph
+
+    def test_interning(self):
+        graph = ArtifactGraph()
+        a = graph.add_artifact(_descriptor('a'))
+        self.assertEqual(a, graph.add_artifact(_descriptor('a'), True))
+        self.assertEqual(1, len(graph))
+        self.assertTrue(graph.in_reactor(a))
+
+    def test_views(self):
+        graph = self._create_graph(('prod', 'cons'), (('cons', 'prod'),))
+        prod, cons = graph.artifacts()
+        self.assertEqual(Artifact(_descriptor('prod')), prod)
+        self.assertSequenceEqual((ArtifactDependency(prod),), tuple(cons.dependencies))
+        self.assertSequenceEqual((ArtifactDependency(cons),), tuple(prod.dependents))
+        self.assertSequenceEqual((prod,), tuple(cons.all_dependencies))
+
+    def test_views_share_version_index(self):
+        graph = self._create_graph(('prod', 'cons'), (('cons', 'prod'),))
+        prod, cons = graph.artifacts()
+        index = prod.version_index
+        self.assertIs(index, graph._version_index)
+        self.assertIs(index, cons.version_index)
+        self.assertEqual(('1.0.0',), index.versions(_descriptor('cons')))
+
+    def test_scopes(self):
+        graph = self._create_graph(('a', 'b'), ())
+        graph.add_dependency(0, 1, 'test')
+        graph.add_dependency(0, 1, 'custom')
+        self.assertSequenceEqual(((1, 'test'), (1, 'custom')), tuple(graph.dependencies(0)))
+
+    def test_remove_dependency(self):
+        graph = self._create_graph(('prod', 'cons1', 'cons2'), (('cons1', 'prod'), ('cons2', 'prod')))
+        prod, cons1, cons2 = graph.artifacts()
+        cons1.remove_dependency(prod)
+
+        self.assertEqual(1, graph.edge_count)
+        self.assertSequenceEqual((), tuple(cons1.dependencies))
+        self.assertSequenceEqual((ArtifactDependency(cons2),), tuple(prod.dependents))
+
+        prod.add_dependent(ArtifactDependency(cons1, 'runtime'))
+        self.assertEqual(2, graph.edge_count)
+        self.assertSequenceEqual((ArtifactDependency(prod, 'runtime'),), tuple(cons1.dependencies))
+
+    def test_closure(self):
+        graph = self._create_graph(('a', 'b', 'c'), (('a', 'b'), ('b', 'c'), ('c', 'a'), ('a', 'c')))
+        self.assertSequenceEqual((1, 2), graph.all_dependencies(0))
+        self.assertSequenceEqual((2, 1), graph.all_dependents(0))
+        graph.remove_dependency(0, 1)
+        self.assertSequenceEqual((2,), tuple(a.index for a in graph.artifact(0).all_dependencies))
+
+    def test_add_artifact_after_indexing(self):
+        graph = self._create_graph(('a', 'b'), (('a', 'b'),))
+        self.assertSequenceEqual(((1, 'compile'),), tuple(graph.dependencies(0)))
+        c = graph.add_artifact(_descriptor('c'))
+        self.assertSequenceEqual((), tuple(graph.dependencies(c)))
+        self.assertSequenceEqual((), tuple(graph.dependents(c)))
+
+    def test_filter_views(self):
+        graph = self._create_graph(('prod', 'cons1', 'cons2'), (('cons1', 'prod'), ('cons2', 'prod')))
+
+        def f(a): return FilterAction.reject if a.descriptor.artifact_id == 'cons1' else FilterAction.accept
+
+        prod, cons2 = filter_artifacts(graph.artifacts(), (f,))
+        self.assertSequenceEqual((ArtifactDependency(cons2),), tuple(prod.dependents))
+        self.assertEqual(1, prod.graph.edge_count)
+        self.assertEqual(2, graph.edge_count)
+
+    def test_from_artifacts(self):
+        prod = Artifact(_descriptor('prod'), True)
+        cons = Artifact(_descriptor('cons'))
+        cons.add_dependency(ArtifactDependency(prod, 'test'))
+        graph = ArtifactGraph.from_artifacts((prod, cons))
+        self.assertEqual(2, len(graph))
+        self.assertTrue(graph.artifact(0).in_reactor)
+        self.assertSequenceEqual(((0, 'test'),), tuple(graph.dependencies(1)))
+
+    def test_read_karaf_sample(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        graph = read_artifact_graph('tests/karaf-sample.dot')
+        self.assertEqual(len(artifacts), len(graph))
+        expected = sorted((str(a.descriptor), a.in_reactor, sorted(str(d.artifact.descriptor) for d in a.dependencies))
+                          for a in artifacts)
+        actual = sorted((str(a.descriptor), a.in_reactor, sorted(str(d.artifact.descriptor) for d in a.dependencies))
+                        for a in graph.artifacts())
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
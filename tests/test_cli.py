@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+from mavendeps import read_maven_graph, read_artifact_graph, filter_artifacts, write_dot_graph, collapse_groups, \
+    transitive_reduction, extract_neighbourhood
+from mavendeps.cli import main
+from mavendeps.rules import RuleSet
+
+from helpers import NativeStringIO
+
+__author__ = 'Tony Ganchev'
+
+RULES = {
+    'filters': [
+        {'when': {'in_reactor': True}, 'action': 'accept'},
+        {'when': {'has_reactor_dependent': True}, 'action': 'accept'},
+        {'action': 'reject'}
+    ],
+    'styles': [
+        {'when': {'in_reactor': True}, 'set': {'fillcolor': 'lightgreen'}}
+    ]
+}
+
+
+class _Pipe(NativeStringIO):
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation('seek')
+
+    def tell(self):
+        raise io.UnsupportedOperation('tell')
+
+
+class CliTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._rules = os.path.join(self._dir, 'rules.json')
+        with open(self._rules, 'w') as f:
+            json.dump(RULES, f)
+        self._prog = os.path.join(self._dir, 'fake-dot')
+        with open(self._prog, 'w') as f:
+            f.write('#!/bin/sh\ncat\n')
+        os.chmod(self._prog, os.stat(self._prog).st_mode | stat.S_IEXEC)
+        self._stdin = sys.stdin
+        self._stderr = sys.stderr
+
+    def tearDown(self):
+        sys.stdin = self._stdin
+        sys.stderr = self._stderr
+        shutil.rmtree(self._dir)
+
+    def _expected_dot(self, read=read_maven_graph):
+        rules = RuleSet.from_dict(RULES)
+        artifacts = filter_artifacts(read('tests/karaf-sample.dot'), (rules.filter,))
+        f = io.StringIO()
+        write_dot_graph(artifacts, f, (rules.style,))
+        return f.getvalue()
+
+    def _read_output(self, mode='r'):
+        with open(os.path.join(self._dir, 'out'), mode) as f:
+            return f.read()
+
+    def test_dot(self):
+        main(['tests/karaf-sample.dot', '-r', self._rules, '-T', 'dot', '-o', os.path.join(self._dir, 'out')])
+        self.assertEqual(self._read_output(), self._expected_dot())
+
+    def test_stdin(self):
+        with open('tests/karaf-sample.dot') as f:
+            sys.stdin = NativeStringIO(f.read())
+        main(['--filter-rules', self._rules, '--style-rules', self._rules, '--no-render',
+              '-o', os.path.join(self._dir, 'out')])
+        self.assertEqual(self._read_output(), self._expected_dot())
+
+    def test_non_seekable_stdin(self):
+        with open('tests/karaf-sample.dot') as f:
+            sys.stdin = _Pipe(f.read())
+        main(['-r', self._rules, '-T', 'dot', '-o', os.path.join(self._dir, 'out')])
+        self.assertEqual(self._read_output(), self._expected_dot())
+
+    def test_non_seekable_stdin_fallback(self):
+        sys.stdin = _Pipe('digraph G {\n "a" [label="grp\\na\\n1.0"]; "b" [label="grp\\nb\\n1.0"]; "a" -> "b";\n}\n')
+        main(['-T', 'json', '-o', os.path.join(self._dir, 'out')])
+        artifacts = json.loads(self._read_output())['artifacts']
+        self.assertEqual(['grp:a:jar:1.0', 'grp:b:jar:1.0'], sorted(a['id'] for a in artifacts))
+
+    def test_svg(self):
+        main(['tests/karaf-sample.dot', '-r', self._rules, '--prog', self._prog, '-o', os.path.join(self._dir, 'out')])
+        self.assertEqual(self._read_output('rb').decode('utf-8'), self._expected_dot())
+
+    def test_transforms(self):
+        main(['tests/karaf-sample.dot', '-T', 'dot', '--collapse-group', 'org.apache.karaf', '--reduce',
+              '-o', os.path.join(self._dir, 'out')])
+        f = io.StringIO()
+        write_dot_graph(transitive_reduction(collapse_groups(read_maven_graph('tests/karaf-sample.dot'),
+                                                             ('org.apache.karaf',))), f)
+        self.assertEqual(self._read_output(), f.getvalue())
+        self.assertIn('"org.apache.karaf:*:group:*"', f.getvalue())
+
+    def test_around(self):
+        main(['tests/karaf-sample.dot', '-T', 'dot', '--around', 'org.apache.karaf:org.apache.karaf.main:*',
+              '--depth', '2', '-o', os.path.join(self._dir, 'out')])
+        f = io.StringIO()
+        write_dot_graph(extract_neighbourhood(read_maven_graph('tests/karaf-sample.dot'),
+                                              ('org.apache.karaf:org.apache.karaf.main:*',), 2), f)
+        self.assertEqual(self._read_output(), f.getvalue())
+
+    def test_fixed_point(self):
+        main(['tests/karaf-sample.dot', '-r', self._rules, '-T', 'dot', '--fixed-point',
+              '-o', os.path.join(self._dir, 'out')])
+        f = io.StringIO()
+        rules = RuleSet.from_dict(RULES)
+        write_dot_graph(filter_artifacts(read_maven_graph('tests/karaf-sample.dot'), (rules.filter,), fixed_point=True),
+                        f, (rules.style,))
+        self.assertEqual(self._read_output(), f.getvalue())
+
+    def test_json(self):
+        main(['tests/karaf-sample.dot', '-r', self._rules, '-T', 'json', '-o', os.path.join(self._dir, 'out')])
+        artifacts = json.loads(self._read_output())['artifacts']
+        self.assertEqual(len(artifacts), self._expected_dot().count('label="'))
+        ids = set(a['id'] for a in artifacts)
+        for a in artifacts:
+            for d in a['dependencies']:
+                self.assertIn(d['id'], ids)
+
+    def test_cache_and_stats(self):
+        cache_dir = os.path.join(self._dir, 'cache')
+        for _ in range(0, 2):
+            sys.stderr = NativeStringIO()
+            main(['tests/karaf-sample.dot', '-r', self._rules, '-T', 'dot', '--cache-dir', cache_dir, '--stats',
+                  '-o', os.path.join(self._dir, 'out')])
+            self.assertEqual(self._read_output(),
+                             self._expected_dot(lambda source_file: read_artifact_graph(source_file).artifacts()))
+        self.assertTrue(any(f.endswith('.graph') for f in os.listdir(cache_dir)))
+        stats = sys.stderr.getvalue()
+        self.assertIn('filter_artifacts', stats)
+        self.assertIn('write_dot_graph', stats)
+
+    def test_missing_prog(self):
+        with self.assertRaises(SystemExit):
+            main(['tests/karaf-sample.dot', '--prog', os.path.join(self._dir, 'missing'),
+                  '-o', os.path.join(self._dir, 'out')])
+
+    def test_malformed_rules(self):
+        with open(self._rules, 'w') as f:
+            f.write('{"filters": [')
+        with self.assertRaises(SystemExit) as raised:
+            main(['tests/karaf-sample.dot', '-r', self._rules, '-T', 'dot', '-o', os.path.join(self._dir, 'out')])
+        self.assertTrue(str(raised.exception.code).startswith('mavendeps: '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mavendeps import Artifact, ArtifactDescriptor, ArtifactDependency, ArtifactGraph, read_artifact_graph, \
+    graph_to_columns, columns_to_graph, read_npz_graph, write_npz_graph, graph_to_arrow, arrow_to_graph, \
+    read_parquet_graph, write_parquet_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def _graph():
+    graph = read_artifact_graph('tests/karaf-sample.dot')
+    tests = graph.add_artifact(ArtifactDescriptor('grp', 'lib', '1.0', 'jar', 'tests'))
+    graph.add_dependency(0, tests, 'test')
+    graph.add_dependency(tests, 1, 'custom')
+    graph.remove_dependency(0, 1)
+    graph.tags(tests).update(('b', 'a'))
+    return graph
+
+
+def _signature(graph):
+    return sorted((str(a.descriptor), a.in_reactor, sorted(a.tags),
+                   sorted((str(d.artifact.descriptor), d.scope) for d in a.dependencies))
+                  for a in graph.artifacts())
+
+
+class ColumnarTestCase(unittest.TestCase):
+    def setUp(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('NumPy is not available')
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_columns(self):
+        graph = _graph()
+        nodes, edges = graph_to_columns(graph)
+        self.assertEqual(len(graph), len(nodes['group_id']))
+        self.assertEqual(graph.edge_count, len(edges['source']))
+        tests = graph.id_of(ArtifactDescriptor('grp', 'lib', '1.0', 'jar', 'tests'))
+        self.assertEqual('tests', nodes['classifier_values'][nodes['classifier'][tests]])
+        self.assertEqual(-1, nodes['classifier'][0])
+        self.assertEqual(['a', 'b'], [nodes['tags_values'][c] for c in
+                                      nodes['tags'][nodes['tag_offsets'][tests]:nodes['tag_offsets'][tests + 1]]])
+        self.assertEqual(_signature(graph), _signature(columns_to_graph(nodes, edges)))
+
+    def test_artifacts(self):
+        app = Artifact(ArtifactDescriptor('grp', 'app', '1.0'), True)
+        lib = Artifact(ArtifactDescriptor('grp', 'lib', '1.0'))
+        app.add_dependency(ArtifactDependency(lib, 'runtime'))
+        graph = columns_to_graph(*graph_to_columns((app, lib)))
+        self.assertEqual(_signature(ArtifactGraph.from_artifacts((app, lib))), _signature(graph))
+
+    def test_npz(self):
+        graph = _graph()
+        path = os.path.join(self._dir, 'graph.npz')
+        write_npz_graph(graph, path, compressed=True)
+        loaded = read_npz_graph(path)
+        self.assertEqual(_signature(graph), _signature(loaded))
+        self.assertIs(graph.descriptor(3), loaded.descriptor(3))
+        self.assertIs(str, type(loaded.descriptor(3).group_id))
+        self.assertIsNone(loaded._version_index)
+        self.assertIs(loaded.artifact(0).version_index, loaded.artifact(len(loaded) - 1).version_index)
+        self.assertEqual({'1.0'}, set(loaded._version_index.versions(loaded.descriptor(len(loaded) - 1))))
+
+        loaded.add_dependency(1, 0, 'runtime')
+        self.assertIn((1, 'runtime'), list(loaded.dependents(0)))
+        self.assertTrue(loaded.remove_dependency(1, 0))
+        self.assertEqual(_signature(graph), _signature(loaded))
+
+    def test_invalid_columns(self):
+        nodes, edges = graph_to_columns(_graph())
+        edges['target'] = edges['target'].copy()
+        edges['target'][0] = len(nodes['in_reactor'])
+        self.assertRaises(ValueError, columns_to_graph, nodes, edges)
+
+    def test_parquet(self):
+        try:
+            import pyarrow
+        except ImportError:
+            self.skipTest('pyarrow is not available')
+        graph = _graph()
+        path = os.path.join(self._dir, 'graph')
+        write_parquet_graph(graph, path)
+        self.assertEqual(_signature(graph), _signature(read_parquet_graph(path)))
+
+        nodes, edges = graph_to_arrow(graph)
+        self.assertEqual(list(range(0, len(graph))), nodes.column('id').to_pylist())
+        plain = edges.set_column(edges.column_names.index('scope'), 'scope',
+                                 pyarrow.array(edges.column('scope').to_pylist()))
+        self.assertEqual(_signature(graph), _signature(arrow_to_graph(nodes, plain)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from mavendeps import ArtifactDescriptor, Artifact, ArtifactDependency, TransitiveClosure, read_maven_graph
+from mavendeps.graph_algorithms import strongly_connected_components
+
+__author__ = 'Tony Ganchev'
+
+
+class StronglyConnectedComponentsTestCase(unittest.TestCase):
+    def test_reverse_topological_order(self):
+        components = strongly_connected_components([[1], [2], [1, 3], []])
+        self.assertEqual([[3], [1, 2], [0]], [sorted(c) for c in components])
+
+    def test_deep_chain(self):
+        count = 50000
+        components = strongly_connected_components([[i + 1] for i in range(0, count - 1)] + [[0]])
+        self.assertEqual(1, len(components))
+        self.assertEqual(count, len(components[0]))
+
+
+class TransitiveClosureTestCase(unittest.TestCase):
+    def test_cycle(self):
+        a, b, c, d = (Artifact(ArtifactDescriptor('grp', i, '1.0')) for i in ('a', 'b', 'c', 'd'))
+        for source, target in ((a, b), (b, c), (c, b), (c, d)):
+            source.add_dependency(ArtifactDependency(target))
+
+        closure = TransitiveClosure((a,))
+        self.assertSequenceEqual((b, c, d), closure.closure(a))
+        self.assertSequenceEqual((c, d), closure.closure(b))
+        self.assertSequenceEqual((b, d), closure.closure(c))
+        self.assertSequenceEqual((), closure.closure(d))
+        self.assertTrue(closure.reaches(a, d))
+        self.assertFalse(closure.reaches(d, a))
+        self.assertEqual(3, closure.size(a))
+
+        reverse = TransitiveClosure((d,), reverse=True)
+        self.assertSequenceEqual((c, b, a), reverse.closure(d))
+
+    def test_karaf_sample(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        dependencies = TransitiveClosure(artifacts)
+        dependents = TransitiveClosure(artifacts, reverse=True)
+        for artifact in artifacts:
+            self.assertEqual(sorted(str(a.descriptor) for a in artifact.all_dependencies),
+                             sorted(str(a.descriptor) for a in dependencies.closure(artifact)))
+            self.assertEqual(sorted(str(a.descriptor) for a in artifact.all_dependents),
+                             sorted(str(a.descriptor) for a in dependents.closure(artifact)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mavendeps import ArtifactDescriptor, ArtifactGraph, filter_artifacts, read_artifact_graph, \
+    superseded_version_filter
+from mavendeps.graph_cache import save_graph, load_graph, read_cached_artifact_graph
+
+from helpers import graph_signature
+
+__author__ = 'Tony Ganchev'
+
+
+class GraphCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_round_trip(self):
+        graph = ArtifactGraph()
+        a = graph.add_artifact(ArtifactDescriptor('grp', 'a', '1.0', 'jar', 'tests'), True)
+        b = graph.add_artifact(ArtifactDescriptor('grp', 'b', '1.0'))
+        c = graph.add_artifact(ArtifactDescriptor('other', 'c', '2.0', 'war'))
+        graph.add_dependency(a, b, 'test')
+        graph.add_dependency(a, c, 'custom')
+        graph.add_dependency(b, c)
+        graph.remove_dependency(b, c)
+
+        path = os.path.join(self._dir, 'graph.bin')
+        save_graph(graph, path)
+        loaded = load_graph(path)
+        self.assertEqual(graph_signature(graph.artifacts()), graph_signature(loaded.artifacts()))
+        self.assertIs(graph.descriptor(a), loaded.descriptor(a))
+
+        loaded.remove_dependency(a, b)
+        d = loaded.add_artifact(ArtifactDescriptor('grp', 'd', '1.0'))
+        loaded.add_dependency(d, a, 'runtime')
+        self.assertSequenceEqual(((c, 'custom'),), tuple(loaded.dependencies(a)))
+        self.assertSequenceEqual(((d, 'runtime'),), tuple(loaded.dependents(a)))
+        self.assertEqual(graph_signature(graph.artifacts()), graph_signature(load_graph(path).artifacts()))
+
+    def test_version_index_spans_components(self):
+        graph = ArtifactGraph()
+        a, b, c, d1, d2 = (graph.add_artifact(ArtifactDescriptor(group_id, artifact_id, version))
+                           for group_id, artifact_id, version in (('g', 'a', '1.0'), ('g', 'b', '1.0'),
+                                                                  ('h', 'c', '1.0'), ('h', 'd', '1.0'),
+                                                                  ('h', 'd', '2.0')))
+        graph.add_dependency(a, b)
+        graph.add_dependency(c, d1)
+        graph.add_dependency(c, d2)
+        path = os.path.join(self._dir, 'graph.bin')
+        save_graph(graph, path)
+
+        loaded = load_graph(path)
+        self.assertFalse(loaded.artifact(a).version_index.is_conflicting(loaded.descriptor(a)))
+        self.assertTrue(loaded.artifact(d1).version_index.is_conflicting(loaded.descriptor(d1)))
+        kept = filter_artifacts(load_graph(path).artifacts(), (superseded_version_filter(),))
+        self.assertEqual(['g:a:1.0', 'g:b:1.0', 'h:c:1.0', 'h:d:2.0'],
+                         sorted('{0.group_id}:{0.artifact_id}:{0.version}'.format(k.descriptor) for k in kept))
+
+    def test_invalid_file(self):
+        path = os.path.join(self._dir, 'graph.bin')
+        with open(path, 'wb') as f:
+            f.write(b'something else entirely, long enough for a header')
+        self.assertIsNone(load_graph(path))
+
+    def test_read_cached(self):
+        source = os.path.join(self._dir, 'karaf-sample.dot')
+        shutil.copyfile('tests/karaf-sample.dot', source)
+        cache_dir = os.path.join(self._dir, 'cache')
+
+        expected = graph_signature(read_artifact_graph(source).artifacts())
+        self.assertEqual(expected, graph_signature(read_cached_artifact_graph(source, cache_dir).artifacts()))
+        self.assertEqual(2, len(os.listdir(cache_dir)))
+        self.assertEqual(expected, graph_signature(read_cached_artifact_graph(source, cache_dir).artifacts()))
+
+        os.utime(source, (0, 0))
+        self.assertEqual(expected, graph_signature(read_cached_artifact_graph(source, cache_dir).artifacts()))
+        self.assertEqual(2, len(os.listdir(cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import unittest
+
+__author__ = 'Tony Ganchev'
+
+# generous compared to the ~60ms it takes on a laptop, it is meant to catch heavy eager imports, not to benchmark.
+IMPORT_BUDGET_SECONDS = 0.5
+
+IMPORT_SCRIPT = '''
+import sys
+import time
+start = time.time()
+import mavendeps
+print(time.time() - start)
+print(' '.join(m for m in ('pydot', 'pyparsing', 'numpy', 'yaml', 'multiprocessing') if m in sys.modules))
+'''
+
+
+def _run(script):
+    return subprocess.check_output([sys.executable, '-c', script]).decode('utf-8').splitlines()
+
+
+class ImportTestCase(unittest.TestCase):
+    def test_model_import_is_light(self):
+        seconds, modules = _run(IMPORT_SCRIPT)
+        self.assertEqual(modules, '')
+        self.assertLess(float(seconds), IMPORT_BUDGET_SECONDS)
+
+    def test_pydot_loaded_on_first_use(self):
+        self.assertEqual(_run('import sys\n'
+                              'from mavendeps import parse_dot_graph, dot_to_maven_graph\n'
+                              'print("pydot" in sys.modules)\n'
+                              'artifacts = dot_to_maven_graph(parse_dot_graph("tests/karaf-sample.dot"))\n'
+                              'print("{} {}".format("pydot" in sys.modules, len(artifacts)))\n'),
+                         ['False', 'True 30'])
+
+
+if __name__ == '__main__':
+    unittest.main()
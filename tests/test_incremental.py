@@ -0,0 +1,159 @@
+import io
+import random
+import unittest
+
+from mavendeps import FilterAction, IncrementalPipeline, Artifact, ArtifactDescriptor, ArtifactDependency, \
+    read_maven_graph, filter_artifacts, write_dot_graph, in_reactor_filter, reject_any
+from mavendeps.rules import RuleSet
+
+from helpers import exclude_non_reactor_dependencies
+
+__author__ = 'Tony Ganchev'
+
+
+def dependents_style(artifact, node):
+    node.set('xlabel', len(tuple(artifact.dependents)))
+
+
+class CountingFilter:
+    def __init__(self, filter_func):
+        self.__name__ = filter_func.__name__
+        self._filter_func = filter_func
+        self.calls = 0
+
+    def __call__(self, artifact):
+        self.calls += 1
+        return self._filter_func(artifact)
+
+
+def _full_run(artifacts, filter_chain, style_functions):
+    f = io.StringIO()
+    write_dot_graph(filter_artifacts(artifacts, filter_chain), f, style_functions)
+    return f.getvalue()
+
+
+def _mutate(artifacts, rng):
+    """
+    Applies a random small change to the graph: a new artifact, a removed or added edge or a flipped reactor flag.
+    """
+    kind = rng.randrange(0, 4)
+    if kind == 0:
+        artifact = Artifact(ArtifactDescriptor('org.example', 'new-{}'.format(len(artifacts)), '1.0'),
+                            rng.random() < 0.5)
+        dependent = rng.choice(artifacts)
+        dependent.add_dependency(ArtifactDependency(artifact))
+        artifact.add_dependent(ArtifactDependency(dependent))
+        artifacts.append(artifact)
+    elif kind == 1:
+        candidates = [a for a in artifacts if tuple(a.dependencies)]
+        source = rng.choice(candidates)
+        target = rng.choice(tuple(source.dependencies)).artifact
+        source.remove_dependency(target)
+        target.remove_dependent(source)
+    elif kind == 2:
+        source, target = rng.sample(artifacts, 2)
+        if target not in [d.artifact for d in source.dependencies]:
+            source.add_dependency(ArtifactDependency(target, 'runtime'))
+            target.add_dependent(ArtifactDependency(source, 'runtime'))
+    else:
+        artifact = rng.choice(artifacts)
+        artifact._in_reactor = not artifact.in_reactor
+        artifact._modified()
+
+
+class IncrementalPipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self._filters = [CountingFilter(f) for f in (in_reactor_filter(), exclude_non_reactor_dependencies,
+                                                     reject_any)]
+        self._style_functions = dependents_style,
+
+    def _update(self, pipeline, artifacts):
+        pipeline.update(artifacts)
+        f = io.StringIO()
+        pipeline.write_dot(f)
+        return f.getvalue()
+
+    def test_matches_full_run(self):
+        rng = random.Random(7)
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        pipeline = IncrementalPipeline(self._filters, self._style_functions)
+        for _ in range(0, 30):
+            self.assertEqual(self._update(pipeline, artifacts),
+                             _full_run(artifacts, self._filters, self._style_functions))
+            _mutate(artifacts, rng)
+
+    def test_unchanged_graph_replays(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        pipeline = IncrementalPipeline(self._filters, self._style_functions)
+        expected = self._update(pipeline, artifacts)
+        calls = [f.calls for f in self._filters]
+        self.assertEqual(self._update(pipeline, artifacts), expected)
+        self.assertEqual([f.calls for f in self._filters], calls)
+        self.assertEqual(pipeline.dirty, frozenset())
+
+    def test_small_change_is_local(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        pipeline = IncrementalPipeline(self._filters, self._style_functions)
+        self._update(pipeline, artifacts)
+        _mutate(artifacts, random.Random(1))
+        self.assertEqual(self._update(pipeline, artifacts),
+                         _full_run(artifacts, self._filters, self._style_functions))
+        self.assertLess(len(pipeline.dirty), len(artifacts) // 2)
+
+    def test_tags_change(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        pipeline = IncrementalPipeline(self._filters, self._style_functions)
+        self._update(pipeline, artifacts)
+        artifacts[3].tags.add('tag')
+        self._update(pipeline, artifacts)
+        self.assertIn(artifacts[3].descriptor, pipeline.dirty)
+
+    def _saved_state(self, filter_chain, **args):
+        pipeline = IncrementalPipeline(filter_chain, self._style_functions, **args)
+        self._update(pipeline, read_maven_graph('tests/karaf-sample.dot'))
+        f = io.BytesIO()
+        pipeline.save_state(f)
+        f.seek(0)
+        return f
+
+    def test_saved_state(self):
+        filter_chain = in_reactor_filter(), exclude_non_reactor_dependencies, reject_any
+        f = self._saved_state(filter_chain)
+        restored = IncrementalPipeline(filter_chain, self._style_functions)
+        self.assertTrue(restored.load_state(f))
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        _mutate(artifacts, random.Random(3))
+        self.assertEqual(self._update(restored, artifacts),
+                         _full_run(artifacts, filter_chain, self._style_functions))
+
+        other = IncrementalPipeline(filter_chain[:2], self._style_functions)
+        f.seek(0)
+        self.assertFalse(other.load_state(f))
+
+    def test_saved_state_keys_configuration(self):
+        f = self._saved_state((in_reactor_filter(), reject_any))
+        self.assertTrue(IncrementalPipeline((in_reactor_filter(), reject_any), self._style_functions).load_state(f))
+        f.seek(0)
+        self.assertFalse(IncrementalPipeline((in_reactor_filter(FilterAction.reject), reject_any),
+                                             self._style_functions).load_state(f))
+
+        rules = {'filters': [{'when': {'in_reactor': True}, 'action': 'accept'}, {'action': 'reject'}]}
+        f = self._saved_state((RuleSet.from_dict(rules).filter,))
+        self.assertTrue(IncrementalPipeline((RuleSet.from_dict(rules).filter,), self._style_functions).load_state(f))
+        f.seek(0)
+        other_rules = {'filters': [{'when': {'packaging': 'kar'}, 'action': 'accept'}, {'action': 'reject'}]}
+        self.assertFalse(IncrementalPipeline((RuleSet.from_dict(other_rules).filter,),
+                                             self._style_functions).load_state(f))
+
+    def test_unkeyed_chain_is_not_persisted(self):
+        pipeline = IncrementalPipeline(self._filters, self._style_functions)
+        self._update(pipeline, read_maven_graph('tests/karaf-sample.dot'))
+        self.assertRaises(ValueError, pipeline.save_state, io.BytesIO())
+        self.assertRaises(ValueError, IncrementalPipeline((lambda a: FilterAction.reject,)).save_state, io.BytesIO())
+
+        f = self._saved_state(self._filters, state_key='counted')
+        self.assertTrue(IncrementalPipeline(self._filters, self._style_functions, state_key='counted').load_state(f))
+
+
+if __name__ == '__main__':
+    unittest.main()
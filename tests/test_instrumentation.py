@@ -0,0 +1,85 @@
+import io
+import json
+import unittest
+
+from mavendeps import FilterAction, PipelineRecorder, read_maven_graph, filter_artifacts, write_dot_graph, \
+    in_reactor_filter, reject_any
+from mavendeps.instrumentation import active_recorder
+
+from helpers import NativeStringIO, exclude_non_reactor_dependencies
+
+__author__ = 'Tony Ganchev'
+
+
+def in_reactor_style(artifact, node):
+    if artifact.in_reactor:
+        node.set_fillcolor('"lightgreen"')
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def _run_pipeline(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        filter_chain = in_reactor_filter(), exclude_non_reactor_dependencies, reject_any
+        artifacts = filter_artifacts(artifacts, filter_chain)
+        write_dot_graph(artifacts, io.StringIO(), (in_reactor_style,))
+        return artifacts
+
+    def test_inactive_by_default(self):
+        self.assertIsNone(active_recorder())
+        with PipelineRecorder() as recorder:
+            self.assertIs(active_recorder(), recorder)
+        self.assertIsNone(active_recorder())
+
+    def test_stages(self):
+        received = []
+        with PipelineRecorder(received.append) as recorder:
+            artifacts = self._run_pipeline()
+        self.assertEqual(received, recorder.events)
+
+        stages = [e['stage'] for e in recorder.events]
+        self.assertEqual(stages, ['read_maven_graph', 'filter_pass', 'filter_pass', 'filter_pass', 'filter_artifacts',
+                                  'write_dot_graph'])
+        read, first, second, third, total, write = recorder.events
+        for event in recorder.events:
+            self.assertGreaterEqual(event['seconds'], 0)
+
+        self.assertEqual(read['artifacts'], len(read_maven_graph('tests/karaf-sample.dot')))
+        self.assertEqual([p['filter'] for p in (first, second, third)],
+                         ['in_reactor', 'exclude_non_reactor_dependencies', 'reject_any'])
+
+        # every artifact not accepted yet is passed to each filter exactly once.
+        self.assertEqual(sum(first['actions'].values()), read['artifacts'])
+        accepted = first['actions'].get(FilterAction.accept, 0)
+        self.assertEqual(second['calls']['exclude_non_reactor_dependencies'], read['artifacts'] - accepted)
+        accepted += second['actions'].get(FilterAction.accept, 0)
+        self.assertEqual(sum(third['actions'].values()), read['artifacts'] - accepted)
+        self.assertEqual(third['actions'], {FilterAction.reject: read['artifacts'] - accepted})
+
+        self.assertEqual(third['artifacts'], len(artifacts))
+        self.assertEqual(total['artifacts'], len(artifacts))
+        self.assertEqual(total['edges'], sum(len(tuple(a.dependencies)) for a in artifacts))
+        self.assertEqual(write['calls'], {'in_reactor_style': len(artifacts)})
+        self.assertIn('in_reactor_style', write['function_seconds'])
+
+    def test_dumps(self):
+        with PipelineRecorder() as recorder:
+            self._run_pipeline()
+        f = NativeStringIO()
+        recorder.dump_json(f)
+        self.assertEqual(len(json.loads(f.getvalue())['events']), len(recorder.events))
+
+        f = NativeStringIO()
+        recorder.dump_chrome_trace(f)
+        trace = json.loads(f.getvalue())['traceEvents']
+        self.assertEqual(len(trace), len(recorder.events))
+        self.assertTrue(all(e['ph'] == 'X' for e in trace))
+        self.assertIn('filter_pass reject_any', [e['name'] for e in trace])
+        total = [e for e in trace if e['name'] == 'filter_artifacts'][0]
+        for e in trace:
+            if e['name'].startswith('filter_pass'):
+                self.assertGreaterEqual(e['ts'], total['ts'])
+                self.assertLessEqual(e['ts'] + e['dur'], total['ts'] + total['dur'] + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,46 +1,46 @@
+import io
+import sys
 import unittest
 
 from mavendeps import FilterAction, parse_dot_graph, dot_to_maven_graph, reject_any, filter_artifacts, \
-    maven_to_dot_graph
-from pydot import graph_from_dot_file
+    maven_to_dot_graph, write_dot_graph
+from pydot import graph_from_dot_file, graph_from_dot_data
+
+from helpers import exclude_non_reactor_dependencies
 
 __author__ = 'Tony Ganchev'
 
 
-class IntegrationTestCase(unittest.TestCase):
-    def test_karaf_sample(self):
-        def include_reactor_artifacts(artifact):
-            return FilterAction.accept if artifact.in_reactor else FilterAction.no_action
+def include_reactor_artifacts(artifact):
+    return FilterAction.accept if artifact.in_reactor else FilterAction.no_action
+
+
+def in_reactor_style(artifact, node):
+    if artifact.in_reactor:
+        node.set_penwidth(2)
+        node.set_fillcolor('"lightgreen"')
 
-        def exclude_non_reactor_dependencies(artifact):
-            for a in artifact.dependents:
-                if a.artifact.in_reactor:
-                    return FilterAction.accept
-            return FilterAction.no_action
 
-        def in_reactor_style(artifact, node):
-            if artifact.in_reactor:
-                node.set_penwidth(2)
-                node.set_fillcolor('"lightgreen"')
+def kar_style(artifact, node):
+    if artifact.descriptor.packaging == 'kar':
+        node.set_fillcolor('"pink"')
 
-        def kar_style(artifact, node):
-            if artifact.descriptor.packaging == 'kar':
-                node.set_fillcolor('"pink"')
 
-        def assembly_style(artifact, node):
-            if artifact.descriptor.packaging == 'karaf-assembly':
-                node.set_fillcolor('"yellow"')
+def assembly_style(artifact, node):
+    if artifact.descriptor.packaging == 'karaf-assembly':
+        return {'fillcolor': '"yellow"'}
 
+
+class IntegrationTestCase(unittest.TestCase):
+    def _filtered_karaf_sample(self):
         in_graph = parse_dot_graph('tests/karaf-sample.dot')
 
         artifacts = dot_to_maven_graph(in_graph)
 
         filter_functions = include_reactor_artifacts, exclude_non_reactor_dependencies, reject_any
-        artifacts = filter_artifacts(artifacts, filter_functions)
-
-        style_functions = in_reactor_style, kar_style, assembly_style
-        out_graph = maven_to_dot_graph(artifacts, style_functions)
+        return filter_artifacts(artifacts, filter_functions)
 
+    def _assert_expected_graph(self, out_graph):
         self.maxDiff = None
         expected_graph = graph_from_dot_file('tests/karaf-sample-modified.expected.dot')[0]
 
@@ -54,8 +54,27 @@ class IntegrationTestCase(unittest.TestCase):
                 self.assertEqual(actual_ev[key], expected_ev[key])
         for nk, actual_nv in out_graph.obj_dict['nodes'].items():
             actual_nv = actual_nv[0]
-            print(actual_ev)
             expected_nv = expected_graph.obj_dict['nodes'][nk][0]
-            print(expected_ev)
             for key in 'name', 'type', 'port':
                 self.assertAlmostEqual(actual_nv[key], expected_nv[key])
+
+    def test_karaf_sample(self):
+        artifacts = self._filtered_karaf_sample()
+
+        style_functions = in_reactor_style, kar_style, assembly_style
+        out_graph = maven_to_dot_graph(artifacts, style_functions)
+
+        self._assert_expected_graph(out_graph)
+
+    def test_karaf_sample_streaming(self):
+        artifacts = self._filtered_karaf_sample()
+
+        style_functions = in_reactor_style, kar_style, assembly_style
+        f = io.StringIO()
+        write_dot_graph(artifacts, f, style_functions)
+        out_graph = graph_from_dot_data(f.getvalue())[0]
+
+        self._assert_expected_graph(out_graph)
+        if sys.version_info >= (3, 7):
+            # pydot keeps nodes and attributes in dicts, whose order only follows insertion from Python 3.7 on.
+            self.assertEqual(maven_to_dot_graph(artifacts, style_functions).to_string(), f.getvalue())
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mavendeps import parse_dot_graph, dot_to_maven_graph, read_maven_graph
+
+from helpers import graph_signature
+
+__author__ = 'Tony Ganchev'
+
+
+class ReadMavenGraphTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, data):
+        path = os.path.join(self._dir, 'graph.dot')
+        with open(path, 'w') as f:
+            f.write(data)
+        return path
+
+    def test_karaf_sample_matches_pydot(self):
+        expected = dot_to_maven_graph(parse_dot_graph('tests/karaf-sample.dot'))
+        actual = read_maven_graph('tests/karaf-sample.dot')
+        self.assertEqual(graph_signature(expected), graph_signature(actual))
+
+    def test_duplicate_edges(self):
+        path = self._write('digraph dependencies {\n'
+                           '  "a" [\n'
+                           '    label="grp\\na\\n1.0"\n'
+                           '    fillcolor="#dddddd"\n'
+                           '  ];\n'
+                           '  "b" [\n'
+                           '    label="grp\\nb\\nwar\\n1.0"\n'
+                           '  ];\n'
+                           '  "a" -> "b" [\n'
+                           '    label="test"\n'
+                           '  ];\n'
+                           '  "a" -> "b" [\n'
+                           '    label="runtime"\n'
+                           '  ];\n'
+                           '}\n')
+        (a, b) = sorted(read_maven_graph(path), key=lambda x: x.descriptor.artifact_id)
+        self.assertTrue(a.in_reactor)
+        self.assertFalse(b.in_reactor)
+        self.assertEqual('war', b.descriptor.packaging)
+        self.assertSequenceEqual((b,), tuple(d.artifact for d in a.dependencies))
+        self.assertSequenceEqual((a,), tuple(d.artifact for d in b.dependents))
+
+    def test_fallback_to_pydot(self):
+        path = self._write('digraph G { "a" [label="grp\\na\\n1.0"]; "b" [label="grp\\nb\\n1.0"]; '
+                           '"a" -> "b" [label=""]; }\n')
+        actual = read_maven_graph(path)
+        self.assertEqual(graph_signature(dot_to_maven_graph(parse_dot_graph(path))), graph_signature(actual))
+        self.assertEqual(2, len(actual))
+
+
+if __name__ == '__main__':
+    unittest.main()
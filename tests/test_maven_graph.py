@@ -1,7 +1,10 @@
+import copy
+import pickle
 import unittest
 
 from mavendeps import ArtifactDescriptor, Artifact, ArtifactDependency, filter_artifacts, FilterAction, reject_any, \
-    ignore_any, accept_any
+    ignore_any, accept_any, snapshot_artifacts, in_reactor_filter, packaging_filter, batch_filter, read_maven_graph, \
+    FilterCache, FilterDependency, filter_depends_on, PipelineRecorder, ArtifactGraph
 
 __author__ = 'Tony Ganchev'
 
@@ -19,6 +22,22 @@ class ArtifactDescriptorTestCase(unittest.TestCase):
         a = ArtifactDescriptor('a', 'b', 'c', 'd', 'e')
         b = ArtifactDescriptor('a', 'b', 'c', 'd', 'e')
         self.assertEqual(a, b)
+        self.assertNotEqual(a, ArtifactDescriptor('a', 'b', 'c', 'd'))
+        self.assertNotEqual(a, 'a:b:d:e:c')
+
+    def test_interned(self):
+        a = ArtifactDescriptor('a', 'b', 'c')
+        self.assertIs(a, ArtifactDescriptor('a', 'b', 'c', 'jar'))
+        self.assertIs(a, copy.deepcopy(a))
+        self.assertIs(a, pickle.loads(pickle.dumps(a)))
+        self.assertEqual(hash(('a', 'b', 'c', 'jar', None)), hash(a))
+
+    def test_immutable(self):
+        a = ArtifactDescriptor('a', 'b', 'c')
+        with self.assertRaises(AttributeError):
+            a.version = 'd'
+        with self.assertRaises(AttributeError):
+            a._version = 'd'
 
 
 class FilterArtifactsTestCase(unittest.TestCase):
@@ -148,6 +167,290 @@ class FilterArtifactsTestCase(unittest.TestCase):
         self.assertSequenceEqual(tuple(c.dependents), ())
         self.assertSequenceEqual(tuple(c.all_dependents), ())
 
+    def test_filter_leaves_input_intact(self):
+        (prod, cons1, cons2), _, _ = self._create_graph(('prod', 'cons1', 'cons2'),
+                                                        (('cons1', 'prod'), ('cons2', 'prod')))
+
+        filter_artifacts((prod, cons1, cons2), (reject_any,))
+
+        expected, _, _ = self._create_graph(('prod', 'cons1', 'cons2'), (('cons1', 'prod'), ('cons2', 'prod')))
+        self._assert_graphs_equal(expected, (prod, cons1, cons2))
+
+    def test_filter_deep_chain(self):
+        artifact_ids = tuple('a{}'.format(i) for i in range(0, 20000))
+        artifacts, _, _ = self._create_graph(artifact_ids, zip(artifact_ids[1:], artifact_ids[:-1]))
+
+        def f(a): return FilterAction.reject if a.descriptor.artifact_id == 'a1' else FilterAction.no_action
+
+        result = filter_artifacts(artifacts, (f,))
+        self.assertEqual(len(artifact_ids) - 1, len(result))
+        self.assertSequenceEqual((), tuple(result[0].dependents))
+        self.assertSequenceEqual((), tuple(result[1].dependencies))
+
+    def test_diamond_closure(self):
+        (a, b, c, d), _, _ = self._create_graph(('a', 'b', 'c', 'd'),
+                                                (('a', 'b'), ('a', 'c'), ('b', 'd'), ('c', 'd')))
+        self.assertSequenceEqual((b, d, c), a.all_dependencies)
+        self.assertSequenceEqual((b, a, c), d.all_dependents)
+
+    def test_cyclic_closure(self):
+        (a, b, c), _, _ = self._create_graph(('a', 'b', 'c'), (('a', 'b'), ('b', 'c'), ('c', 'a')))
+        self.assertSequenceEqual((b, c), a.all_dependencies)
+        self.assertSequenceEqual((c, b), a.all_dependents)
+
+    def test_closure_invalidation(self):
+        (a, b, c), _, _ = self._create_graph(('a', 'b', 'c'), (('a', 'b'),))
+        self.assertSequenceEqual((b,), a.all_dependencies)
+        self.assertSequenceEqual((), c.all_dependents)
+
+        b.add_dependency(ArtifactDependency(c))
+        self.assertSequenceEqual((b, c), a.all_dependencies)
+        self.assertSequenceEqual((b, a), c.all_dependents)
+
+        a.remove_dependency(b)
+        self.assertSequenceEqual((), a.all_dependencies)
+        self.assertSequenceEqual((b,), c.all_dependents)
+
+    def test_closures_survive_other_graph_changes(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        closures = [a.all_dependencies for a in artifacts]
+        filter_artifacts(artifacts, (in_reactor_filter(), lambda a: FilterAction.reject))
+        (x, y), _, _ = self._create_graph(('x', 'y'), ())
+        x.add_dependency(ArtifactDependency(y))
+        for artifact, closure in zip(artifacts, closures):
+            self.assertIs(closure, artifact.all_dependencies)
+
+    def test_graph_versions_merge_flat(self):
+        chain = [Artifact(ArtifactDescriptor('grp', 'a{}'.format(i), '1.0')) for i in range(0, 50)]
+        for dependent, dependency in zip(chain[1:], chain):
+            dependent.add_dependency(ArtifactDependency(dependency))
+        root = chain[0]._version()
+        self.assertTrue(all(a._graph_version is root or a._graph_version.parent is root for a in chain))
+
+
+class BatchFilterTestCase(unittest.TestCase):
+    @staticmethod
+    def _signature(artifacts):
+        return [(str(a.descriptor), sorted(str(d.artifact.descriptor) for d in a.dependencies),
+                 sorted(str(d.artifact.descriptor) for d in a.dependents)) for a in artifacts]
+
+    def test_stock_batch_filters(self):
+        for f in accept_any, reject_any, ignore_any, in_reactor_filter(), packaging_filter('kar'):
+            self.assertTrue(hasattr(f, 'filter_batch'))
+
+    def test_batch_matches_scalar(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+
+        def in_reactor(a): return FilterAction.accept if a.in_reactor else FilterAction.no_action
+
+        def kar(a): return FilterAction.reject if a.descriptor.packaging == 'kar' else FilterAction.no_action
+
+        def jar(a): return FilterAction.accept if a.descriptor.packaging == 'jar' else FilterAction.no_action
+
+        expected = filter_artifacts(artifacts, (in_reactor, kar, jar, lambda a: FilterAction.reject))
+        actual = filter_artifacts(artifacts, (in_reactor_filter(), packaging_filter('kar', FilterAction.reject),
+                                              packaging_filter('jar'), reject_any))
+        self.assertTrue(len(actual) > 0)
+        self.assertEqual(self._signature(expected), self._signature(actual))
+
+    def test_custom_batch_filter(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+
+        @batch_filter(lambda columns: columns.select(columns.group_id == 'org.osgi', FilterAction.reject))
+        def reject_osgi(a):
+            return FilterAction.reject if a.descriptor.group_id == 'org.osgi' else FilterAction.no_action
+
+        result = filter_artifacts(artifacts, (reject_osgi,))
+        self.assertEqual(len(artifacts) - 1, len(result))
+        for artifact in result:
+            for d in artifact.dependencies:
+                self.assertNotEqual('org.osgi', d.artifact.descriptor.group_id)
+
+
+class FilterCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = {}
+
+        def counted(name, f):
+            def counted_filter(artifact):
+                self.calls[name] = self.calls.get(name, 0) + 1
+                return f(artifact)
+            return counted_filter
+
+        @filter_depends_on(FilterDependency.artifact)
+        def include_reactor(artifact):
+            return FilterAction.accept if artifact.in_reactor else FilterAction.no_action
+
+        @filter_depends_on(FilterDependency.neighbours)
+        def reactor_dependencies(artifact):
+            for d in artifact.dependents:
+                if d.artifact.in_reactor:
+                    return FilterAction.accept
+            return FilterAction.no_action
+
+        def reject_kar(artifact):
+            return FilterAction.reject if artifact.descriptor.packaging == 'kar' else FilterAction.no_action
+
+        self.include_reactor = filter_depends_on(FilterDependency.artifact)(counted('reactor', include_reactor))
+        self.reactor_dependencies = filter_depends_on(FilterDependency.neighbours)(
+            counted('dependencies', reactor_dependencies))
+        self.reject_kar = counted('kar', reject_kar)
+        self.reject_rest = filter_depends_on(FilterDependency.artifact)(counted('rest', lambda a: FilterAction.reject))
+
+    @staticmethod
+    def _signature(artifacts):
+        return [(str(a.descriptor), sorted(str(d.artifact.descriptor) for d in a.dependencies)) for a in artifacts]
+
+    def test_cached_results_match(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        cache = FilterCache()
+        chains = ((self.include_reactor, self.reactor_dependencies, self.reject_rest),
+                  (self.reject_kar, self.include_reactor, self.reactor_dependencies, self.reject_rest),
+                  (self.include_reactor, self.reactor_dependencies, self.reject_rest))
+        for chain in chains:
+            self.assertEqual(self._signature(filter_artifacts(artifacts, chain)),
+                             self._signature(filter_artifacts(artifacts, chain, cache)))
+        self.assertGreater(cache.hits, 0)
+        self.assertEqual(cache.misses, len(cache))
+
+    def test_evaluated_once_per_artifact(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        chain = self.include_reactor, self.reactor_dependencies, self.reject_kar, self.reject_rest
+        filter_artifacts(artifacts, chain)
+        single_run = dict(self.calls)
+        self.calls.clear()
+        cache = FilterCache()
+        for _ in range(0, 3):
+            filter_artifacts(artifacts, chain, cache)
+        self.assertEqual(len(artifacts), self.calls['reactor'])
+        self.assertEqual(single_run['dependencies'], self.calls['dependencies'])
+        self.assertEqual(single_run['rest'], self.calls['rest'])
+        self.assertEqual(3 * single_run['kar'], self.calls['kar'])
+
+    def test_neighbourhood_invalidation(self):
+        app = Artifact(ArtifactDescriptor('grp', 'app', '1.0'), True)
+        lib = Artifact(ArtifactDescriptor('grp', 'lib', '1.0'))
+        app.add_dependency(ArtifactDependency(lib))
+        cache = FilterCache()
+        chain = self.include_reactor, self.reactor_dependencies, self.reject_rest
+        self.assertEqual(['app', 'lib'], [a.descriptor.artifact_id for a in filter_artifacts((app, lib), chain, cache)])
+        self.assertEqual(1, self.calls['dependencies'])
+        app.remove_dependency(lib)
+        for _ in range(0, 2):
+            self.assertEqual(['app'], [a.descriptor.artifact_id for a in filter_artifacts((app, lib), chain, cache)])
+        self.assertEqual(2, self.calls['dependencies'])
+
+    def test_neighbourhood_invalidation_on_views(self):
+        graph = ArtifactGraph()
+        app = graph.add_artifact(ArtifactDescriptor('grp', 'app', '1.0'), True)
+        lib = graph.add_artifact(ArtifactDescriptor('grp', 'lib', '1.0'))
+        graph.add_dependency(app, lib)
+        cache = FilterCache()
+        chain = self.include_reactor, self.reactor_dependencies, self.reject_rest
+        for _ in range(0, 2):
+            self.assertEqual(['app', 'lib'], [a.descriptor.artifact_id
+                                              for a in filter_artifacts(graph.artifacts(), chain, cache)])
+        self.assertEqual(1, self.calls['dependencies'])
+        graph.remove_dependency(app, lib)
+        for _ in range(0, 2):
+            self.assertEqual(['app'], [a.descriptor.artifact_id
+                                       for a in filter_artifacts(graph.artifacts(), chain, cache)])
+        self.assertEqual(2, self.calls['dependencies'])
+
+    def test_undeclared_filters_are_not_cached(self):
+        cache = FilterCache()
+        self.assertIs(self.reject_kar, cache.cached(self.reject_kar))
+        self.assertIs(reject_any, cache.cached(reject_any))
+        self.assertIsNot(self.include_reactor, cache.cached(self.include_reactor))
+
+
+class SnapshotArtifactsTestCase(unittest.TestCase):
+    def test_snapshot(self):
+        prod = Artifact(ArtifactDescriptor('grp', 'prod', '1.0.0'), True)
+        cons = Artifact(ArtifactDescriptor('grp', 'cons', '1.0.0'))
+        cons.add_dependency(ArtifactDependency(prod, 'test'))
+        prod.tags.add('tag')
+
+        (cons_copy,) = snapshot_artifacts((cons,))
+        self.assertIsNot(cons, cons_copy)
+        self.assertIs(cons.descriptor, cons_copy.descriptor)
+
+        (dep,) = tuple(cons_copy.dependencies)
+        prod_copy = dep.artifact
+        self.assertIsNot(prod, prod_copy)
+        self.assertEqual('test', dep.scope)
+        self.assertTrue(prod_copy.in_reactor)
+        self.assertEqual({'tag'}, prod_copy.tags)
+        self.assertSequenceEqual((ArtifactDependency(cons_copy, 'test'),), tuple(prod_copy.dependents))
+
+        prod_copy.tags.add('other')
+        cons_copy.remove_dependency(prod_copy)
+        self.assertEqual({'tag'}, prod.tags)
+        self.assertSequenceEqual((ArtifactDependency(prod, 'test'),), tuple(cons.dependencies))
+
+
+
+class FixedPointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def reject_unused(self, artifact):
+        self.calls += 1
+        unused = not artifact.in_reactor and not any(True for _ in artifact.dependents)
+        return FilterAction.reject if unused else FilterAction.no_action
+
+    @staticmethod
+    def _chain():
+        """
+        app -> core and an unused tail -> middle -> head listed head first so that a single pass only rejects tail.
+        """
+        artifacts = [Artifact(ArtifactDescriptor('grp', name, '1.0'), name == 'app')
+                     for name in ('head', 'middle', 'tail', 'core', 'app')]
+        for source, target in ((2, 1), (1, 0), (4, 3)):
+            artifacts[source].add_dependency(ArtifactDependency(artifacts[target]))
+        return artifacts
+
+    @staticmethod
+    def _names(artifacts):
+        return sorted(a.descriptor.artifact_id for a in artifacts)
+
+    def test_cascading_rejects(self):
+        artifacts = self._chain()
+        self.assertEqual(['app', 'core', 'head', 'middle'],
+                         self._names(filter_artifacts(artifacts, (self.reject_unused,))))
+        self.assertEqual(['app', 'core'], self._names(filter_artifacts(artifacts, (self.reject_unused,) * 3)))
+        self.calls = 0
+        self.assertEqual(['app', 'core'],
+                         self._names(filter_artifacts(artifacts, (self.reject_unused,), fixed_point=True)))
+        self.assertEqual(len(artifacts) + 2, self.calls)
+
+    def test_matches_repeated_passes(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        chain = in_reactor_filter(), self.reject_unused, packaging_filter('kar', FilterAction.reject)
+        repeated = chain[:1] + (self.reject_unused,) * len(artifacts) + chain[2:]
+        expected = sorted(str(a.descriptor) for a in filter_artifacts(artifacts, repeated))
+        self.assertEqual(expected, sorted(str(a.descriptor) for a in filter_artifacts(artifacts, chain,
+                                                                                        fixed_point=True)))
+
+    def test_accepted_artifacts_are_final(self):
+        artifacts = self._chain()
+
+        @filter_depends_on(FilterDependency.artifact)
+        def accept_middle(artifact):
+            return FilterAction.accept if artifact.descriptor.artifact_id == 'middle' else FilterAction.no_action
+
+        self.assertEqual(['app', 'core', 'head', 'middle'],
+                         self._names(filter_artifacts(artifacts, (accept_middle, self.reject_unused),
+                                                      fixed_point=True)))
+
+    def test_rounds_are_recorded(self):
+        with PipelineRecorder() as recorder:
+            filter_artifacts(self._chain(), (reject_any, self.reject_unused), fixed_point=True)
+            filter_artifacts(self._chain(), (self.reject_unused,), fixed_point=True)
+        passes = [e for e in recorder.events if e['stage'] == 'filter_pass']
+        self.assertNotIn('rounds', passes[0])
+        self.assertEqual([0, 2], [e['rounds'] for e in passes[1:]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mavendeps import read_maven_graph, read_merged_maven_graph, read_merged_artifact_graph
+from mavendeps.maven_dot import expand_sources
+from mavendeps.merge import main
+
+from helpers import graph_signature
+
+__author__ = 'Tony Ganchev'
+
+
+def _node(name, label, reactor=False):
+    return '  "{}" [\n    label="{}"\n    fillcolor="{}"\n  ];\n'.format(name, label, '#dddddd' if reactor else 'white')
+
+
+def _edge(source, destination, scope=''):
+    return '  "{}" -> "{}" [\n    label="{}"\n  ];\n'.format(source, destination, scope)
+
+
+class MergeTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, name, *statements):
+        path = os.path.join(self._dir, name)
+        with open(path, 'w') as f:
+            f.write('digraph dependencies {\n' + ''.join(statements) + '}\n')
+        return path
+
+    def _write_modules(self):
+        self._write('module-a.dot',
+                    _node('grp:a:1.0', 'grp\\na\\n1.0', reactor=True),
+                    _node('grp:lib:2.0', 'grp\\nlib\\n2.0'),
+                    _node('grp:util:1.0', 'grp\\nutil\\n1.0'),
+                    _edge('grp:a:1.0', 'grp:lib:2.0', 'test'),
+                    _edge('grp:lib:2.0', 'grp:util:1.0'))
+        self._write('module-b.dot',
+                    _node('grp:b:1.0', 'grp\\nb\\n1.0', reactor=True),
+                    _node('grp:a:1.0', 'grp\\na\\n1.0'),
+                    _node('grp:lib-2.0', 'grp\\nlib\\n2.0'),
+                    _edge('grp:b:1.0', 'grp:a:1.0'),
+                    _edge('grp:a:1.0', 'grp:lib-2.0', 'runtime'))
+
+    def test_expand_sources(self):
+        self._write_modules()
+        a = os.path.join(self._dir, 'module-a.dot')
+        b = os.path.join(self._dir, 'module-b.dot')
+        self.assertEqual(expand_sources([self._dir]), [a, b])
+        self.assertEqual(expand_sources([os.path.join(self._dir, '*-b.dot'), a, b]), [b, a])
+
+    def test_merge(self):
+        self._write_modules()
+        expected = [
+            ('grp:a:jar:1.0', True, (('grp:lib:jar:2.0', 'runtime'),)),
+            ('grp:b:jar:1.0', True, (('grp:a:jar:1.0', 'compile'),)),
+            ('grp:lib:jar:2.0', False, (('grp:util:jar:1.0', 'compile'),)),
+            ('grp:util:jar:1.0', False, ())
+        ]
+        for processes in 1, 2:
+            graph = read_merged_artifact_graph([self._dir], processes)
+            self.assertEqual(graph_signature(graph.artifacts()), expected)
+            self.assertEqual(graph_signature(read_merged_maven_graph([self._dir], processes)), expected)
+
+    def test_shared_name_different_descriptors(self):
+        self._write('module-a.dot',
+                    _node('grp:a:1.0', 'grp\\na\\n1.0', reactor=True),
+                    _node('grp:lib:1.0', 'grp\\nlib\\nbundle\\n1.0'),
+                    _edge('grp:a:1.0', 'grp:lib:1.0'))
+        self._write('module-b.dot',
+                    _node('grp:b:1.0', 'grp\\nb\\n1.0', reactor=True),
+                    _node('grp:lib:1.0', 'grp\\nlib\\nbundle | jar\\n1.0'),
+                    _edge('grp:b:1.0', 'grp:lib:1.0', 'test'))
+        expected = [
+            ('grp:a:jar:1.0', True, (('grp:lib:bundle:1.0', 'compile'),)),
+            ('grp:b:jar:1.0', True, (('grp:lib:bundle | jar:1.0', 'test'),)),
+            ('grp:lib:bundle | jar:1.0', False, ()),
+            ('grp:lib:bundle:1.0', False, ())
+        ]
+        for processes in 1, 2:
+            self.assertEqual(graph_signature(read_merged_artifact_graph([self._dir], processes).artifacts()), expected)
+            self.assertEqual(graph_signature(read_merged_maven_graph([self._dir], processes)), expected)
+
+    def test_merge_same_file(self):
+        self.assertEqual(graph_signature(read_merged_maven_graph(['tests/karaf-sample.dot'] * 2)),
+                         graph_signature(read_maven_graph('tests/karaf-sample.dot')))
+
+    def test_cli_round_trip(self):
+        self._write_modules()
+        target = os.path.join(self._dir, 'merged.out')
+        main([os.path.join(self._dir, '*.dot'), '-o', target, '-j', '2'])
+        self.assertEqual(graph_signature(read_maven_graph(target)),
+                         graph_signature(read_merged_maven_graph([self._dir])))
+
+
+if __name__ == '__main__':
+    unittest.main()
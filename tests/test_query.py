@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from mavendeps import DependencyQuery, read_artifact_graph
+from mavendeps.query import mediated_scope
+
+from helpers import build_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def _names(path):
+    return None if path is None else tuple(a.descriptor.artifact_id for a in path)
+
+
+def _bfs_distance(artifact, target):
+    distances = {artifact.descriptor: 0}
+    frontier = [artifact]
+    while frontier:
+        next_frontier = []
+        for a in frontier:
+            for d in a.dependencies:
+                if d.artifact.descriptor not in distances:
+                    distances[d.artifact.descriptor] = distances[a.descriptor] + 1
+                    next_frontier.append(d.artifact)
+        frontier = next_frontier
+    return distances.get(target.descriptor)
+
+
+class DependencyQueryTestCase(unittest.TestCase):
+    def setUp(self):
+        self._artifacts = build_graph((('m2', 'm1', 'compile'), ('m1', 'a', 'compile'), ('a', 'b', 'runtime'),
+                                  ('b', 't', 'compile'), ('m1', 't', 'test'), ('m3', 'c', 'provided'),
+                                  ('c', 't', 'compile'), ('b', 'x', 'compile'), ('x', 'a', 'compile')),
+                                 reactor=('m1', 'm2', 'm3'))
+        self._query = DependencyQuery(self._artifacts.values())
+
+    def test_mediated_scope(self):
+        self.assertEqual('runtime', mediated_scope(('compile', 'runtime', 'compile')))
+        self.assertEqual('test', mediated_scope(('test', 'compile')))
+        self.assertEqual('provided', mediated_scope(('provided', 'runtime')))
+        self.assertIsNone(mediated_scope(('compile', 'test')))
+        self.assertIsNone(mediated_scope(('compile', 'provided', 'compile')))
+
+    def test_paths(self):
+        a = self._artifacts
+        self.assertEqual(('m1', 't'), _names(self._query.shortest_path(a['m1'], a['t'])))
+        self.assertEqual(('m2', 'm1', 't'), _names(self._query.shortest_path(a['m2'].descriptor, a['t'])))
+        self.assertEqual(('t',), _names(self._query.shortest_path(a['t'], a['t'])))
+        self.assertIsNone(self._query.shortest_path(a['t'], a['m1']))
+        self.assertEqual({('m1', 't'), ('m1', 'a', 'b', 't')},
+                         set(_names(p) for p in self._query.all_paths(a['m1'], a['t'])))
+        self.assertEqual(1, len(list(self._query.all_paths(a['m1'], a['t'], limit=1))))
+        self.assertEqual([], list(self._query.all_paths(a['m3'], a['m1'])))
+
+        paths = self._query.shortest_paths(a['m2'], (a['t'], a['x'], a['m3']))
+        self.assertEqual(('m2', 'm1', 't'), _names(paths[a['t'].descriptor]))
+        self.assertEqual(('m2', 'm1', 'a', 'b', 'x'), _names(paths[a['x'].descriptor]))
+        self.assertIsNone(paths[a['m3'].descriptor])
+
+    def test_scopes(self):
+        a = self._artifacts
+        self.assertEqual('test', self._query.effective_scope(self._query.shortest_path(a['m1'], a['t'])))
+        self.assertEqual('runtime', self._query.effective_scope((a['m1'], a['a'], a['b'], a['t'])))
+        self.assertEqual({a['t'].descriptor: 'runtime'}, self._query.strongest_scopes(a['m1'], (a['t'],)))
+        self.assertEqual('provided', self._query.strongest_scopes(a['m3'])[a['t'].descriptor])
+        scopes = self._query.strongest_scopes(a['m2'])
+        self.assertEqual('compile', scopes[a['a'].descriptor])
+        self.assertEqual('runtime', scopes[a['x'].descriptor])
+
+    def test_pulling_modules(self):
+        a = self._artifacts
+        self.assertEqual(('m1', 'm3'), _names(self._query.pulling_modules(a['t'])))
+        self.assertEqual(('m1',), _names(self._query.pulling_modules(a['x'])))
+        self.assertEqual({a['c'].descriptor: (a['m3'],), a['m1'].descriptor: (a['m2'],)},
+                         self._query.pulling_modules_of((a['c'], a['m1'])))
+
+        explanations = self._query.explain(a['t'])
+        self.assertEqual([('m1', ('m1', 't'), 'test'), ('m3', ('m3', 'c', 't'), 'provided')],
+                         [(e.module.descriptor.artifact_id, _names(e.path), e.scope) for e in explanations])
+        self.assertEqual(explanations, self._query.explain_all((a['t'],))[a['t'].descriptor])
+
+    def test_shortest_path_random(self):
+        rng = random.Random(5)
+        for _ in range(0, 20):
+            edges = set()
+            for _ in range(0, 120):
+                edges.add((str(rng.randrange(0, 40)), str(rng.randrange(0, 40)), 'compile'))
+            artifacts = build_graph(sorted(edges))
+            query = DependencyQuery(artifacts.values())
+            for _ in range(0, 30):
+                source, target = rng.choice(sorted(artifacts)), rng.choice(sorted(artifacts))
+                path = query.shortest_path(artifacts[source], artifacts[target])
+                distance = _bfs_distance(artifacts[source], artifacts[target])
+                if distance is None:
+                    self.assertIsNone(path)
+                    continue
+                self.assertEqual(distance + 1, len(path))
+                for v, w in zip(path, path[1:]):
+                    self.assertIn(w, [d.artifact for d in v.dependencies])
+
+    def test_artifact_graph(self):
+        graph = read_artifact_graph('tests/karaf-sample.dot')
+        artifacts = list(graph.artifacts())
+        query = DependencyQuery(artifacts)
+        for target in artifacts:
+            for module in query.pulling_modules(target):
+                self.assertTrue(module.in_reactor)
+                self.assertIn(target, module.all_dependencies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from mavendeps import read_maven_graph, filter_artifacts, in_reactor_filter, reject_any
+from mavendeps.render import weakly_connected_components, reactor_module_partitions, render_partitions
+
+__author__ = 'Tony Ganchev'
+
+
+class RenderTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._log = os.path.join(self._dir, 'calls.log')
+        self._prog = os.path.join(self._dir, 'fake-dot')
+        with open(self._prog, 'w') as f:
+            f.write('#!/bin/sh\necho "$1" >> "{}"\ncat\n'.format(self._log))
+        os.chmod(self._prog, os.stat(self._prog).st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _calls(self):
+        if not os.path.exists(self._log):
+            return 0
+        with open(self._log) as f:
+            return len(f.readlines())
+
+    def test_components(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        components = weakly_connected_components(artifacts)
+        self.assertEqual(len(artifacts), sum(len(c) for c in components))
+
+        artifacts = filter_artifacts(artifacts, (in_reactor_filter(), reject_any))
+        components = weakly_connected_components(artifacts)
+        self.assertEqual([len(artifacts)], [len(c) for c in components])
+
+    def test_module_partitions(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        partitions = reactor_module_partitions(artifacts)
+        covered = set(a.descriptor for p in partitions for a in p)
+        self.assertEqual(set(a.descriptor for a in artifacts), covered)
+        self.assertEqual(len([a for a in artifacts if a.in_reactor]),
+                         len([p for p in partitions if p[0].in_reactor]))
+
+    def test_render_cached(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        target_dir = os.path.join(self._dir, 'out')
+        cache_dir = os.path.join(self._dir, 'cache')
+
+        files = render_partitions(artifacts, target_dir, partition='modules', processes=2, cache_dir=cache_dir,
+                                  prog=self._prog)
+        calls = self._calls()
+        self.assertTrue(calls > 0)
+        for path in files:
+            with open(path) as f:
+                self.assertTrue(f.read().startswith('digraph G {'))
+
+        self.assertEqual(files, render_partitions(artifacts, target_dir, partition='modules', cache_dir=cache_dir,
+                                                  prog=self._prog))
+        self.assertEqual(calls, self._calls())
+
+    def test_render_uncached(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        files = render_partitions(artifacts, self._dir, prog=self._prog, processes=1)
+        self.assertEqual(len(weakly_connected_components(artifacts)), len(files))
+        self.assertEqual(len(files), self._calls())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mavendeps import Artifact, ArtifactDescriptor, ArtifactDependency, FilterAction, filter_artifacts, \
+    read_maven_graph, reject_any
+from mavendeps.rules import RuleSet, load_rules
+
+from helpers import exclude_non_reactor_dependencies
+
+__author__ = 'Tony Ganchev'
+
+KARAF_RULES = {
+    'filters': [
+        {'when': {'in_reactor': True}, 'action': 'accept'},
+        {'when': {'has_reactor_dependent': True}, 'action': 'accept'},
+        {'action': 'reject'}
+    ],
+    'styles': [
+        {'when': {'in_reactor': True}, 'set': {'penwidth': 2, 'fillcolor': 'lightgreen'}},
+        {'when': {'packaging': 'kar'}, 'set': {'fillcolor': 'pink'}},
+        {'when': {'packaging': 'karaf-assembly'}, 'set': {'fillcolor': 'yellow'}}
+    ]
+}
+
+
+def _artifact(group_id, packaging='jar', in_reactor=False):
+    return Artifact(ArtifactDescriptor(group_id, 'art', '1.0', packaging), in_reactor)
+
+
+class RuleSetTestCase(unittest.TestCase):
+    def test_group_globs(self):
+        rules = RuleSet([{'when': {'group_id': 'org.apache.*'}, 'action': 'reject'},
+                         {'when': {'group_id': ['org.osgi', 'javax.*.api']}, 'action': 'accept'},
+                         {'when': {'group_id': '*.blog'}, 'action': 'reject'}])
+        self.assertEqual(FilterAction.reject, rules.filter(_artifact('org.apache.karaf')))
+        self.assertEqual(FilterAction.no_action, rules.filter(_artifact('org.apache')))
+        self.assertEqual(FilterAction.accept, rules.filter(_artifact('org.osgi')))
+        self.assertEqual(FilterAction.no_action, rules.filter(_artifact('org.osgi.core')))
+        self.assertEqual(FilterAction.accept, rules.filter(_artifact('javax.servlet.api')))
+        self.assertEqual(FilterAction.no_action, rules.filter(_artifact('javax.servlet')))
+        self.assertEqual(FilterAction.reject, rules.filter(_artifact('com.tonyganchev.blog')))
+
+    def test_first_match_wins(self):
+        rules = RuleSet([{'when': {'packaging': ['kar', 'war'], 'in_reactor': True}, 'action': 'accept'},
+                         {'when': {'packaging': 'kar'}, 'action': 'reject'}])
+        self.assertEqual(FilterAction.accept, rules.filter(_artifact('grp', 'kar', True)))
+        self.assertEqual(FilterAction.reject, rules.filter(_artifact('grp', 'kar')))
+        self.assertEqual(FilterAction.no_action, rules.filter(_artifact('grp', 'war')))
+
+    def test_scope(self):
+        prod = _artifact('prod')
+        _artifact('cons').add_dependency(ArtifactDependency(prod, 'test'))
+        self.assertEqual(FilterAction.reject,
+                         RuleSet([{'when': {'scope': 'test'}, 'action': 'reject'}]).filter(prod))
+        self.assertEqual(FilterAction.no_action,
+                         RuleSet([{'when': {'scope': ['compile', 'runtime']}, 'action': 'reject'}]).filter(prod))
+
+    def test_styles_merge(self):
+        rules = RuleSet.from_dict(KARAF_RULES)
+        self.assertEqual({'penwidth': 2, 'fillcolor': '"pink"'},
+                         rules.style_attributes(_artifact('grp', 'kar', True)))
+        self.assertEqual({}, rules.style_attributes(_artifact('grp')))
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            RuleSet([{'when': {'colour': 'red'}, 'action': 'reject'}])
+        with self.assertRaises(ValueError):
+            RuleSet([{'action': 'drop'}])
+
+
+class LoadRulesTestCase(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_karaf_sample(self):
+        path = os.path.join(self._dir, 'rules.json')
+        with open(path, 'w') as f:
+            json.dump(KARAF_RULES, f)
+        rules = load_rules(path)
+
+        def include_reactor_artifacts(artifact):
+            return FilterAction.accept if artifact.in_reactor else FilterAction.no_action
+
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        expected = filter_artifacts(artifacts, (include_reactor_artifacts, exclude_non_reactor_dependencies,
+                                                reject_any))
+        actual = filter_artifacts(artifacts, (rules.filter,))
+        self.assertEqual([str(a.descriptor) for a in expected], [str(a.descriptor) for a in actual])
+        self.assertEqual(RuleSet.from_dict(KARAF_RULES).style_attributes(actual[0]), rules.style_attributes(actual[0]))
+
+    def test_yaml(self):
+        path = os.path.join(self._dir, 'rules.yaml')
+        with open(path, 'w') as f:
+            f.write('filters:\n'
+                    '  - when: {group_id: "org.*", packaging: jar}\n'
+                    '    action: reject\n')
+        try:
+            rules = load_rules(path)
+        except ImportError:
+            self.skipTest('PyYAML is not available')
+        self.assertEqual(FilterAction.reject, rules.filter(_artifact('org.osgi')))
+        self.assertEqual(FilterAction.no_action, rules.filter(_artifact('org.osgi', 'bundle')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import random
+import unittest
+from contextlib import contextmanager
+
+from mavendeps import ArtifactDependency, ArtifactGraph, DependencyQuery, FilterAction, filter_artifacts, \
+    read_maven_graph
+from mavendeps import artifact_graph, maven_graph
+from mavendeps.scopes import SCOPE_WEIGHTS, effective_scopes, propagate_scopes
+
+from helpers import build_graph
+
+__author__ = 'Tony Ganchev'
+
+
+@contextmanager
+def _counted(module, name):
+    """
+    Replaces module.name with a wrapper recording every call for the duration of the block. Yields the call list.
+    """
+    original = getattr(module, name)
+    calls = []
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    setattr(module, name, counted)
+    try:
+        yield calls
+    finally:
+        setattr(module, name, original)
+
+
+class EffectiveScopeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.artifacts = build_graph((('app', 'lib', 'compile'),
+                                 ('app', 'api', 'provided'),
+                                 ('app', 'junit', 'test'),
+                                 ('lib', 'driver', 'runtime'),
+                                 ('lib', 'mock', 'test'),
+                                 ('api', 'util', 'compile'),
+                                 ('junit', 'hamcrest', 'compile'),
+                                 ('tool', 'util', 'compile'),
+                                 ('tool', 'driver', 'compile')), reactor=('app', 'tool'))
+
+    def _scopes(self):
+        return {name: a.effective_scope for name, a in self.artifacts.items()}
+
+    def test_mediation(self):
+        self.assertEqual({'app': None, 'tool': None, 'lib': 'compile', 'api': 'provided', 'junit': 'test',
+                          'driver': 'compile', 'mock': None, 'util': 'compile', 'hamcrest': 'test'}, self._scopes())
+
+    def test_cycle(self):
+        artifacts = build_graph((('app', 'a', 'runtime'), ('a', 'b', 'compile'), ('b', 'a', 'compile'),
+                            ('b', 'c', 'compile'), ('other', 'c', 'provided')), reactor=('app', 'other'))
+        self.assertEqual({'app': None, 'other': None, 'a': 'runtime', 'b': 'runtime', 'c': 'provided'},
+                         {name: a.effective_scope for name, a in artifacts.items()})
+
+    def test_cache_invalidation(self):
+        self.assertEqual('provided', self.artifacts['api'].effective_scope)
+        self.artifacts['tool'].add_dependency(ArtifactDependency(self.artifacts['api'], 'compile'))
+        self.assertEqual('compile', self.artifacts['api'].effective_scope)
+        self.artifacts['tool'].remove_dependency(self.artifacts['driver'])
+        self.assertEqual('runtime', self.artifacts['driver'].effective_scope)
+
+    def test_artifact_graph(self):
+        graph = ArtifactGraph.from_artifacts(self.artifacts.values())
+        self.assertEqual(self._scopes(), {a.descriptor.artifact_id: a.effective_scope for a in graph.artifacts()})
+        graph.remove_dependency(graph.id_of(self.artifacts['app'].descriptor),
+                                graph.id_of(self.artifacts['lib'].descriptor))
+        self.assertIsNone(graph.artifact(graph.id_of(self.artifacts['lib'].descriptor)).effective_scope)
+
+    def test_propagate_scopes(self):
+        self.assertEqual([None, 'runtime', 'runtime', None],
+                         propagate_scopes([[(1, 'runtime')], [(2, 'compile')], [(1, 'compile'), (3, 'test')], []],
+                                          (0,)))
+
+    def test_karaf_sample(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        query = DependencyQuery(artifacts)
+        expected = {}
+        for module in (a for a in artifacts if a.in_reactor):
+            for descriptor, scope in query.strongest_scopes(module).items():
+                expected[descriptor] = scope if descriptor not in expected else \
+                    max(expected[descriptor], scope, key=SCOPE_WEIGHTS.get)
+        self.assertEqual({a.descriptor: expected.get(a.descriptor) for a in artifacts}, effective_scopes(artifacts))
+        self.assertEqual(expected.get(artifacts[-1].descriptor), artifacts[-1].effective_scope)
+
+
+def _random_graph(nodes, seed):
+    rng = random.Random(seed)
+    names = ['a{}'.format(i) for i in range(0, nodes)]
+    edges = set()
+    for i in range(1, nodes):
+        for _ in range(0, 3):
+            j = rng.randrange(i, nodes)
+            if j != i - 1:
+                edges.add((names[i - 1], names[j], rng.choice(('compile', 'runtime', 'provided', 'test'))))
+    return build_graph(sorted(edges), reactor=names[:nodes // 20])
+
+
+class FilterPassScopeTestCase(unittest.TestCase):
+    """
+    Filter functions read effective scopes as of the start of their pass, computed once per pass.
+    """
+
+    def setUp(self):
+        self.artifacts = list(_random_graph(600, 3).values())
+
+    @staticmethod
+    def _recording(seen):
+        def record(artifact):
+            seen[artifact.descriptor] = artifact.effective_scope
+            return FilterAction.reject if hash(artifact.descriptor.artifact_id) % 3 == 0 else FilterAction.no_action
+        return record
+
+    def test_pass_start_scopes(self):
+        for artifacts in self.artifacts, ArtifactGraph.from_artifacts(self.artifacts).artifacts():
+            first, second = {}, {}
+            filter_artifacts(artifacts, (self._recording(first), self._recording(second)))
+            self.assertEqual(effective_scopes(self.artifacts), first)
+            remaining = filter_artifacts(self.artifacts, (self._recording({}),))
+            self.assertEqual({a.descriptor: a.effective_scope for a in remaining}, second)
+
+    def test_one_propagation_per_pass(self):
+        def reject_test_scoped(artifact):
+            return FilterAction.reject if artifact.effective_scope == 'test' else FilterAction.no_action
+
+        with _counted(maven_graph, 'effective_scopes') as full, _counted(maven_graph, 'propagate_scopes') as pinned:
+            result = filter_artifacts(self.artifacts, (reject_test_scoped,))
+        self.assertLess(len(result), len(self.artifacts))
+        self.assertLessEqual(len(full) + len(pinned), 2)
+
+        graph = ArtifactGraph.from_artifacts(self.artifacts)
+        with _counted(artifact_graph, 'propagate_scopes') as propagated:
+            result = filter_artifacts(graph.artifacts(), (reject_test_scoped,))
+        self.assertLess(len(result), len(self.artifacts))
+        self.assertLessEqual(len(propagated), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import random
+import unittest
+
+from mavendeps import ArtifactDescriptor, collapse_groups, condense_cycles, extract_neighbourhood, \
+    read_artifact_graph, read_maven_graph, transitive_reduction
+
+from helpers import build_graph
+
+__author__ = 'Tony Ganchev'
+
+
+def _edges(artifacts):
+    return sorted((str(a.descriptor), str(d.artifact.descriptor), d.scope) for a in artifacts for d in a.dependencies)
+
+
+def _reachable(artifact):
+    seen = set()
+    pending = [d.artifact for d in artifact.dependencies]
+    while pending:
+        a = pending.pop()
+        if a.descriptor not in seen:
+            seen.add(a.descriptor)
+            pending.extend(d.artifact for d in a.dependencies)
+    return seen
+
+
+class CollapseGroupsTestCase(unittest.TestCase):
+    def test_prefixes(self):
+        groups = {'app': 'org.example', 'core': 'org.example.core', 'util': 'org.example.core', 'log': 'org.slf4j',
+                  'other': 'org.examplex'}
+        artifacts = build_graph((('app', 'core', 'compile'), ('app', 'log', 'runtime'), ('core', 'util', 'compile'),
+                            ('util', 'log', 'compile'), ('app', 'other', 'test')),
+                           reactor=('app',), group=groups.get)
+        members = {}
+        collapsed = collapse_groups((artifacts['app'],), ('org.example', 'org.slf4j'), members)
+        group = ArtifactDescriptor('org.example', '*', '*', 'group')
+        self.assertEqual([str(group), 'org.examplex:other:jar:1.0', 'org.slf4j:log:jar:1.0'],
+                         sorted(str(a.descriptor) for a in collapsed))
+        self.assertEqual([(str(group), 'org.examplex:other:jar:1.0', 'test'),
+                          (str(group), 'org.slf4j:log:jar:1.0', 'compile')], _edges(collapsed))
+        self.assertTrue(collapsed[0].in_reactor)
+        self.assertEqual({group: {artifacts[n].descriptor for n in ('app', 'core', 'util')}},
+                         {k: set(v) for k, v in members.items()})
+        self.assertEqual(3, len(tuple(artifacts['app'].dependencies)))
+
+    def test_every_group(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        collapsed = collapse_groups(artifacts)
+        self.assertEqual(len({a.descriptor.group_id for a in artifacts}), len(collapsed))
+        self.assertEqual(len({a.descriptor.group_id for a in artifacts}), len({a.descriptor.group_id
+                                                                                for a in collapsed}))
+
+
+class CondenseCyclesTestCase(unittest.TestCase):
+    def test_cycle(self):
+        artifacts = build_graph((('app', 'a', 'compile'), ('a', 'b', 'compile'), ('b', 'c', 'runtime'),
+                            ('c', 'a', 'compile'), ('c', 'd', 'compile'), ('b', 'd', 'test')), reactor=('app',))
+        members = {}
+        condensed = condense_cycles((artifacts['app'],), members)
+        cycle = ArtifactDescriptor('grp', 'a', '1.0', 'cycle', '3')
+        self.assertEqual({cycle: tuple(artifacts[n].descriptor for n in 'abc')}, members)
+        self.assertEqual([('grp:a:cycle:3:1.0', 'grp:d:jar:1.0', 'compile'),
+                          ('grp:app:jar:1.0', 'grp:a:cycle:3:1.0', 'compile')], _edges(condensed))
+        self.assertEqual(3, len(artifacts['a'].all_dependencies))
+
+
+class TransitiveReductionTestCase(unittest.TestCase):
+    def test_diamond(self):
+        artifacts = build_graph((('app', 'a', 'compile'), ('app', 'b', 'compile'), ('a', 'b', 'runtime'),
+                            ('b', 'c', 'compile'), ('app', 'c', 'test'), ('a', 'c', 'compile')))
+        reduced = transitive_reduction((artifacts['app'],))
+        self.assertEqual([('grp:a:jar:1.0', 'grp:b:jar:1.0', 'runtime'),
+                          ('grp:app:jar:1.0', 'grp:a:jar:1.0', 'compile'),
+                          ('grp:b:jar:1.0', 'grp:c:jar:1.0', 'compile')], _edges(reduced))
+        self.assertEqual(6, len(_edges(artifacts.values())))
+
+    def test_cycles_are_kept(self):
+        artifacts = build_graph((('app', 'a', 'compile'), ('a', 'b', 'compile'), ('b', 'a', 'compile'),
+                            ('app', 'b', 'compile'), ('b', 'c', 'compile'), ('app', 'c', 'compile')))
+        self.assertEqual([('grp:a:jar:1.0', 'grp:b:jar:1.0', 'compile'),
+                          ('grp:app:jar:1.0', 'grp:a:jar:1.0', 'compile'),
+                          ('grp:app:jar:1.0', 'grp:b:jar:1.0', 'compile'),
+                          ('grp:b:jar:1.0', 'grp:a:jar:1.0', 'compile'),
+                          ('grp:b:jar:1.0', 'grp:c:jar:1.0', 'compile')],
+                         _edges(transitive_reduction((artifacts['app'],))))
+
+    def test_random_dags(self):
+        rng = random.Random(11)
+        for _ in range(0, 20):
+            count = rng.randint(2, 30)
+            edges = {(str(i), str(j), 'compile') for i in range(0, count) for j in range(i + 1, count)
+                     if rng.random() < 0.2}
+            if not edges:
+                continue
+            artifacts = build_graph(sorted(edges))
+            reduced = transitive_reduction(artifacts.values())
+            by_descriptor = {a.descriptor: a for a in reduced}
+            for artifact in artifacts.values():
+                implied = set()
+                for d in artifact.dependencies:
+                    implied |= _reachable(d.artifact)
+                expected = {d.artifact.descriptor for d in artifact.dependencies} - implied
+                reduced_artifact = by_descriptor[artifact.descriptor]
+                self.assertEqual(expected, {d.artifact.descriptor for d in reduced_artifact.dependencies})
+                self.assertEqual(_reachable(artifact), _reachable(reduced_artifact))
+
+
+
+class ExtractNeighbourhoodTestCase(unittest.TestCase):
+    def setUp(self):
+        self.artifacts = build_graph((('app', 'web', 'compile'), ('web', 'core', 'compile'), ('core', 'log', 'runtime'),
+                                 ('tool', 'core', 'test'), ('app', 'log', 'provided')), reactor=('app', 'tool'))
+
+    @staticmethod
+    def _names(artifacts):
+        return sorted(a.descriptor.artifact_id for a in artifacts)
+
+    def test_depth(self):
+        core = self.artifacts['core']
+        self.assertEqual(['core'], self._names(extract_neighbourhood(self.artifacts.values(), (core,), 0)))
+        self.assertEqual(['core', 'log', 'tool', 'web'],
+                         self._names(extract_neighbourhood(self.artifacts.values(), (core,))))
+        self.assertEqual(['app', 'core', 'log', 'tool', 'web'],
+                         self._names(extract_neighbourhood(self.artifacts.values(), (core,), None)))
+
+    def test_directions_and_induced_edges(self):
+        app = self.artifacts['app'].descriptor
+        region = extract_neighbourhood(self.artifacts.values(), (app,), 2, dependents=False)
+        self.assertEqual(['app', 'core', 'log', 'web'], self._names(region))
+        self.assertEqual(4, len(_edges(region)))
+        self.assertIn(('grp:core:jar:1.0', 'grp:log:jar:1.0', 'runtime'), _edges(region))
+        self.assertTrue(region[0].in_reactor)
+        self.assertEqual(['core', 'tool', 'web'],
+                         self._names(extract_neighbourhood(self.artifacts.values(), ('grp:core:*',), 1,
+                                                           dependencies=False)))
+        self.assertEqual(2, len(tuple(self.artifacts['core'].dependents)))
+
+    def test_artifact_graph(self):
+        graph = read_artifact_graph('tests/karaf-sample.dot')
+        roots = ('org.apache.karaf:org.apache.karaf.main:*',)
+        expected = extract_neighbourhood(read_maven_graph('tests/karaf-sample.dot'), roots, 2)
+        region = extract_neighbourhood(graph, roots, 2)
+        self.assertEqual(_edges(expected), _edges(region))
+        self.assertLess(len(region), len(graph))
+        self.assertEqual(len(region), len(extract_neighbourhood(graph, [a.descriptor for a in region[:1]], 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+
+from mavendeps import ArtifactDescriptor, Artifact, ArtifactDependency, ArtifactGraph, FilterAction, VersionIndex, \
+    filter_artifacts, in_reactor_filter, index_versions, read_artifact_graph, read_maven_graph, reject_any, \
+    superseded_version_filter, version_conflict_filter, version_conflict_style
+from mavendeps.maven_dot import NodeAttributes
+from mavendeps.rules import RuleSet
+from mavendeps.versions import version_key
+
+__author__ = 'Tony Ganchev'
+
+
+def _graph():
+    artifacts = {}
+    for name, version, reactor in (('app', '1.0', True), ('web', '1.0', True), ('tool', '1.0', True),
+                                   ('guava', '18.0', False), ('guava', '19.0', False), ('commons', '2.1', False),
+                                   ('lib', '1.0', False)):
+        artifacts[name, version] = Artifact(ArtifactDescriptor('grp', name, version), reactor)
+    for source, target in ((('app', '1.0'), ('lib', '1.0')),
+                           (('lib', '1.0'), ('guava', '18.0')),
+                           (('web', '1.0'), ('guava', '19.0')),
+                           (('web', '1.0'), ('commons', '2.1')),
+                           (('tool', '1.0'), ('guava', '19.0'))):
+        artifacts[source].add_dependency(ArtifactDependency(artifacts[target]))
+    index_versions(artifacts.values())
+    return artifacts
+
+
+def _names(modules):
+    return tuple(m.descriptor.artifact_id for m in modules)
+
+
+class VersionKeyTestCase(unittest.TestCase):
+    def test_order(self):
+        versions = ['1.10', '1.0.1', '1.0-SNAPSHOT', '1.2', '1.0', '1.0-alpha-2', '1.0-alpha-10']
+        self.assertEqual(['1.0-alpha-2', '1.0-alpha-10', '1.0-SNAPSHOT', '1.0', '1.0.1', '1.2', '1.10'],
+                         sorted(versions, key=version_key))
+        self.assertEqual(version_key('1.0'), version_key('1.0.0'))
+
+
+class VersionIndexTestCase(unittest.TestCase):
+    def test_index(self):
+        artifacts = _graph()
+        index = VersionIndex(a.descriptor for a in artifacts.values())
+        guava = artifacts['guava', '18.0'].descriptor
+        self.assertEqual(('18.0', '19.0'), index.versions(guava))
+        self.assertTrue(index.is_conflicting(guava))
+        self.assertFalse(index.is_conflicting(artifacts['lib', '1.0'].descriptor))
+        self.assertEqual([('grp', 'guava', None)], index.conflicting_keys())
+        index.discard(artifacts['guava', '19.0'].descriptor)
+        self.assertFalse(index.is_conflicting(guava))
+        self.assertEqual('18.0', index.newest_version(guava))
+
+    def test_classifier_is_part_of_the_key(self):
+        index = VersionIndex((ArtifactDescriptor('grp', 'a', '1.0'), ArtifactDescriptor('grp', 'a', '2.0', 'jar', 'x')))
+        self.assertEqual([], index.conflicting_keys())
+
+    def test_conflicts(self):
+        artifacts = _graph()
+        conflicts = artifacts['app', '1.0'].version_index.conflicts(artifacts.values())
+        self.assertEqual(1, len(conflicts))
+        self.assertEqual(('grp', 'guava', None), conflicts[0][:3])
+        self.assertEqual([('18.0', ('app',)), ('19.0', ('web', 'tool'))],
+                         [(use.version, _names(use.modules)) for use in conflicts[0].versions])
+
+    def test_classified_and_unclassified_conflicts(self):
+        root = Artifact(ArtifactDescriptor('g', 'root', '1.0'), True)
+        for version in '1.0', '2.0':
+            for classifier in 'tests', None:
+                root.add_dependency(ArtifactDependency(Artifact(ArtifactDescriptor('g', 'a', version, 'jar',
+                                                                                   classifier))))
+        index = root.version_index
+        self.assertEqual([('g', 'a', None), ('g', 'a', 'tests')], index.conflicting_keys())
+        self.assertEqual([('g', 'a', None), ('g', 'a', 'tests')],
+                         [c[:3] for c in index.conflicts([root] + [d.artifact for d in root.dependencies])])
+
+    def test_lazy_index_covers_component(self):
+        a, b = Artifact(ArtifactDescriptor('grp', 'a', '1.0')), Artifact(ArtifactDescriptor('grp', 'a', '2.0'))
+        root = Artifact(ArtifactDescriptor('grp', 'root', '1.0'), True)
+        root.add_dependency(ArtifactDependency(a))
+        root.add_dependency(ArtifactDependency(b))
+        self.assertTrue(a.version_index.is_conflicting(a.descriptor))
+        self.assertIs(a.version_index, root.version_index)
+
+
+class VersionFilterTestCase(unittest.TestCase):
+    def test_read_graph_is_indexed(self):
+        artifacts = read_maven_graph('tests/karaf-sample.dot')
+        self.assertIs(artifacts[0].version_index, artifacts[-1].version_index)
+        self.assertEqual([], artifacts[0].version_index.conflicting_keys())
+
+    def test_superseded_version_filter(self):
+        artifacts = filter_artifacts(_graph().values(), (superseded_version_filter(),))
+        self.assertNotIn(('guava', '18.0'), [(a.descriptor.artifact_id, a.descriptor.version) for a in artifacts])
+        self.assertEqual([], artifacts[0].version_index.conflicting_keys())
+
+    def test_removals_update_index(self):
+        def reject_old_guava(artifact):
+            return FilterAction.reject if artifact.descriptor.version == '18.0' else FilterAction.no_action
+        artifacts = filter_artifacts(_graph().values(),
+                                     (reject_old_guava, version_conflict_filter(FilterAction.reject)))
+        self.assertIn(('guava', '19.0'), [(a.descriptor.artifact_id, a.descriptor.version) for a in artifacts])
+
+    def test_batch_removals_update_index(self):
+        artifacts = filter_artifacts(_graph().values(), (in_reactor_filter(), version_conflict_filter(), reject_any))
+        self.assertEqual([('app', '1.0'), ('guava', '18.0'), ('guava', '19.0'), ('tool', '1.0'), ('web', '1.0')],
+                         sorted((a.descriptor.artifact_id, a.descriptor.version) for a in artifacts))
+        index = artifacts[0].version_index
+        self.assertEqual((), index.versions(ArtifactDescriptor('grp', 'lib', '1.0')))
+        self.assertEqual(('18.0', '19.0'), index.versions(ArtifactDescriptor('grp', 'guava', '1.0')))
+
+    def test_artifact_graph(self):
+        graph = read_artifact_graph('tests/karaf-sample.dot')
+        views = graph.artifacts()
+        self.assertIs(views[0].version_index, graph.artifact(len(graph) - 1).version_index)
+        artifacts = filter_artifacts(ArtifactGraph.from_artifacts(_graph().values()).artifacts(),
+                                     (superseded_version_filter(),))
+        self.assertEqual(['19.0'], [a.descriptor.version for a in artifacts if a.descriptor.artifact_id == 'guava'])
+        self.assertEqual([], artifacts[0].version_index.conflicting_keys())
+
+    def test_style(self):
+        artifacts = _graph()
+        style = version_conflict_style()
+        for key, conflicting in ((('guava', '18.0'), True), (('lib', '1.0'), False)):
+            node = NodeAttributes()
+            style(artifacts[key], node)
+            self.assertEqual('"#ffcccc"' if conflicting else None, node.get('fillcolor'))
+
+    def test_rule(self):
+        rules = RuleSet(style_rules=[{'when': {'version_conflict': True}, 'set': {'color': 'red'}}])
+        artifacts = _graph()
+        self.assertEqual({'color': '"red"'}, rules.style_attributes(artifacts['guava', '19.0']))
+        self.assertEqual({}, rules.style_attributes(artifacts['commons', '2.1']))
+
+
+if __name__ == '__main__':
+    unittest.main()